@@ -79,9 +79,17 @@
 # app.py
 import os
 import json
+import time
+import hashlib
+import logging
 import traceback
-from flask import Flask, request, jsonify
-from pypdf import PdfReader
+import threading
+
+_IMPORT_STARTED = time.perf_counter()
+
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, Blueprint, Response, request, jsonify, g
 from flask_cors import CORS
 
 # resumeparser.ats_extractor signature (Azure-version) is:
@@ -90,85 +98,821 @@ from flask_cors import CORS
 #               azure_endpoint: Optional[str] = None,
 #               deployment: Optional[str] = None,
 #               api_version: Optional[str] = None) -> dict
-from resumeparser import ats_extractor
+import resumeparser
+from resumeparser import ats_extractor, ats_extractor_stages, get_setting, pipeline_fingerprint, get_assessment_cache
+from resumeparser import normalization_enabled
+from resultcache import LRUCache, DiskCache, TieredCache, make_cache_key_for_digest, is_cache_key
+from pdftext import read_pdf, read_pdf_bytes, spool_stream, new_process_pool
+from jobqueue import JobQueue, DONE, FAILED, CANCELLED
+from resumestore import ResumeStore, SORTS
+from skillindex import SkillIndex
+from singleflight import SingleFlight
+from metrics import REGISTRY, CONTENT_TYPE, CACHE_REQUESTS, HTTP_SECONDS, HTTP_REQUESTS, observe_stage
+from metrics import COALESCED_REQUESTS, LLM_CALLS_SAVED, LLM_TOKENS_SAVED
+import ratelimit
 
 BASE_DIR = os.path.dirname(__file__)
 UPLOAD_PATH = os.path.join(BASE_DIR, "__DATA__")
-os.makedirs(UPLOAD_PATH, exist_ok=True)
+ARCHIVE_PATH = os.path.join(UPLOAD_PATH, "archive")
+
+api = Blueprint("api", __name__)
+_logger = logging.getLogger("app")  # what Flask's app.logger uses
+
+# Settings below are read by create_app() -> _load_settings(), once its config has been applied.
+result_cache = None
+_archive_pool = None
+_archive_lock = threading.Lock()
+# concurrent requests for the same document (double submits, two people opening one CV)
+# share one pipeline run instead of each paying for the completions
+_inflight = SingleFlight()
+
+
+def _load_settings() -> None:
+    global RESULT_CACHE_ENABLED, result_cache, UPLOAD_SPOOL_MAX_BYTES, PDF_PARALLEL_PAGE_THRESHOLD
+    global PDF_PAGE_WORKERS, PDF_SLOW_PAGE_SECONDS, ARCHIVE_UPLOADS, BATCH_MAX_FILES, BATCH_PDF_WORKERS
+    global BATCH_LLM_CONCURRENCY, JOB_WORKERS, JOB_LEASE_SECONDS, PROFILE_STORE_ENABLED, RANK_TOP_N, RANK_ASSESS_TOP
+    global RANK_TENURE_BOOST
+    os.makedirs(UPLOAD_PATH, exist_ok=True)
+
+    # Parsed results keyed on PDF content hash + deployment + prompt version
+    RESULT_CACHE_ENABLED = get_setting("RESULT_CACHE_ENABLED", True)
+    result_cache = TieredCache(
+        LRUCache(
+            max_entries=get_setting("RESULT_CACHE_MAX_ENTRIES", 256),
+            ttl_seconds=get_setting("RESULT_CACHE_TTL_SECONDS", 3600.0),
+        ),
+        DiskCache(
+            os.path.join(UPLOAD_PATH, "cache"),
+            ttl_seconds=get_setting("RESULT_CACHE_DISK_TTL_SECONDS", 7 * 24 * 3600.0),
+        ),
+    )
+
+    # Uploads are parsed from memory; only large ones spill to a per-request temp file
+    UPLOAD_SPOOL_MAX_BYTES = get_setting("UPLOAD_SPOOL_MAX_BYTES", 8 * 1024 * 1024)
+    # Long PDFs (academic CVs, portfolios) are extracted page-parallel on a process pool
+    PDF_PARALLEL_PAGE_THRESHOLD = get_setting("PDF_PARALLEL_PAGE_THRESHOLD", 16)
+    PDF_PAGE_WORKERS = get_setting("PDF_PAGE_WORKERS", os.cpu_count() or 2)
+    PDF_SLOW_PAGE_SECONDS = get_setting("PDF_SLOW_PAGE_SECONDS", 1.0)
+    # Optional: keep a copy of every original upload, written off the request path
+    ARCHIVE_UPLOADS = get_setting("ARCHIVE_UPLOADS", False)
+
+    # Batch processing: PDF parsing is CPU-bound (process pool), LLM calls are network-bound (thread pool)
+    BATCH_MAX_FILES = get_setting("BATCH_MAX_FILES", 200)
+    BATCH_PDF_WORKERS = get_setting("BATCH_PDF_WORKERS", os.cpu_count() or 2)
+    BATCH_LLM_CONCURRENCY = get_setting("BATCH_LLM_CONCURRENCY", 8)
+
+    # Async jobs: submit returns immediately, workers run the full pipeline in the background
+    JOB_WORKERS = get_setting("JOB_WORKERS", 4)
+    # a running job not heartbeated for this long (its process died) is re-queued
+    JOB_LEASE_SECONDS = get_setting("JOB_LEASE_SECONDS", 60.0)
+
+    # Every successful parse is also kept in __DATA__/profiles.db for GET /api/profiles
+    PROFILE_STORE_ENABLED = get_setting("PROFILE_STORE_ENABLED", True)
+    # POST /api/rank: BM25 over the stored profiles, then an LLM job-fit assessment of the best few only
+    RANK_TOP_N = get_setting("RANK_TOP_N", 20)
+    RANK_ASSESS_TOP = get_setting("RANK_ASSESS_TOP", 5)
+    RANK_TENURE_BOOST = get_setting("RANK_TENURE_BOOST", 0.2)
+
+
+def _archive_upload(doc_digest: str, pdf_bytes: bytes) -> None:
+    """Queue the original PDF for writing to __DATA__/archive/<sha256>.pdf (no-op unless ARCHIVE_UPLOADS)."""
+    global _archive_pool
+    if not ARCHIVE_UPLOADS:
+        return
+    with _archive_lock:
+        if _archive_pool is None:
+            os.makedirs(ARCHIVE_PATH, exist_ok=True)
+            _archive_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archive")
+    _archive_pool.submit(_write_archive_file, doc_digest, pdf_bytes)
+
+
+def _write_archive_file(doc_digest: str, pdf_bytes: bytes) -> None:
+    # content-addressed, so concurrent uploads never clobber each other and re-uploads are free
+    path = os.path.join(ARCHIVE_PATH, doc_digest + ".pdf")
+    if os.path.exists(path):
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as fh:
+            fh.write(pdf_bytes)
+        os.replace(tmp_path, path)
+    except OSError:
+        traceback.print_exc()
+
+
+_pdf_pool = None
+_llm_pool = None
+_pools_lock = threading.Lock()
+
+
+def _get_pools():
+    # created lazily so importing app.py (or forking WSGI workers) doesn't spawn processes
+    global _pdf_pool, _llm_pool
+    with _pools_lock:
+        if _pdf_pool is None:
+            _pdf_pool = new_process_pool(BATCH_PDF_WORKERS)
+        if _llm_pool is None:
+            # shared across concurrent batch requests so the cap is global, not per request
+            _llm_pool = ThreadPoolExecutor(max_workers=BATCH_LLM_CONCURRENCY, thread_name_prefix="llm")
+        return _pdf_pool, _llm_pool
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def _get_job_queue() -> JobQueue:
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(os.path.join(UPLOAD_PATH, "jobs.db"), _process_pdf_bytes, workers=JOB_WORKERS,
+                                  lease_seconds=JOB_LEASE_SECONDS)
+        return _job_queue
+
+
+_profile_store = None
+_profile_store_lock = threading.Lock()
+
+
+def _get_profile_store() -> ResumeStore:
+    global _profile_store
+    with _profile_store_lock:
+        if _profile_store is None:
+            _profile_store = ResumeStore(os.path.join(UPLOAD_PATH, "profiles.db"))
+        return _profile_store
+
+
+_skill_index = None
+_skill_index_lock = threading.Lock()
+
+
+def _get_skill_index() -> SkillIndex:
+    """The ranking index, brought up to date with the profile store (built from it on first use)."""
+    global _skill_index
+    with _skill_index_lock:
+        if _skill_index is None:
+            _skill_index = SkillIndex()
+        _skill_index.sync(_get_profile_store())
+        return _skill_index
+
+
+@api.before_app_request
+def _start_job_workers():
+    # started on the first request (not at import) so the debug reloader's parent
+    # process doesn't run a second set of workers; also resumes jobs queued before a restart
+    _get_job_queue().start()
+
+
+# Instrumentation: per-endpoint latency / status, scraped from GET /metrics
+REGISTRY.gauge("cv_result_cache_memory_entries", "Entries in the in-memory result cache.",
+               lambda: len(result_cache.memory))
+REGISTRY.gauge("cv_llm_retries", "Completions retried by the rate limiter (since start).",
+               lambda: {k: v["retries"] for k, v in ratelimit.all_stats().items()},
+               ("endpoint", "deployment"))
+REGISTRY.gauge("cv_llm_throttled", "429 responses seen by the rate limiter (since start).",
+               lambda: {k: v["throttled_429"] for k, v in ratelimit.all_stats().items()},
+               ("endpoint", "deployment"))
+REGISTRY.gauge("cv_llm_wait_seconds", "Time callers spent queued in the rate limiter (since start).",
+               lambda: {k: v["wait_seconds"] for k, v in ratelimit.all_stats().items()},
+               ("endpoint", "deployment"))
 
-app = Flask(__name__)
-CORS(app)
 
+@api.before_app_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
 
-@app.route("/")
+
+@api.after_app_request
+def _record_request(response):
+    started = g.get("request_started")
+    # label with the view name alone ("api_process"), not the blueprint-qualified endpoint
+    endpoint = (request.endpoint or "unmatched").rpartition(".")[2]
+    if started is not None:
+        HTTP_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+    HTTP_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    return response
+
+
+@api.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+@api.route("/")
 def index():
     return "Resume Parser API is running. Use POST /api/process to upload PDF."
 
 
-@app.route("/api/process", methods=["POST"])
+@api.route("/api/health", methods=["GET"])
+def api_health():
+    # readiness: "warm" turns true once warm_up() has run in this worker
+    return jsonify({"success": True, "warm": STARTUP["warm"], "startup": STARTUP}), 200
+
+
+@api.route("/api/process", methods=["POST"])
 def api_process():
     # Verify file presence
     if "pdf_doc" not in request.files:
         return jsonify({"success": False, "error": "No file provided (field name must be 'pdf_doc')"}), 400
 
     doc = request.files["pdf_doc"]
-    filename = "file.pdf"
-    file_path = os.path.join(UPLOAD_PATH, filename)
 
     # Accept only per-request API key header (backwards compatibility)
     # Frontend should send header "x-openai-key": "<user-key>"
     azure_api_key = request.headers.get("x-openai-key") or request.form.get("openai_key")
 
-    try:
-        # Save uploaded file
-        doc.save(file_path)
-
-        # Read text from PDF
-        text = _read_file_from_path(file_path)
-
-        # Call ats_extractor:
-        # - we pass only azure_api_key here (if provided)
-        # - resumeparser.py will fall back to config.yaml/env for endpoint/deployment/api_version
-        parsed = ats_extractor(
-            resume_data=text,
-            azure_api_key=azure_api_key,
-            azure_endpoint=None,
-            deployment=None,
-            api_version=None,
-        )
-
-        # Ensure we return a JSON-compatible object
-        if isinstance(parsed, dict):
-            result = parsed
-        elif isinstance(parsed, str):
-            try:
-                result = json.loads(parsed)
-            except Exception:
-                result = {"raw_output": parsed}
-        else:
-            result = {"raw_output": str(parsed)}
+    # ?timing=1 adds a per-request breakdown (ms) to the response
+    want_timing = request.args.get("timing", "").lower() in ("1", "true", "yes")
+    # ?refresh=1 bypasses the result cache and the assessment cache (both entries are overwritten)
+    refresh = request.args.get("refresh", "").lower() in ("1", "true", "yes")
+    request_started = time.perf_counter()
+    timing = {}
 
-        return jsonify({"success": True, "result": result}), 200
+    spool = None
+    try:
+        # Hash + buffer the upload in memory (per request, so concurrent uploads can't collide)
+        started = time.perf_counter()
+        spool, doc_digest = spool_stream(doc.stream, UPLOAD_SPOOL_MAX_BYTES)
+        timing["upload_spool"] = _stage_done("upload_spool", started)
+
+        # Serve repeated uploads of the same document from cache
+        cache_key = _cache_key(doc_digest)
+        if RESULT_CACHE_ENABLED and not refresh:
+            started = time.perf_counter()
+            cached = _cache_get(cache_key)
+            timing["cache_lookup"] = round((time.perf_counter() - started) * 1000.0, 2)
+            if cached is not None:
+                body = {"success": True, "result": cached, "cached": True, "cache_key": cache_key}
+                if want_timing:
+                    body["timing"] = _timing_block(timing, request_started)
+                return jsonify(body), 200
+
+        # Read text from the spooled upload and parse it, unless the same document is already
+        # being processed: then wait for that run and share its result
+        result, shared = _inflight.do(_flight_key(cache_key, azure_api_key, refresh), _run_pipeline, spool,
+                                      doc_digest, cache_key, azure_api_key, refresh, doc.filename, ARCHIVE_UPLOADS)
+        if shared:
+            _count_coalesced("process", result)
+
+        body = {"success": True, "result": result, "cached": False, "coalesced": shared, "cache_key": cache_key}
+        if want_timing:
+            timing.update(result.get("metadata", {}).get("timings_ms", {}))
+            body["timing"] = _timing_block(timing, request_started)
+        return jsonify(body), 200
 
     except Exception as e:
         # Log full traceback to console for debugging
         traceback.print_exc()
         return jsonify({"success": False, "error": str(e)}), 500
 
+    finally:
+        if spool is not None:
+            spool.close()
+
+
+@api.route("/api/process/stream", methods=["POST"])
+def api_process_stream():
+    """
+    Same input as /api/process, but answers with Server-Sent Events, one per pipeline stage:
+    text_extracted, profile_parsed, experience_computed, assessment_ready, then done (or error).
+    ?partial=1 (or STREAM_EXTRACTION) streams the extraction completion and adds profile_partial
+    events, one per profile field / employment entry as the model generates it.
+    """
+    if "pdf_doc" not in request.files:
+        return jsonify({"success": False, "error": "No file provided (field name must be 'pdf_doc')"}), 400
+
+    # read everything we need from the request before the response starts streaming
+    pdf_bytes = request.files["pdf_doc"].read()
+    filename = request.files["pdf_doc"].filename
+    azure_api_key = request.headers.get("x-openai-key") or request.form.get("openai_key")
+    partial = request.args.get("partial", "").lower() in ("1", "true", "yes") or None
+
+    def generate():
+        doc_digest = hashlib.sha256(pdf_bytes).hexdigest()
+        cache_key = _cache_key(doc_digest)
+        cached = _cache_get(cache_key) if RESULT_CACHE_ENABLED else None
+        if cached is not None:
+            profile = {k: v for k, v in cached.items() if k not in ("experience_analysis", "assessment")}
+            yield _sse("profile_parsed", profile)
+            yield _sse("experience_computed", cached.get("experience_analysis"))
+            yield _sse("assessment_ready", cached.get("assessment"))
+            yield _sse("done", {"success": True, "result": cached, "cached": True, "cache_key": cache_key})
+            return
 
-def _read_file_from_path(path: str) -> str:
-    reader = PdfReader(path)
-    data = ""
-    for page_no in range(len(reader.pages)):
         try:
-            page = reader.pages[page_no]
-            text = page.extract_text() or ""
-            data += text + "\n"
-        except Exception:
-            # skip pages that fail extraction
+            text = _read_pdf_text(pdf_bytes)
+        except Exception as e:
+            yield _sse("error", {"success": False, "error": f"PDF read error: {e}"})
+            return
+        _archive_upload(doc_digest, pdf_bytes)
+        yield _sse("text_extracted", {"chars": len(text)})
+
+        try:
+            for stage, payload in ats_extractor_stages(text, azure_api_key=azure_api_key, stream=partial):
+                if stage == "error":
+                    yield _sse("error", {"success": False, "error": payload.get("error")})
+                    return
+                if stage == "done":
+                    if _is_cacheable(payload):
+                        _keep_result(cache_key, doc_digest, payload, filename)
+                    yield _sse("done", {"success": True, "result": payload, "cached": False, "cache_key": cache_key})
+                    return
+                yield _sse(stage, payload)
+        except Exception as e:
+            traceback.print_exc()
+            yield _sse("error", {"success": False, "error": str(e)})
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(generate(), mimetype="text/event-stream", headers=headers)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@api.route("/api/process/batch", methods=["POST"])
+def api_process_batch():
+    docs = request.files.getlist("pdf_docs") or request.files.getlist("pdf_doc")
+    if not docs:
+        return jsonify({"success": False, "error": "No files provided (field name must be 'pdf_docs')"}), 400
+    if len(docs) > BATCH_MAX_FILES:
+        return jsonify({"success": False, "error": f"Too many files ({len(docs)}); limit is {BATCH_MAX_FILES}"}), 400
+
+    azure_api_key = request.headers.get("x-openai-key") or request.form.get("openai_key")
+    pdf_pool, llm_pool = _get_pools()
+
+    # One slot per input file; filled out of order, returned in input order
+    results = [None] * len(docs)
+    cache_keys = [None] * len(docs)
+    doc_digests = [None] * len(docs)
+    text_futures = {}
+    for idx, doc in enumerate(docs):
+        pdf_bytes = doc.read()
+        doc_digest = doc_digests[idx] = hashlib.sha256(pdf_bytes).hexdigest()
+        cache_keys[idx] = _cache_key(doc_digest)
+        _archive_upload(doc_digest, pdf_bytes)
+        cached = _cache_get(cache_keys[idx]) if RESULT_CACHE_ENABLED else None
+        if cached is not None:
+            results[idx] = {"success": True, "result": cached, "cached": True}
             continue
-    return data
+        # whole documents are already spread across processes, so no page-level parallelism here
+        text_futures[pdf_pool.submit(read_pdf_bytes, pdf_bytes, normalization_enabled())] = idx
+
+    # Hand each document to the LLM pool as soon as its text is ready
+    llm_futures = {}
+    for fut in as_completed(text_futures):
+        idx = text_futures[fut]
+        try:
+            text = fut.result()
+        except Exception as e:
+            results[idx] = {"success": False, "error": f"PDF read error: {e}"}
+            continue
+        llm_futures[llm_pool.submit(_coalesced_parse, cache_keys[idx], text, azure_api_key)] = idx
+
+    for fut in as_completed(llm_futures):
+        idx = llm_futures[fut]
+        try:
+            result = fut.result()
+        except Exception as e:
+            traceback.print_exc()
+            results[idx] = {"success": False, "error": str(e)}
+            continue
+        if not _is_cacheable(result):
+            results[idx] = {"success": False, "error": result.get("error") or "Model did not return JSON", "result": result}
+            continue
+        _keep_result(cache_keys[idx], doc_digests[idx], result, docs[idx].filename)
+        results[idx] = {"success": True, "result": result, "cached": False}
+
+    for idx, doc in enumerate(docs):
+        results[idx]["filename"] = doc.filename
+        results[idx]["cache_key"] = cache_keys[idx]
+
+    return jsonify({
+        "success": True,
+        "count": len(results),
+        "failed": sum(1 for r in results if not r["success"]),
+        "results": results,
+    }), 200
+
+
+@api.route("/api/jobs", methods=["POST"])
+def api_jobs_submit():
+    if "pdf_doc" not in request.files:
+        return jsonify({"success": False, "error": "No file provided (field name must be 'pdf_doc')"}), 400
+
+    doc = request.files["pdf_doc"]
+    azure_api_key = request.headers.get("x-openai-key") or request.form.get("openai_key")
+    job_id = _get_job_queue().submit(doc.read(), filename=doc.filename, azure_api_key=azure_api_key)
+    return jsonify({"success": True, "job_id": job_id, "status": "queued"}), 202
+
+
+@api.route("/api/jobs/<job_id>", methods=["GET"])
+def api_jobs_status(job_id):
+    job = _get_job_queue().status(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, "job": job}), 200
+
+
+@api.route("/api/jobs/<job_id>/result", methods=["GET"])
+def api_jobs_result(job_id):
+    jobs = _get_job_queue()
+    job = jobs.status(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    if job["status"] == DONE:
+        return jsonify({"success": True, "status": job["status"], "result": jobs.result(job_id)}), 200
+    if job["status"] == FAILED:
+        return jsonify({"success": False, "status": job["status"], "error": job["error"], "result": jobs.result(job_id)}), 200
+    if job["status"] == CANCELLED:
+        return jsonify({"success": False, "status": job["status"], "error": "Job was cancelled"}), 410
+    # still queued / running
+    return jsonify({"success": True, "status": job["status"]}), 202
+
+
+@api.route("/api/jobs/<job_id>/cancel", methods=["POST"])
+def api_jobs_cancel(job_id):
+    status = _get_job_queue().cancel(job_id)
+    if status is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, "status": status}), 200
+
+
+@api.route("/api/cache/<cache_key>", methods=["DELETE"])
+def api_cache_invalidate(cache_key):
+    if not is_cache_key(cache_key):
+        return jsonify({"success": False, "error": "Invalid cache key"}), 400
+    removed = result_cache.invalidate(cache_key)
+    return jsonify({"success": True, "removed": removed}), 200
+
+
+@api.route("/api/cache", methods=["DELETE"])
+def api_cache_clear():
+    removed = result_cache.clear()
+    # ?assessments=0 keeps memoized assessments (they don't depend on extraction settings)
+    if request.args.get("assessments", "1").lower() not in ("0", "false", "no"):
+        removed += get_assessment_cache().clear()
+    return jsonify({"success": True, "removed": removed}), 200
+
+
+@api.route("/api/cache/assessments", methods=["DELETE"])
+def api_assessment_cache_clear():
+    removed = get_assessment_cache().clear()
+    return jsonify({"success": True, "removed": removed}), 200
+
+
+@api.route("/api/profiles", methods=["GET"])
+def api_profiles_query():
+    """
+    Stored profiles, filtered and paginated:
+    ?skill=spark&skill=python (all required), ?category=programming_scripting, ?min_years=5, ?max_years=,
+    ?employer=acme, ?title=data engineer, ?min_score=70, ?max_score=, ?sort=recent|score|years,
+    ?limit=50 (max 500), ?offset=0, ?full=1 (include each stored result).
+    """
+    args = request.args
+    try:
+        numbers = {name: float(args[name]) for name in ("min_years", "max_years", "min_score", "max_score")
+                   if args.get(name, "") != ""}
+        limit = min(max(int(args.get("limit", 50)), 1), 500)
+        offset = max(int(args.get("offset", 0)), 0)
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"Invalid number: {e}"}), 400
+    sort = args.get("sort", "recent")
+    if sort not in SORTS:
+        return jsonify({"success": False, "error": f"sort must be one of {list(SORTS)}"}), 400
+
+    found = _get_profile_store().query(
+        skills=[s for s in args.getlist("skill") if s.strip()],
+        category=args.get("category") or None,
+        employer=args.get("employer") or None,
+        title=args.get("title") or None,
+        sort=sort,
+        limit=limit,
+        offset=offset,
+        full=args.get("full", "").lower() in ("1", "true", "yes"),
+        **numbers
+    )
+    return jsonify({"success": True, **found}), 200
+
+
+@api.route("/api/profiles/<profile_id>", methods=["GET"])
+def api_profile_get(profile_id):
+    result = _get_profile_store().get(profile_id)
+    if result is None:
+        return jsonify({"success": False, "error": "Profile not found"}), 404
+    return jsonify({"success": True, "profile_id": profile_id, "result": result}), 200
+
+
+@api.route("/api/profiles/<profile_id>", methods=["DELETE"])
+def api_profile_delete(profile_id):
+    removed = _get_profile_store().delete(profile_id)
+    if _skill_index is not None:
+        _skill_index.remove(profile_id)
+    return jsonify({"success": True, "removed": removed}), 200
+
+
+@api.route("/api/rank", methods=["POST"])
+def api_rank():
+    """
+    Rank stored profiles against a job description; only the best few go to the model.
+    JSON (or form) body: job_description (required), top_n (default RANK_TOP_N, max 500),
+    assess_top (default RANK_ASSESS_TOP; 0 = ranking only), min_years, tenure_boost, refresh.
+    Optional "x-openai-key" header, as for /api/process.
+    """
+    body = request.get_json(silent=True) or request.form
+    job_description = (body.get("job_description") or "").strip()
+    if not job_description:
+        return jsonify({"success": False, "error": "job_description is required"}), 400
+    try:
+        top_n = min(max(int(body.get("top_n", RANK_TOP_N)), 1), 500)
+        assess_top = min(max(int(body.get("assess_top", RANK_ASSESS_TOP)), 0), top_n)
+        min_years = float(body["min_years"]) if body.get("min_years") not in (None, "") else None
+        tenure_boost = float(body.get("tenure_boost", RANK_TENURE_BOOST))
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": f"Invalid number: {e}"}), 400
+    refresh = str(body.get("refresh", "")).lower() in ("1", "true", "yes")
+    user_api_key = request.headers.get("x-openai-key") or body.get("openai_key")
+
+    started = time.perf_counter()
+    index = _get_skill_index()
+    synced = time.perf_counter()
+    ranked = index.rank(job_description, top_n=top_n, min_years=min_years, tenure_boost=tenure_boost)
+    ranked_at = time.perf_counter()
+
+    store = _get_profile_store()
+    summaries = store.summaries([r["doc_id"] for r in ranked])
+    candidates = []
+    for position, hit in enumerate(ranked, start=1):
+        item = summaries.get(hit["doc_id"]) or {"profile_id": hit["doc_id"]}
+        item.update(rank=position, score=hit["score"], matched_terms=hit["matched_terms"])
+        candidates.append(item)
+
+    shortlist = candidates[:assess_top]
+    if shortlist:
+        results = store.results([c["profile_id"] for c in shortlist])
+        _, llm_pool = _get_pools()
+        futures = {
+            llm_pool.submit(resumeparser.assess_fit, results[c["profile_id"]], job_description,
+                            azure_api_key=user_api_key, refresh=refresh): c
+            for c in shortlist if c["profile_id"] in results
+        }
+        for future in as_completed(futures):
+            futures[future]["fit"] = future.result()
+
+    timing = {
+        "sync_ms": round((synced - started) * 1000.0, 2),
+        "rank_ms": round((ranked_at - synced) * 1000.0, 2),
+        "assessment_ms": round((time.perf_counter() - ranked_at) * 1000.0, 2),
+    }
+    return jsonify({"success": True, "indexed": len(index), "assessed": len(shortlist),
+                    "candidates": candidates, "timing": timing}), 200
+
+
+def _parse_text(text: str, azure_api_key=None, refresh_assessment: bool = False) -> dict:
+    # Call ats_extractor:
+    # - we pass only azure_api_key here (if provided)
+    # - resumeparser.py will fall back to config.yaml/env for endpoint/deployment/api_version
+    parsed = ats_extractor(
+        resume_data=text,
+        azure_api_key=azure_api_key,
+        azure_endpoint=None,
+        deployment=None,
+        api_version=None,
+        refresh_assessment=refresh_assessment,
+    )
+
+    # Ensure we return a JSON-compatible object
+    if isinstance(parsed, dict):
+        return parsed
+    if isinstance(parsed, str):
+        try:
+            return json.loads(parsed)
+        except Exception:
+            return {"raw_output": parsed}
+    return {"raw_output": str(parsed)}
+
+
+def _coalesced_parse(cache_key: str, text: str, azure_api_key=None) -> dict:
+    """_parse_text() through the in-flight table (duplicates in a batch, or a batch racing a single upload)."""
+    result, shared = _inflight.do(_flight_key(cache_key, azure_api_key, False), _parse_text, text, azure_api_key)
+    if shared:
+        _count_coalesced("batch", result)
+    return result
+
+
+def _cache_key(doc_digest: str) -> str:
+    return make_cache_key_for_digest(doc_digest, resumeparser.DEFAULT_AZURE_DEPLOYMENT, pipeline_fingerprint())
+
+
+def _is_cacheable(result: dict) -> bool:
+    return "error" not in result and "raw_output" not in result
+
+
+def _process_pdf_bytes(pdf_bytes: bytes, azure_api_key=None) -> dict:
+    """Full pipeline for one in-memory PDF (cache lookup -> text -> ats_extractor -> cache store)."""
+    doc_digest = hashlib.sha256(pdf_bytes).hexdigest()
+    cache_key = _cache_key(doc_digest)
+    if RESULT_CACHE_ENABLED:
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
+    result, shared = _inflight.do(_flight_key(cache_key, azure_api_key, False), _run_pipeline, pdf_bytes,
+                                  doc_digest, cache_key, azure_api_key)
+    if shared:
+        _count_coalesced("job", result)
+    return result
+
+
+def _run_pipeline(source, doc_digest: str, cache_key: str, azure_api_key=None, refresh: bool = False,
+                  filename: Optional[str] = None, archive: bool = False) -> dict:
+    """Text -> ats_extractor -> cache store for a document the cache didn't have (bytes or a spooled upload)."""
+    started = time.perf_counter()
+    text = _read_pdf_text(source)
+    pdf_seconds = time.perf_counter() - started
+    if archive:
+        source.seek(0)
+        _archive_upload(doc_digest, source.read())
+    result = _parse_text(text, azure_api_key, refresh_assessment=refresh)
+    _add_pdf_timing(result, pdf_seconds)
+    # Only successful parses are worth keeping; errors should be retried next time
+    if _is_cacheable(result):
+        _keep_result(cache_key, doc_digest, result, filename)
+    return result
+
+
+def _flight_key(cache_key: str, azure_api_key=None, refresh: bool = False) -> tuple:
+    # per credential: a run that fails on one caller's key mustn't become another caller's error
+    key_digest = hashlib.sha256(azure_api_key.encode("utf-8")).hexdigest() if azure_api_key else None
+    return cache_key, key_digest, bool(refresh)
+
+
+def _count_coalesced(path: str, result: dict) -> None:
+    """Metrics for a request that shared another's run: the completions it would have made itself."""
+    COALESCED_REQUESTS.inc(path=path)
+    usage = (result.get("metadata") or {}).get("usage") or {}
+    LLM_CALLS_SAVED.inc(usage.get("calls", 0))
+    LLM_TOKENS_SAVED.inc(usage.get("total_tokens", 0))
+
+
+def _keep_result(cache_key: str, doc_digest: str, result: dict, filename: Optional[str] = None) -> None:
+    """Store a successful parse in the result cache and the profile store (whichever are enabled)."""
+    if RESULT_CACHE_ENABLED:
+        result_cache.set(cache_key, result)
+    if PROFILE_STORE_ENABLED:
+        try:
+            _get_profile_store().upsert(doc_digest, result, filename=filename)
+        except Exception as e:
+            # the request already has its result; a store failure shouldn't turn it into a 500
+            _logger.warning("profile store write failed for %s: %s", doc_digest, e)
+
+
+def _cache_get(cache_key: str):
+    """result_cache.get() that also feeds the cache hit-rate counter."""
+    cached = result_cache.get(cache_key)
+    CACHE_REQUESTS.inc(result="hit" if cached is not None else "miss")
+    return cached
+
+
+def _stage_done(stage: str, started: float) -> float:
+    """Observe a stage in cv_stage_seconds; returns its duration in ms for the timing block."""
+    seconds = time.perf_counter() - started
+    observe_stage(stage, seconds)
+    return round(seconds * 1000.0, 2)
+
+
+def _timing_block(timing: dict, request_started: float) -> dict:
+    block = {f"{stage}_ms": ms for stage, ms in timing.items()}
+    block["total_ms"] = round((time.perf_counter() - request_started) * 1000.0, 2)
+    return block
+
+
+def _add_pdf_timing(result: dict, seconds: float) -> None:
+    # resumeparser times its own stages; the PDF step happens here
+    timings = result.get("metadata", {}).get("timings_ms")
+    if isinstance(timings, dict):
+        timings["pdf_text"] = round(seconds * 1000.0, 2)
+
+
+def _read_pdf_text(source) -> str:
+    """Extract text (page-parallel for long documents) and log pages that are pathologically slow."""
+    started = time.perf_counter()
+    pdf = read_pdf(source, parallel_threshold=PDF_PARALLEL_PAGE_THRESHOLD, max_workers=PDF_PAGE_WORKERS)
+    _stage_done("pdf_text", started)
+    slow = [(page_no, round(secs, 3)) for page_no, secs in pdf.slowest_pages(5) if secs >= PDF_SLOW_PAGE_SECONDS]
+    if slow:
+        _logger.warning("Slow PDF pages (page, seconds) out of %d: %s", len(pdf.pages), slow)
+    return pdf.joined(page_breaks=normalization_enabled())
+
+
+def _read_file_from_path(path: str) -> str:
+    return _read_pdf_text(path)
+
+
+# -------------------------
+# App factory, warm-up, startup report
+# -------------------------
+# Filled in as the process starts; logged, served on /api/health and as cv_startup_seconds.
+STARTUP = {"pid": os.getpid(), "warm": False}
+_default_app = None
+_default_app_lock = threading.Lock()
+_warm_up_lock = threading.Lock()
+
+REGISTRY.gauge("cv_startup_seconds", "Time spent importing, building the app and warming up (this worker).",
+               lambda: {(phase,): STARTUP[f"{phase}_ms"] / 1000.0
+                        for phase in ("import", "create_app", "warm_up") if f"{phase}_ms" in STARTUP},
+               ("phase",))
+
+
+def create_app(config: Optional[dict] = None) -> Flask:
+    """
+    Application factory for pre-forking servers: gunicorn -w 4 'app:create_app()', or asgi.py.
+    config: setting overrides (same names as config.yaml / environment), applied before any setting is read.
+    Nothing heavy happens here: openai / httpx / pypdf / the tokenizer load in warm_up(), which
+    runs per the WARM_UP setting:
+        background   (default) in a thread, right away; serving starts without waiting for it
+        after_fork   in a thread in each forked worker (gunicorn --preload: the master stays lean)
+        sync         before create_app() returns
+        off          first request pays instead
+    """
+    started = time.perf_counter()
+    resumeparser.configure(config)
+    _load_settings()
+    flask_app = Flask(__name__)
+    CORS(flask_app)
+    flask_app.register_blueprint(api)
+    flask_app.extensions["cv_startup"] = STARTUP
+    STARTUP["create_app_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+    _logger.info("create_app: import %.1f ms, create_app %.1f ms (pid %d)",
+                 STARTUP["import_ms"], STARTUP["create_app_ms"], os.getpid())
+    _schedule_warm_up(str(get_setting("WARM_UP", "background")).lower())
+    return flask_app
+
+
+def warm_up() -> dict:
+    """
+    Load what the first request would otherwise pay for: pypdf (plus a one-page parse), the token
+    counter's encoding, and the pooled LLM client for the default credentials (imports openai /
+    httpx; no network call). Returns per-step ms, also kept in STARTUP["warm_up_steps_ms"].
+    """
+    import pdftext
+    import normalize
+    steps = {}
+    started = time.perf_counter()
+    with _warm_up_lock:
+        for name, fn in (("pdf", pdftext.warm_up), ("tokenizer", normalize.tokenizer_name),
+                         ("llm_client", resumeparser.warm_up_client)):
+            step_started = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                _logger.warning("warm-up step %s failed: %s", name, e)
+            steps[name] = round((time.perf_counter() - step_started) * 1000.0, 2)
+        STARTUP.update(warm_up_ms=round((time.perf_counter() - started) * 1000.0, 2), warm_up_steps_ms=steps,
+                       warm=True, pid=os.getpid())
+    _logger.info("warm-up done in %.1f ms %s (pid %d)", STARTUP["warm_up_ms"], steps, os.getpid())
+    return steps
+
+
+def _start_warm_up_thread() -> None:
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+
+def _after_fork_in_child() -> None:
+    STARTUP.update(pid=os.getpid(), warm=False)
+    STARTUP.pop("warm_up_ms", None)
+    _start_warm_up_thread()
+
+
+_fork_hook_registered = False
+
+
+def _schedule_warm_up(mode: str) -> None:
+    global _fork_hook_registered
+    if mode == "off":
+        return
+    if mode == "sync":
+        warm_up()
+    elif mode == "after_fork":
+        if hasattr(os, "register_at_fork") and not _fork_hook_registered:
+            os.register_at_fork(after_in_child=_after_fork_in_child)
+            _fork_hook_registered = True
+    else:
+        _start_warm_up_thread()
+
+
+def __getattr__(name):
+    # `from app import app` / `app:app` still work: the default app is built on first access
+    global _default_app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _default_app_lock:
+        if _default_app is None:
+            _default_app = create_app()
+        return _default_app
+
+
+STARTUP["import_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000.0, 2)
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8000, debug=True)
+    create_app().run(host="0.0.0.0", port=get_setting("PORT", 8000), debug=get_setting("FLASK_DEBUG", False))
@@ -0,0 +1,237 @@
+# asgi.py
+"""
+ASGI entry point with a native asyncio POST /api/process.
+
+Under Flask/WSGI every in-flight resume holds a worker thread for two network-bound
+completions, so concurrency is capped by the worker count. Here the upload is read and
+parsed as it arrives, the PDF text is extracted on the process pool, and the model calls
+go through resumeparser.ats_extractor_async, so one process keeps hundreds of resumes in
+flight on a single event loop (the shared RateLimiter still paces them against the quota).
+
+Same request / response as the Flask route: multipart field "pdf_doc", optional
+"x-openai-key" header (or "openai_key" form field), ?refresh=1; answers
+{"success": true, "result": {...}, "cached": bool, "coalesced": bool, "cache_key": "..."}.
+Results share the result cache with app.py; concurrent uploads of the same document share
+one pipeline run (singleflight.AsyncSingleFlight).
+
+Every other route is served by the Flask app (through asgiref's WsgiToAsgi, if installed).
+
+Run:
+    uvicorn asgi:app --host 0.0.0.0 --port 8000
+    uvicorn --factory 'asgi:create_app' --workers 4    (or create_app(config) from code)
+
+`app` builds the Flask side (app.create_app()) on its first call; create_app() does it up front.
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import traceback
+from urllib.parse import parse_qs
+
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import MultipartDecoder, Field, File, Data, Epilogue, NEED_DATA
+
+import app as flask_app
+from resumeparser import ats_extractor_async, get_setting, normalization_enabled
+from pdftext import read_pdf_bytes_async
+from singleflight import AsyncSingleFlight
+from metrics import HTTP_SECONDS, HTTP_REQUESTS, observe_stage
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except Exception:
+    WsgiToAsgi = None
+
+ASGI_MAX_UPLOAD_BYTES = 32 * 1024 * 1024
+# resumes being processed at once by this process (requests beyond it wait for a slot)
+ASGI_MAX_IN_FLIGHT = 512
+
+_flask = None
+_wsgi_app = None
+_in_flight = None
+_coalescer = AsyncSingleFlight()
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# -------------------------
+# ASGI plumbing
+# -------------------------
+def _cors_headers(scope) -> list:
+    """What flask_cors.CORS(app) adds with its defaults: the request's Origin echoed back (and Vary), else "*"."""
+    origin = dict(scope.get("headers") or []).get(b"origin")
+    if origin:
+        return [(b"access-control-allow-origin", origin), (b"vary", b"Origin")]
+    return [(b"access-control-allow-origin", b"*")]
+
+
+async def _send_json(send, scope, status: int, body: dict) -> None:
+    payload = json.dumps(body).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+                   + _cors_headers(scope),
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def _read_upload(scope, receive):
+    """
+    Decode the multipart body as it arrives.
+    Returns (pdf bytes, sha256 hex digest, upload filename, other form fields).
+    The PDF is hashed while it streams in, so nothing is read twice.
+    """
+    headers = dict(scope.get("headers") or [])
+    mimetype, options = parse_options_header(headers.get(b"content-type", b"").decode("latin-1"))
+    if mimetype != "multipart/form-data" or not options.get("boundary"):
+        raise _HTTPError(400, "Expected multipart/form-data with field 'pdf_doc'")
+
+    decoder = MultipartDecoder(options["boundary"].encode("latin-1"), max_form_memory_size=ASGI_MAX_UPLOAD_BYTES)
+    pdf, digest, fields = bytearray(), hashlib.sha256(), {}
+    current, is_file, found, received, filename = None, False, False, 0, None
+
+    def drain():
+        nonlocal current, is_file, found, filename
+        while True:
+            event = decoder.next_event()
+            if event is NEED_DATA or isinstance(event, Epilogue):
+                return
+            if isinstance(event, (Field, File)):
+                current, is_file = event.name, isinstance(event, File)
+                if is_file and current == "pdf_doc":
+                    found, filename = True, event.filename
+            elif isinstance(event, Data):
+                if is_file and current == "pdf_doc":
+                    pdf.extend(event.data)
+                    digest.update(event.data)
+                elif not is_file:
+                    fields[current] = fields.get(current, b"") + event.data
+
+    more = True
+    while more:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise _HTTPError(400, "Client disconnected")
+        chunk = message.get("body", b"")
+        received += len(chunk)
+        if received > ASGI_MAX_UPLOAD_BYTES:
+            raise _HTTPError(413, f"Upload larger than {ASGI_MAX_UPLOAD_BYTES} bytes")
+        more = message.get("more_body", False)
+        decoder.receive_data(chunk)
+        drain()
+    decoder.receive_data(None)
+    drain()
+
+    if not found:
+        raise _HTTPError(400, "No file provided (field name must be 'pdf_doc')")
+    return bytes(pdf), digest.hexdigest(), filename, {k: v.decode("utf-8", "replace") for k, v in fields.items()}
+
+
+# -------------------------
+# POST /api/process
+# -------------------------
+async def process_upload(pdf_bytes: bytes, doc_digest: str, azure_api_key=None, refresh: bool = False,
+                         filename=None) -> dict:
+    """Async twin of app._process_pdf_bytes: cache lookup -> PDF text (process pool) -> model -> cache store."""
+    loop = asyncio.get_running_loop()
+    cache_key = flask_app._cache_key(doc_digest)
+    if flask_app.RESULT_CACHE_ENABLED and not refresh:
+        # disk tier reads a file; keep it off the loop
+        cached = await loop.run_in_executor(None, flask_app._cache_get, cache_key)
+        if cached is not None:
+            return {"success": True, "result": cached, "cached": True, "cache_key": cache_key}
+
+    result, shared = await _coalescer.do(flask_app._flight_key(cache_key, azure_api_key, refresh), _run_pipeline,
+                                         pdf_bytes, doc_digest, cache_key, azure_api_key, refresh, filename)
+    if shared:
+        flask_app._count_coalesced("process_async", result)
+    return {"success": True, "result": result, "cached": False, "coalesced": shared, "cache_key": cache_key}
+
+
+async def _run_pipeline(pdf_bytes: bytes, doc_digest: str, cache_key: str, azure_api_key, refresh: bool,
+                        filename) -> dict:
+    loop = asyncio.get_running_loop()
+    pdf_pool, _ = flask_app._get_pools()
+    started = time.perf_counter()
+    text = await read_pdf_bytes_async(pdf_bytes, pdf_pool, page_breaks=normalization_enabled())
+    pdf_seconds = time.perf_counter() - started
+    observe_stage("pdf_text", pdf_seconds)
+    flask_app._archive_upload(doc_digest, pdf_bytes)
+
+    result = await ats_extractor_async(text, azure_api_key=azure_api_key, refresh_assessment=refresh)
+    flask_app._add_pdf_timing(result, pdf_seconds)
+    if flask_app._is_cacheable(result):
+        # cache and profile store both touch disk
+        await loop.run_in_executor(None, flask_app._keep_result, cache_key, doc_digest, result, filename)
+    return result
+
+
+async def _api_process(scope, receive, send) -> None:
+    global _in_flight
+    if _in_flight is None:
+        _in_flight = asyncio.Semaphore(ASGI_MAX_IN_FLIGHT)
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    refresh = (query.get("refresh") or [""])[0].lower() in ("1", "true", "yes")
+    headers = dict(scope.get("headers") or [])
+    started = time.perf_counter()
+    status = 200
+    try:
+        async with _in_flight:
+            pdf_bytes, doc_digest, filename, fields = await _read_upload(scope, receive)
+            api_key = headers.get(b"x-openai-key", b"").decode("latin-1") or fields.get("openai_key")
+            body = await process_upload(pdf_bytes, doc_digest, api_key or None, refresh, filename)
+    except _HTTPError as e:
+        status, body = e.status, {"success": False, "error": str(e)}
+    except Exception as e:
+        traceback.print_exc()
+        status, body = 500, {"success": False, "error": str(e)}
+    await _send_json(send, scope, status, body)
+    HTTP_SECONDS.observe(time.perf_counter() - started, endpoint="api_process_async")
+    HTTP_REQUESTS.inc(endpoint="api_process_async", status=status)
+
+
+# -------------------------
+# App factory
+# -------------------------
+def create_app(config=None):
+    """Build the Flask side via app.create_app(config), read the ASGI settings, return the ASGI callable."""
+    global _flask, _wsgi_app, ASGI_MAX_UPLOAD_BYTES, ASGI_MAX_IN_FLIGHT
+    _flask = flask_app.create_app(config)
+    _wsgi_app = WsgiToAsgi(_flask) if WsgiToAsgi is not None else None
+    ASGI_MAX_UPLOAD_BYTES = get_setting("ASGI_MAX_UPLOAD_BYTES", 32 * 1024 * 1024)
+    ASGI_MAX_IN_FLIGHT = get_setting("ASGI_MAX_IN_FLIGHT", 512)
+    return app
+
+
+async def app(scope, receive, send):
+    if _flask is None:
+        create_app()
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] == "http" and scope["path"] == "/api/process" and scope["method"] == "POST":
+        await _api_process(scope, receive, send)
+        return
+    if _wsgi_app is not None:
+        await _wsgi_app(scope, receive, send)
+        return
+    if scope["type"] == "http":
+        await _send_json(send, scope, 404, {"success": False,
+                                            "error": "Only POST /api/process is served here (install asgiref for the rest)"})
@@ -0,0 +1,419 @@
+# batchllm.py
+"""
+Batch inference for bulk runs: chat-completion requests go to the provider as one JSONL
+batch file instead of one interactive call each, so a backfill of thousands of CVs is a
+handful of batch jobs, billed at batch prices and outside the interactive RPM / TPM quota.
+resumeparser.ats_extractor_batch() / generate_assessments_batch() build the requests.
+
+File format (OpenAI / Azure OpenAI Batch API), one request per line:
+    {"custom_id": "...", "method": "POST", "url": "/chat/completions",
+     "body": {"model": <deployment>, "messages": [...], "temperature": 0.0, "max_tokens": N}}
+and one result per line, in any order:
+    {"custom_id": "...", "response": {"status_code": 200, "body": <chat completion>}, "error": null}
+
+Providers implement BatchProvider (submit / status / download / cancel):
+    AzureBatchProvider  Azure OpenAI Batch API over plain HTTP (files + batches endpoints; the
+                        deployment must be a Global-Batch deployment). The pinned openai SDK
+                        predates client.batches, so httpx is used directly.
+    LocalBatchProvider  runs the file through a chat client on a background thread (the mockllm
+                        client offline, or the interactive client) and writes the output file
+                        the way the service does. For tests and for deployments without batch.
+
+complete_all() drives a whole job: writes request files of at most BATCH_MAX_REQUESTS lines,
+submits them, polls until every batch is finished, then sends follow-up rounds for lines that
+were cut off at max_tokens (continued, as resumeparser._completion_text does) or failed with a
+retryable status. Each input file gets a <name>.batch.json manifest with its batch id and
+content hash, so a restarted run with the same requests polls the batches it already paid
+for instead of submitting them again.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from metrics import BATCH_REQUESTS, LLM_TOKENS, LLM_CONTINUATIONS
+
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+# 408: timeout; missing lines (expired / cancelled batches) are retried too
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+
+class BatchError(RuntimeError):
+    """A batch rejected or failed as a whole, or one the provider doesn't know."""
+
+
+class BatchResult(NamedTuple):
+    text: Optional[str]      # joined completion content (continuations included); None on error
+    usage: dict              # calls / prompt_tokens / completion_tokens / total_tokens / continuations / batch_retries
+    error: Optional[str]
+
+
+# -------------------------
+# Providers
+# -------------------------
+class BatchProvider(ABC):
+    """A batch service: takes a JSONL request file, eventually produces a JSONL result file."""
+
+    name = "base"
+    poll_seconds = 30.0
+
+    @abstractmethod
+    def submit(self, input_path: str) -> str:
+        """Upload the request file and start a batch; returns the batch id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> dict:
+        """{"status", "total", "completed", "failed", "errors"}; raises BatchError for an unknown id."""
+
+    @abstractmethod
+    def download(self, batch_id: str, output_path: str) -> None:
+        """Write every result line available for a finished batch (failed lines included) to output_path."""
+
+    @abstractmethod
+    def cancel(self, batch_id: str) -> None:
+        """Stop a batch; lines already answered stay downloadable."""
+
+
+class LocalBatchProvider(BatchProvider):
+    """
+    Executes batches in-process with `client` (anything with client.chat.completions.create),
+    `concurrency` lines at a time. Output files live in work_dir, so a finished batch can be
+    downloaded again after a restart; one still running when the process died is unknown.
+    """
+
+    name = "local"
+    poll_seconds = 0.2
+
+    def __init__(self, client, work_dir: Optional[str] = None, concurrency: int = 8):
+        self.client = client
+        self.work_dir = work_dir or os.path.join(tempfile.gettempdir(), "cv-local-batches")
+        self.concurrency = max(1, concurrency)
+        os.makedirs(self.work_dir, exist_ok=True)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _output_path(self, batch_id: str) -> str:
+        return os.path.join(self.work_dir, batch_id + ".output.jsonl")
+
+    def submit(self, input_path: str) -> str:
+        lines = read_jsonl(input_path)
+        batch_id = "local-" + uuid.uuid4().hex
+        job = {"status": "in_progress", "total": len(lines), "completed": 0, "failed": 0, "errors": [],
+               "cancel": threading.Event()}
+        with self._lock:
+            self._jobs[batch_id] = job
+        threading.Thread(target=self._run, args=(batch_id, job, lines), name=f"batch-{batch_id[-8:]}",
+                         daemon=True).start()
+        return batch_id
+
+    def _answer(self, job: dict, line: dict) -> Optional[dict]:
+        if job["cancel"].is_set():
+            return None
+        record = {"id": "req-" + uuid.uuid4().hex[:12], "custom_id": line.get("custom_id"), "error": None}
+        try:
+            resp = self.client.chat.completions.create(**line["body"])
+            record["response"] = {"status_code": 200, "body": completion_dict(resp)}
+        except Exception as e:
+            status = getattr(e, "status_code", None) or (408 if "timeout" in type(e).__name__.lower() else 500)
+            record["response"] = {"status_code": status, "body": {"error": {"message": str(e)}}}
+        with self._lock:
+            job["completed" if record["response"]["status_code"] == 200 else "failed"] += 1
+        return record
+
+    def _run(self, batch_id: str, job: dict, lines: list) -> None:
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="local-batch") as pool:
+                records = [r for r in pool.map(lambda line: self._answer(job, line), lines) if r is not None]
+            write_jsonl(self._output_path(batch_id), records)
+            status = "cancelled" if job["cancel"].is_set() else "completed"
+        except Exception as e:
+            job["errors"].append(str(e))
+            status = "failed"
+        with self._lock:
+            job["status"] = status
+
+    def status(self, batch_id: str) -> dict:
+        with self._lock:
+            job = self._jobs.get(batch_id)
+            if job is not None:
+                return {k: v for k, v in job.items() if k != "cancel"}
+        if os.path.exists(self._output_path(batch_id)):
+            records = read_jsonl(self._output_path(batch_id))
+            ok = sum(1 for r in records if (r.get("response") or {}).get("status_code") == 200)
+            return {"status": "completed", "total": len(records), "completed": ok, "failed": len(records) - ok,
+                    "errors": []}
+        raise BatchError(f"unknown local batch {batch_id}")
+
+    def download(self, batch_id: str, output_path: str) -> None:
+        source = self._output_path(batch_id)
+        write_jsonl(output_path, read_jsonl(source) if os.path.exists(source) else [])
+
+    def cancel(self, batch_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(batch_id)
+        if job is not None:
+            job["cancel"].set()
+
+
+class AzureBatchProvider(BatchProvider):
+    """
+    Azure OpenAI Batch API: POST /openai/files (purpose=batch), POST /openai/batches with
+    completion_window 24h, GET /openai/batches/{id}, GET /openai/files/{id}/content.
+    """
+
+    name = "azure"
+
+    def __init__(self, api_key: str, endpoint: str, api_version: str = "2024-10-21",
+                 poll_seconds: float = 30.0, timeout: float = 300.0):
+        try:
+            import httpx
+        except ImportError:
+            raise RuntimeError("AzureBatchProvider needs httpx (installed with the openai package)")
+        self.endpoint = endpoint.rstrip("/")
+        self.api_version = api_version
+        self.poll_seconds = poll_seconds
+        self._http = httpx.Client(headers={"api-key": api_key}, timeout=httpx.Timeout(timeout, connect=10.0))
+
+    def _call(self, method: str, path: str, **kwargs):
+        resp = self._http.request(method, f"{self.endpoint}/openai{path}", params={"api-version": self.api_version},
+                                  **kwargs)
+        if resp.status_code == 404:
+            raise BatchError(f"{method} {path}: not found")
+        if resp.status_code >= 400:
+            raise BatchError(f"{method} {path}: HTTP {resp.status_code} {resp.text[:500]}")
+        return resp
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as fh:
+            uploaded = self._call("POST", "/files", data={"purpose": "batch"},
+                                  files={"file": (os.path.basename(input_path), fh, "application/jsonl")}).json()
+        batch = self._call("POST", "/batches", json={
+            "input_file_id": uploaded["id"],
+            "endpoint": "/chat/completions",
+            "completion_window": "24h",
+        }).json()
+        return batch["id"]
+
+    def _batch(self, batch_id: str) -> dict:
+        return self._call("GET", f"/batches/{batch_id}").json()
+
+    def status(self, batch_id: str) -> dict:
+        batch = self._batch(batch_id)
+        counts = batch.get("request_counts") or {}
+        errors = [e.get("message") for e in ((batch.get("errors") or {}).get("data") or [])]
+        return {"status": batch.get("status"), "total": counts.get("total", 0), "completed": counts.get("completed", 0),
+                "failed": counts.get("failed", 0), "errors": errors}
+
+    def download(self, batch_id: str, output_path: str) -> None:
+        batch = self._batch(batch_id)
+        content = b""
+        # successful lines and failed lines come back in separate files
+        for key in ("output_file_id", "error_file_id"):
+            if batch.get(key):
+                part = self._call("GET", f"/files/{batch[key]}/content").content
+                content += part if part.endswith(b"\n") or not part else part + b"\n"
+        tmp = output_path + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(content)
+        os.replace(tmp, output_path)
+
+    def cancel(self, batch_id: str) -> None:
+        self._call("POST", f"/batches/{batch_id}/cancel")
+
+
+# -------------------------
+# Files
+# -------------------------
+def read_jsonl(path: str) -> list:
+    records = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+def write_jsonl(path: str, records) -> str:
+    """Write records (temp file + rename, so a file is whole or absent); returns the content's sha256."""
+    content = "".join(json.dumps(r, ensure_ascii=False, sort_keys=True) + "\n" for r in records).encode("utf-8")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(content)
+    os.replace(tmp, path)
+    return hashlib.sha256(content).hexdigest()
+
+
+def completion_dict(resp) -> dict:
+    """A chat completion as the batch service serializes it (SDK objects and mockllm namespaces alike)."""
+    dump = getattr(resp, "model_dump", None)
+    if dump is not None:
+        return dump()
+    usage = getattr(resp, "usage", None)
+    return {
+        "id": getattr(resp, "id", None),
+        "object": "chat.completion",
+        "model": getattr(resp, "model", None),
+        "choices": [{"index": getattr(c, "index", i), "finish_reason": getattr(c, "finish_reason", None),
+                     "message": {"role": "assistant", "content": getattr(c.message, "content", None)}}
+                    for i, c in enumerate(getattr(resp, "choices", None) or [])],
+        "usage": {k: getattr(usage, k, 0) or 0 for k in ("prompt_tokens", "completion_tokens", "total_tokens")},
+    }
+
+
+def request_line(custom_id: str, deployment: str, messages: list, max_tokens: int) -> dict:
+    return {"custom_id": custom_id, "method": "POST", "url": "/chat/completions",
+            "body": {"model": deployment, "messages": messages, "temperature": 0.0, "max_tokens": max_tokens}}
+
+
+# -------------------------
+# Submitting and waiting
+# -------------------------
+def _submit_or_resume(provider: BatchProvider, input_path: str, digest: str) -> str:
+    """The batch already submitted for this exact file (per its manifest), else a new one."""
+    manifest_path = input_path + ".batch.json"
+    try:
+        with open(manifest_path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        if manifest.get("provider") == provider.name and manifest.get("sha256") == digest:
+            if provider.status(manifest["batch_id"])["status"] not in ("failed", "cancelled"):
+                return manifest["batch_id"]
+    except (OSError, ValueError, KeyError, BatchError):
+        pass
+    batch_id = provider.submit(input_path)
+    with open(manifest_path, "w", encoding="utf-8") as fh:
+        json.dump({"provider": provider.name, "batch_id": batch_id, "sha256": digest, "submitted_at": time.time()}, fh)
+    return batch_id
+
+
+def _wait(provider: BatchProvider, batch_ids, poll_seconds: float, stop: Optional[threading.Event]) -> None:
+    remaining = set(batch_ids)
+    while True:
+        for batch_id in list(remaining):
+            status = provider.status(batch_id)
+            if status["status"] == "failed":
+                raise BatchError(f"batch {batch_id} failed: {'; '.join(map(str, status['errors'])) or 'no details'}")
+            if status["status"] in TERMINAL_STATUSES:
+                remaining.discard(batch_id)
+        if not remaining:
+            return
+        if stop is not None:
+            if stop.wait(poll_seconds):
+                raise BatchError("stopped while waiting for batches; run again with the same work_dir to resume")
+        else:
+            time.sleep(poll_seconds)
+
+
+def _run_round(provider: BatchProvider, lines: list, work_dir: str, name: str, poll_seconds: float,
+               max_requests: int, stop: Optional[threading.Event]) -> Dict[str, dict]:
+    """Submit `lines` as one or more batch files, wait for all of them; result records by custom_id."""
+    batch_ids = {}
+    for part, start in enumerate(range(0, len(lines), max_requests)):
+        path = os.path.join(work_dir, f"{name}-{part:03d}.jsonl")
+        digest = write_jsonl(path, lines[start:start + max_requests])
+        batch_ids[path] = _submit_or_resume(provider, path, digest)
+    _wait(provider, batch_ids.values(), poll_seconds, stop)
+    outputs = {}
+    for path, batch_id in batch_ids.items():
+        output_path = path[:-len(".jsonl")] + ".output.jsonl"
+        provider.download(batch_id, output_path)
+        for record in read_jsonl(output_path):
+            outputs[record.get("custom_id")] = record
+    return outputs
+
+
+def _record_outcome(record: Optional[dict]) -> Tuple[Optional[dict], Optional[str], bool]:
+    """(completion body, error message, retryable) for one output line (None: the line never ran)."""
+    if record is None:
+        return None, "no result in batch output", True
+    response = record.get("response") or {}
+    status_code = response.get("status_code")
+    body = response.get("body") or {}
+    if record.get("error") or status_code != 200:
+        error = record.get("error") or body.get("error") or {}
+        message = error.get("message") if isinstance(error, dict) else str(error)
+        return None, f"HTTP {status_code}: {message or 'batch request failed'}", status_code in RETRYABLE_STATUS_CODES
+    if not body.get("choices"):
+        return None, "batch response has no choices", False
+    return body, None, False
+
+
+def _add_tokens(usage: dict, body: dict) -> None:
+    resp_usage = body.get("usage") or {}
+    usage["calls"] = usage.get("calls", 0) + 1
+    for k in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        usage[k] = usage.get(k, 0) + (resp_usage.get(k) or 0)
+    LLM_TOKENS.inc(resp_usage.get("prompt_tokens") or 0, kind="prompt")
+    LLM_TOKENS.inc(resp_usage.get("completion_tokens") or 0, kind="completion")
+
+
+def complete_all(provider: BatchProvider, requests: Dict[str, Tuple[list, int]], deployment: str, work_dir: str,
+                 name: str = "batch", max_continuations: int = 2, continue_prompt: str = "Continue.",
+                 max_retries: int = 2, poll_seconds: Optional[float] = None, max_requests: int = 50000,
+                 stop: Optional[threading.Event] = None) -> Dict[str, BatchResult]:
+    """
+    Run every request ({custom_id: (messages, max_tokens)}) through the provider's batch API
+    and return {custom_id: BatchResult}. Replies cut off at max_tokens are continued (up to
+    max_continuations) and lines that failed with a retryable status are resent (up to
+    max_retries), each in a follow-up batch round. Raises BatchError if a batch fails as a
+    whole or `stop` is set while waiting.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    poll = provider.poll_seconds if poll_seconds is None else poll_seconds
+    state = {cid: {"messages": messages, "max_tokens": max_tokens, "parts": [], "retries": 0, "usage": {}}
+             for cid, (messages, max_tokens) in requests.items()}
+    results = {}
+    todo = list(requests)
+    round_no = 0
+    while todo:
+        lines = []
+        for cid in todo:
+            s = state[cid]
+            messages = s["messages"]
+            if s["parts"]:
+                messages = messages + [{"role": "assistant", "content": "".join(s["parts"])},
+                                       {"role": "user", "content": continue_prompt}]
+            lines.append(request_line(cid, deployment, messages, s["max_tokens"]))
+        outputs = _run_round(provider, lines, work_dir, f"{name}-r{round_no}", poll, max(1, max_requests), stop)
+
+        next_todo = []
+        for cid in todo:
+            s = state[cid]
+            body, error, retryable = _record_outcome(outputs.get(cid))
+            if error is not None:
+                if retryable and s["retries"] < max_retries:
+                    s["retries"] += 1
+                    s["usage"]["batch_retries"] = s["retries"]
+                    BATCH_REQUESTS.inc(outcome="retried")
+                    next_todo.append(cid)
+                else:
+                    BATCH_REQUESTS.inc(outcome="failed")
+                    results[cid] = BatchResult(None, s["usage"], error)
+                continue
+            _add_tokens(s["usage"], body)
+            choice = body["choices"][0]
+            content = (choice.get("message") or {}).get("content") or ""
+            if s["parts"]:
+                content = re.sub(r"^```(?:json)?\s*", "", content, flags=re.IGNORECASE)  # may re-open a fence
+            s["parts"].append(content)
+            if choice.get("finish_reason") == "length" and s["usage"].get("continuations", 0) < max_continuations:
+                s["usage"]["continuations"] = s["usage"].get("continuations", 0) + 1
+                LLM_CONTINUATIONS.inc()
+                BATCH_REQUESTS.inc(outcome="continued")
+                next_todo.append(cid)
+                continue
+            BATCH_REQUESTS.inc(outcome="completed")
+            results[cid] = BatchResult("".join(s["parts"]), s["usage"], None)
+        todo = next_todo
+        round_no += 1
+    return results
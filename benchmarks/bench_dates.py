@@ -0,0 +1,136 @@
+# benchmarks/bench_dates.py
+"""
+Microbenchmark for resume date parsing: the previous parse_fuzzy_date (two regex searches,
+month-name or bare-year only) against the compiled, memoized grammar in dateparse.py.
+
+The corpus is the start/end strings found in stored results (--results, any directory of
+cached result JSON such as __DATA__/cache), topped up with formats seen in real resumes
+until it has --size entries. Reports strings/second for the old parser, the grammar with a
+cold memo (cache cleared, every distinct string parsed once) and a warm memo, plus how many
+strings each one resolves to a month instead of None / January.
+
+Usage:
+    python benchmarks/bench_dates.py --size 200000
+    python benchmarks/bench_dates.py --results __DATA__/cache --size 500000
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dateparse import parse_date, parse_date_raw  # noqa: E402
+
+TEMPLATES = [
+    "{mon} {yyyy}", "{month} {yyyy}", "{mon}. {yyyy}", "{month}, {yyyy}", "{mon}-{yyyy}", "{mon}'{yy}",
+    "{mon} '{yy}", "{mm}/{yyyy}", "{m}/{yyyy}", "{mm}.{yyyy}", "{mm}-{yyyy}", "{yyyy}-{mm}", "{yyyy}/{mm}",
+    "{yyyy}-{mm}-01", "{yyyy}", "Q{q} {yyyy}", "{yyyy} Q{q}", "{season} {yyyy}", "{month} {d}, {yyyy}",
+    "Present", "present", "Current", "Currently working", "Till date", "Now", "Ongoing",
+    "{mon} {yyyy} - Present", "{mon} {yyyy} – {mon2} {yyyy2}", "{mm}/{yyyy} - {mm2}/{yyyy2}",
+]
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+               "October", "November", "December"]
+SEASONS = ["Spring", "Summer", "Fall", "Autumn", "Winter"]
+
+
+def legacy_parse_fuzzy_date(s):
+    """parse_fuzzy_date as it was before dateparse.py (baseline)."""
+    months = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+              'jul': 7, 'aug': 8, 'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+    if not s or not isinstance(s, str):
+        return None
+    s = s.strip()
+    low = s.lower()
+    if low in ("present", "current", "now"):
+        return date.today()
+    m = re.search(r"([A-Za-z]{3,9})\s+(\d{4})", s)
+    if m:
+        mon_num = months.get(m.group(1)[:3].lower())
+        if mon_num:
+            return date(int(m.group(2)), mon_num, 1)
+    m2 = re.search(r"(\d{4})", s)
+    if m2:
+        return date(int(m2.group(1)), 1, 1)
+    return None
+
+
+def synthetic(rng: random.Random) -> str:
+    month = rng.randint(1, 12)
+    month2 = rng.randint(1, 12)
+    year = rng.randint(1995, 2025)
+    name = MONTH_NAMES[month - 1]
+    return rng.choice(TEMPLATES).format(
+        mon=name[:3], month=name, mon2=MONTH_NAMES[month2 - 1][:3], yyyy=year, yyyy2=year + rng.randint(0, 5),
+        yy=f"{year % 100:02d}", mm=f"{month:02d}", mm2=f"{month2:02d}", m=month, q=rng.randint(1, 4),
+        season=rng.choice(SEASONS), d=rng.randint(1, 28),
+    )
+
+
+def harvest(directory: str):
+    """start/end strings from result JSON files (cache entries wrap the result in {"value": ...})."""
+    out = []
+    for root, _dirs, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(root, name), "r", encoding="utf-8") as fh:
+                    doc = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            result = doc.get("value", doc) if isinstance(doc, dict) else {}
+            for job in (result or {}).get("employment_details") or []:
+                for key in ("start_date", "end_date"):
+                    if isinstance(job.get(key), str) and job[key].strip():
+                        out.append(job[key])
+    return out
+
+
+def bench(fn, corpus):
+    started = time.perf_counter()
+    results = [fn(s) for s in corpus]
+    return time.perf_counter() - started, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume date parser throughput")
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--results", help="directory of stored result JSON to take real date strings from")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    real = harvest(args.results) if args.results else []
+    corpus = list(real)
+    while len(corpus) < args.size:
+        corpus.append(rng.choice(real) if real and rng.random() < 0.5 else synthetic(rng))
+    rng.shuffle(corpus)
+    today = date.today()
+
+    legacy_s, legacy = bench(legacy_parse_fuzzy_date, corpus)
+    parse_date_raw.cache_clear()
+    cold_s, grammar = bench(lambda s: parse_date(s, today), corpus)
+    warm_s, _ = bench(lambda s: parse_date(s, today), corpus)
+    info = parse_date_raw.cache_info()
+
+    def with_month(values):
+        return sum(1 for v in values if v is not None and v.month != 1)
+
+    n = len(corpus)
+    print(f"corpus={n} distinct={len(set(corpus))} harvested={len(real)}")
+    print(f"{'parser':<22}{'seconds':>10}{'strings/s':>14}{'non-Jan month':>16}{'None':>8}")
+    for label, secs, values in (("legacy", legacy_s, legacy), ("grammar (cold memo)", cold_s, grammar),
+                                ("grammar (warm memo)", warm_s, grammar)):
+        print(f"{label:<22}{secs:>10.3f}{n / secs:>14,.0f}{with_month(values):>16}"
+              f"{sum(v is None for v in values):>8}")
+    print(f"memo: hits={info.hits} misses={info.misses} size={info.currsize}/{info.maxsize}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_pipeline_modes.py
+"""
+Compare latency and token usage of the two pipeline modes:
+    two_call  - extraction completion, then assessment completion (default)
+    combined  - one completion returns profile + assessment
+
+Usage (uses AZURE_* credentials from config.yaml / environment):
+    python benchmarks/bench_pipeline_modes.py resume1.pdf resume2.txt --runs 3
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resumeparser import ats_extractor, normalization_enabled, PIPELINE_TWO_CALL, PIPELINE_COMBINED  # noqa: E402
+from pdftext import read_pdf  # noqa: E402
+
+
+def _load_text(path: str) -> str:
+    if path.lower().endswith(".pdf"):
+        return read_pdf(path).joined(page_breaks=normalization_enabled())
+    with open(path, "r", encoding="utf-8") as fh:
+        return fh.read()
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def run_mode(texts, mode: str, runs: int) -> dict:
+    latencies, prompt_tokens, completion_tokens, calls, errors = [], [], [], [], 0
+    last_error = None
+    for _ in range(runs):
+        for text in texts:
+            started = time.perf_counter()
+            result = ats_extractor(text, pipeline_mode=mode)
+            latencies.append(time.perf_counter() - started)
+            if "error" in result:
+                errors += 1
+                last_error = result["error"]
+                continue
+            usage = result.get("metadata", {}).get("usage", {})
+            prompt_tokens.append(usage.get("prompt_tokens", 0))
+            completion_tokens.append(usage.get("completion_tokens", 0))
+            calls.append(usage.get("calls", 0))
+    return {
+        "mode": mode,
+        "n": len(latencies),
+        "errors": errors,
+        "p50_s": _percentile(latencies, 50),
+        "p95_s": _percentile(latencies, 95),
+        "mean_s": statistics.mean(latencies),
+        "calls": statistics.mean(calls) if calls else 0,
+        "prompt_tokens": statistics.mean(prompt_tokens) if prompt_tokens else 0,
+        "completion_tokens": statistics.mean(completion_tokens) if completion_tokens else 0,
+        "last_error": last_error,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("files", nargs="+", help="resume PDFs or extracted .txt files")
+    ap.add_argument("--runs", type=int, default=1, help="passes over the file list per mode")
+    args = ap.parse_args(argv)
+
+    texts = [_load_text(p) for p in args.files]
+    rows = [run_mode(texts, mode, args.runs) for mode in (PIPELINE_TWO_CALL, PIPELINE_COMBINED)]
+
+    header = f"{'mode':<10} {'n':>4} {'err':>4} {'p50 s':>8} {'p95 s':>8} {'mean s':>8} {'calls':>6} {'prompt tok':>11} {'compl tok':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['mode']:<10} {r['n']:>4} {r['errors']:>4} {r['p50_s']:>8.2f} {r['p95_s']:>8.2f} {r['mean_s']:>8.2f} "
+              f"{r['calls']:>6.1f} {r['prompt_tokens']:>11.0f} {r['completion_tokens']:>10.0f}")
+    for r in rows:
+        if r["last_error"]:
+            print(f"[{r['mode']}] last error: {r['last_error']}", file=sys.stderr)
+    base, combined = rows
+    if base["mean_s"] and base["prompt_tokens"]:
+        print(f"\ncombined vs two_call: latency {combined['mean_s'] / base['mean_s']:.0%}, "
+              f"total tokens {(combined['prompt_tokens'] + combined['completion_tokens']) / (base['prompt_tokens'] + base['completion_tokens']):.0%}")
+
+
+if __name__ == "__main__":
+    main()
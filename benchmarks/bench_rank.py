@@ -0,0 +1,101 @@
+# benchmarks/bench_rank.py
+"""
+Build a skillindex.SkillIndex over synthetic profiles and time rank() against a few job
+descriptions (the /api/rank path minus the store lookups and LLM calls).
+
+Profiles look like ats_extractor results with experience_analysis.per_job: technical
+skills, soft skills, certifications and 3-8 jobs with titles, durations and a few
+responsibility bullets.
+
+Usage:
+    python benchmarks/bench_rank.py --profiles 100000 --repeat 20
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skillindex import SkillIndex  # noqa: E402
+from bench_store import SKILLS, EMPLOYERS, LEVELS, ROLES  # noqa: E402
+
+SOFT_SKILLS = ["Communication", "Leadership", "Mentoring", "Stakeholder management", "Problem solving",
+               "Teamwork", "Time management"]
+CERTIFICATIONS = ["AWS Certified Solutions Architect", "Azure Data Engineer Associate", "Google Professional Data Engineer",
+                  "Databricks Certified Associate", "Tableau Desktop Specialist", "Certified Kubernetes Administrator"]
+VERBS = ["Built", "Designed", "Migrated", "Maintained", "Optimized", "Automated", "Led", "Owned"]
+OBJECTS = ["batch pipelines", "streaming ingestion", "dashboards", "data models", "ETL jobs", "CI/CD workflows",
+           "a feature store", "reporting layer", "data quality checks", "REST services"]
+
+JOBS = {
+    "short": "Data Engineer with Spark and Airflow",
+    "typical": ("Senior Data Engineer. You will design and maintain batch and streaming pipelines on AWS using "
+                "Spark, Kafka and Airflow, model data in Snowflake, and build Power BI dashboards with analysts. "
+                "Python and SQL required; Terraform and Docker a plus. Mentoring junior engineers expected."),
+    "long": " ".join(["Lead Analytics Engineer owning the BI platform: dbt, Snowflake, Looker and Tableau, "
+                      "stakeholder management, data quality checks, CI/CD workflows, Python, SQL, Git."] * 4),
+}
+
+
+def _profile(rng: random.Random, i: int) -> dict:
+    jobs = []
+    for _ in range(rng.randint(3, 8)):
+        skills = [s for values in SKILLS.values() for s in rng.sample(values, 1)]
+        jobs.append({
+            "company": rng.choice(EMPLOYERS),
+            "job_title": rng.choice(LEVELS) + rng.choice(ROLES),
+            "duration_months": rng.randint(3, 72),
+            "responsibilities": [f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(skills)}"
+                                 for _ in range(rng.randint(1, 4))],
+        })
+    return {
+        "full_name": f"Candidate {i}",
+        "technical_skills": {cat: rng.sample(values, rng.randint(1, 4)) for cat, values in SKILLS.items()},
+        "soft_skills": rng.sample(SOFT_SKILLS, rng.randint(0, 3)),
+        "certifications": rng.sample(CERTIFICATIONS, rng.randint(0, 2)),
+        "employment_details": [{"company": j["company"], "job_title": j["job_title"]} for j in jobs],
+        "experience_analysis": {"per_job": jobs, "total_years_approx": round(sum(j["duration_months"] for j in jobs) / 12, 2)},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SkillIndex build + BM25 ranking latency")
+    parser.add_argument("--profiles", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    index = SkillIndex()
+    build = 0.0
+    for i in range(args.profiles):
+        profile = _profile(rng, i)
+        started = time.perf_counter()
+        index.add(f"{i:064x}", profile)
+        build += time.perf_counter() - started
+    print(f"indexed {len(index)} profiles in {build:.1f}s ({args.profiles / build:.0f}/s)")
+
+    # churn: re-index and delete 1% so the timings include dead slots
+    for i in range(0, args.profiles, 100):
+        index.add(f"{i:064x}", _profile(rng, i))
+        index.remove(f"{i + 1:064x}")
+
+    print(f"{'job description':<18}{'top':>6}{'p50 ms':>9}{'max ms':>9}   best match")
+    for label, text in JOBS.items():
+        for kwargs in (dict(), dict(tenure_boost=0.2, min_years=5)):
+            times = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                ranked = index.rank(text, top_n=args.top, **kwargs)
+                times.append((time.perf_counter() - started) * 1000.0)
+            name = label + (" +tenure" if kwargs else "")
+            print(f"{name:<18}{len(ranked):>6}{statistics.median(times):>9.2f}{max(times):>9.2f}   "
+                  f"{', '.join(ranked[0]['matched_terms'][:4]) if ranked else '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/bench_ratelimit.py
+"""
+Drive many concurrent chat completions at a quota-enforcing mock deployment and compare
+retry strategies:
+    none        one attempt, no retries (what the pipeline did before ratelimit.py)
+    naive       per-caller exponential backoff, ignores Retry-After and other callers
+    learned     ratelimit.RateLimiter with no configured limits (learns them from headers)
+    configured  ratelimit.RateLimiter with the deployment's RPM / TPM configured
+
+The mock (mockllm.QuotaWindow) behaves like Azure: sliding-window RPM / TPM, 429 with
+Retry-After when over quota, x-ratelimit-* headers on every answer. The window is scaled
+down (--window) so a run takes seconds instead of minutes.
+
+Usage:
+    python benchmarks/bench_ratelimit.py --calls 300 --concurrency 32 --rpm 60 --tpm 40000 --window 6
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mockllm import MockChatClient, quota_for  # noqa: E402
+from normalize import count_tokens  # noqa: E402
+from ratelimit import RateLimiter, is_retryable  # noqa: E402
+
+MAX_TOKENS = 500
+
+
+def _messages(rng: random.Random):
+    body = " ".join(rng.choice(["Python", "SQL", "Spark", "pipelines", "reporting", "Acme"]) for _ in range(300))
+    return [{"role": "system", "content": "You are a JSON-only extraction engine. {\"full_name\": \"\"}"},
+            {"role": "user", "content": "Resume Text:\n```\nJane Doe\n" + body + "\n```\n\nReturn JSON only."}]
+
+
+def _run(strategy: str, args) -> dict:
+    model = f"bench-{strategy}"
+    client = MockChatClient(latency=args.latency, rpm=args.rpm, tpm=args.tpm, quota_window_seconds=args.window)
+    quota = quota_for(model, args.rpm, args.tpm, args.window)
+    limiter = None
+    if strategy in ("learned", "configured"):
+        configured = strategy == "configured"
+        limiter = RateLimiter(rpm=args.rpm if configured else 0, tpm=args.tpm if configured else 0,
+                              max_retries=args.retries, backoff_base=args.window / 60.0,
+                              backoff_max=args.window, window_seconds=args.window)
+    rng = random.Random(0)
+    payloads = [_messages(rng) for _ in range(args.calls)]
+    ok, failed, attempts = [0], [0], [0]
+    lock = threading.Lock()
+
+    def send(messages):
+        with lock:
+            attempts[0] += 1
+        raw = client.chat.completions.with_raw_response.create(model=model, messages=messages, max_tokens=MAX_TOKENS)
+        return raw.parse(), raw.headers
+
+    def one(messages):
+        try:
+            if limiter is not None:
+                estimate = sum(count_tokens(m["content"]) for m in messages) + MAX_TOKENS
+                limiter.call(lambda: send(messages), estimate)
+            elif strategy == "naive":
+                for attempt in range(args.retries + 1):
+                    try:
+                        send(messages)
+                        break
+                    except Exception as e:
+                        if not is_retryable(e) or attempt == args.retries:
+                            raise
+                        time.sleep((args.window / 60.0) * (2 ** attempt))
+            else:
+                send(messages)
+            with lock:
+                ok[0] += 1
+        except Exception:
+            with lock:
+                failed[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, payloads))
+    wall = time.perf_counter() - started
+    return {"ok": ok[0], "failed": failed[0], "attempts": attempts[0], "rejected": quota.rejected if quota else 0,
+            "wall": wall}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rate-limit scheduler vs. quota-enforcing mock deployment")
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rpm", type=int, default=60, help="requests per window")
+    parser.add_argument("--tpm", type=int, default=40000, help="tokens per window")
+    parser.add_argument("--window", type=float, default=6.0, help="quota window in seconds (Azure: 60)")
+    parser.add_argument("--latency", default="uniform:0.05,0.2", help="MOCK_LLM_LATENCY spec")
+    parser.add_argument("--retries", type=int, default=8)
+    parser.add_argument("--strategies", default="none,naive,learned,configured")
+    args = parser.parse_args(argv)
+
+    print(f"calls={args.calls} concurrency={args.concurrency} quota={args.rpm} req / {args.tpm} tok "
+          f"per {args.window:g}s")
+    print(f"{'strategy':<12}{'ok':>6}{'failed':>8}{'attempts':>10}{'429s':>7}{'wall s':>9}{'ok/s':>8}")
+    for strategy in args.strategies.split(","):
+        r = _run(strategy.strip(), args)
+        print(f"{strategy:<12}{r['ok']:>6}{r['failed']:>8}{r['attempts']:>10}{r['rejected']:>7}"
+              f"{r['wall']:>9.2f}{r['ok'] / r['wall']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
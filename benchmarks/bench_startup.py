@@ -0,0 +1,72 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start cost of a worker: each run is a fresh interpreter that imports app.py, calls
+create_app(), then serves one request through the Flask test client. Reported per WARM_UP
+mode (see app.create_app):
+    import ms          `import app`
+    create_app ms      create_app() (includes warm_up() when WARM_UP=sync)
+    first request ms   GET /api/health, then a /api/process-sized import path (pdf + tokenizer)
+    warm ms            warm_up() duration when it ran (background / sync)
+    rss MB             peak resident memory of the worker
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --modes off,background,sync
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = r"""
+import os, json, time, resource
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+created = time.perf_counter()
+client = flask_app.test_client()
+client.get("/api/health")
+import pdftext, normalize
+pdftext.warm_up()
+normalize.tokenizer_name()
+served = time.perf_counter()
+while os.environ["WARM_UP"] == "background" and "warm_up_ms" not in app.STARTUP:
+    time.sleep(0.01)
+print(json.dumps({
+    "import_ms": (imported - started) * 1000.0,
+    "create_app_ms": (created - imported) * 1000.0,
+    "first_request_ms": (served - created) * 1000.0,
+    "warm_ms": app.STARTUP.get("warm_up_ms") or 0.0,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+}))
+"""
+
+
+def _run(mode: str) -> dict:
+    env = dict(os.environ, WARM_UP=mode, LLM_BACKEND=os.environ.get("LLM_BACKEND", "mock"))
+    out = subprocess.run([sys.executable, "-c", _CHILD], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker cold-start time and memory per WARM_UP mode")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", default="off,background,sync")
+    args = parser.parse_args(argv)
+
+    columns = ("import_ms", "create_app_ms", "first_request_ms", "warm_ms", "rss_mb")
+    print(f"{'mode':<12}" + "".join(f"{c:>18}" for c in columns) + "   (median of %d runs)" % args.runs)
+    for mode in args.modes.split(","):
+        mode = mode.strip()
+        runs = [_run(mode) for _ in range(args.runs)]
+        print(f"{mode:<12}" + "".join(f"{statistics.median(r[c] for r in runs):>18.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
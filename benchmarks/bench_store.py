@@ -0,0 +1,103 @@
+# benchmarks/bench_store.py
+"""
+Fill a resumestore.ResumeStore with synthetic profiles, reopen it (index rebuild from
+disk, as after a restart) and time the /api/profiles queries.
+
+Profiles look like ats_extractor results: technical_skills in the four schema categories,
+3-8 jobs with employer / title, experience_analysis.total_years_approx and
+assessment.overall_score. The database is written to a temp dir and removed afterwards.
+
+Usage:
+    python benchmarks/bench_store.py --profiles 100000 --repeat 20
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resumestore import ResumeStore  # noqa: E402
+
+SKILLS = {
+    "programming_scripting": ["Python", "Java", "Scala", "SQL", "Go", "R", "C++", "JavaScript", "Bash"],
+    "databases_data_management": ["PostgreSQL", "MySQL", "MongoDB", "Snowflake", "Redshift", "BigQuery", "Cassandra"],
+    "analytics_bi": ["Tableau", "Power BI", "Looker", "Excel", "Pandas", "Spark", "dbt"],
+    "tools_technologies": ["Docker", "Kubernetes", "Airflow", "Kafka", "Terraform", "AWS", "Azure", "Git"],
+}
+EMPLOYERS = ["Acme Corp", "Globex", "Initech", "Umbrella", "Stark Industries", "Wayne Enterprises", "Hooli",
+             "Pied Piper", "Vandelay Industries", "Soylent", "Tyrell Corporation", "Cyberdyne Systems"]
+LEVELS = ["", "Junior ", "Senior ", "Lead ", "Principal "]
+ROLES = ["Data Engineer", "Data Analyst", "Software Engineer", "BI Developer", "Data Scientist", "ML Engineer",
+         "Backend Developer", "Analytics Engineer"]
+
+QUERIES = [
+    ("skill=spark", dict(skills=["spark"])),
+    ("skill=spark&min_years=5", dict(skills=["spark"], min_years=5)),
+    ("skill=python&skill=kafka&min_score=70", dict(skills=["python", "kafka"], min_score=70)),
+    ("category=analytics_bi&sort=score", dict(category="analytics_bi", sort="score")),
+    ("employer=globex&title=data engineer", dict(employer="globex", title="data engineer")),
+    ("title=senior&min_years=10&sort=years", dict(title="senior", min_years=10, sort="years")),
+    ("skill=airflow&offset=5000", dict(skills=["airflow"], offset=5000)),
+    ("(no filter)", dict()),
+]
+
+
+def _profile(rng: random.Random, i: int) -> dict:
+    jobs = [{"company": rng.choice(EMPLOYERS), "job_title": rng.choice(LEVELS) + rng.choice(ROLES),
+             "start_date": "Jan 2018", "end_date": "Present", "location": None, "responsibilities": []}
+            for _ in range(rng.randint(3, 8))]
+    return {
+        "full_name": f"Candidate {i}",
+        "email": f"candidate{i}@example.com",
+        "employment_details": jobs,
+        "technical_skills": {cat: rng.sample(values, rng.randint(1, 4)) for cat, values in SKILLS.items()},
+        "soft_skills": [],
+        "education": [],
+        "experience_analysis": {"total_years_approx": round(rng.uniform(0, 25), 2)},
+        "assessment": {"overall_score": rng.randint(20, 95)},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ResumeStore fill + query latency")
+    parser.add_argument("--profiles", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResumeStore(os.path.join(tmp, "profiles.db"))
+        started = time.perf_counter()
+        for base in range(0, args.profiles, args.batch):
+            store.upsert_many((f"{i:064x}", _profile(rng, i), f"cv_{i}.pdf")
+                              for i in range(base, min(base + args.batch, args.profiles)))
+        fill = time.perf_counter() - started
+        print(f"stored {store.count()} profiles in {fill:.1f}s ({args.profiles / fill:.0f}/s), "
+              f"db {os.path.getsize(store.db_path) / 1e6:.0f} MB")
+
+        # a restarted worker builds the in-memory index on its first query
+        store.close()
+        store = ResumeStore(store.db_path)
+        started = time.perf_counter()
+        store.query(limit=1)
+        print(f"index built from disk in {time.perf_counter() - started:.2f}s")
+
+        print(f"{'query':<42}{'total':>8}{'p50 ms':>9}{'max ms':>9}")
+        for label, kwargs in QUERIES:
+            times = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                found = store.query(limit=50, **kwargs)
+                times.append((time.perf_counter() - started) * 1000.0)
+            print(f"{label:<42}{found['total']:>8}{statistics.median(times):>9.2f}{max(times):>9.2f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# benchmarks/loadtest.py
+"""
+End-to-end load test for POST /api/process.
+
+Generates synthetic resume PDFs (random names, jobs, date ranges, skills) and fires them
+at the API with N concurrent clients, then reports throughput, end-to-end latency
+percentiles, per-stage latency (from result.metadata.timings_ms) and errors.
+
+Two targets:
+    in-process (default)  Flask test client, LLM_BACKEND=mock, result cache, profile store and
+                          on-disk assessment cache off (no synthetic data left in __DATA__). No network,
+                          no Azure credentials; latency/errors come from the MOCK_LLM_* settings.
+    --url http://host:8000  a running server (whatever backend it was started with).
+
+Usage:
+    python benchmarks/loadtest.py --requests 200 --concurrency 16 --mock-latency lognormal:0.8,0.4
+    python benchmarks/loadtest.py --url http://localhost:8000 --requests 50 --concurrency 4
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+import urllib.request
+import urllib.error
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIRST_NAMES = ["Jane", "John", "Priya", "Wei", "Carlos", "Fatima", "Olga", "Kwame", "Aiko", "Liam"]
+LAST_NAMES = ["Doe", "Smith", "Sharma", "Chen", "Garcia", "Khan", "Ivanova", "Mensah", "Tanaka", "Murphy"]
+COMPANIES = ["Acme Corp", "Globex Inc", "Initech", "Umbrella Analytics", "Stark Industries", "Wayne Data",
+             "Hooli", "Vandelay Imports", "Soylent Systems", "Cyberdyne"]
+TITLES = ["Data Engineer", "Senior Data Engineer", "Data Analyst", "BI Developer", "Analytics Engineer",
+          "Software Engineer", "Machine Learning Engineer", "Database Administrator"]
+SKILLS = ["Python", "SQL", "Spark", "Airflow", "Kafka", "Snowflake", "Tableau", "Power BI", "Docker", "AWS",
+          "PostgreSQL", "dbt", "Scala", "Excel", "Kubernetes", "BigQuery"]
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+# -------------------------
+# Synthetic resumes
+# -------------------------
+def _fmt_date(rng: random.Random, year: int, month: int) -> str:
+    style = rng.choice(("name", "slash", "iso"))
+    if style == "name":
+        return f"{MONTH_NAMES[month - 1]} {year}"
+    if style == "slash":
+        return f"{month:02d}/{year}"
+    return f"{year}-{month:02d}"
+
+
+def synthetic_resume_lines(rng: random.Random):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [f"{first} {last}", f"{first.lower()}.{last.lower()}@example.com | +1 555 {rng.randint(100, 999)} "
+             f"{rng.randint(1000, 9999)}", "", "SUMMARY", "Data professional with a focus on pipelines and reporting.",
+             "", "EXPERIENCE"]
+    year, month = 2025, rng.randint(1, 12)
+    for i in range(rng.randint(1, 5)):
+        end = "Present" if i == 0 else _fmt_date(rng, year, month)
+        span = rng.randint(8, 48)
+        total = year * 12 + month - 1 - span
+        year, month = total // 12, total % 12 + 1
+        start = _fmt_date(rng, year, month)
+        lines.append(f"{rng.choice(COMPANIES)} - {rng.choice(TITLES)}, {start} - {end}")
+        for _ in range(rng.randint(2, 4)):
+            lines.append(f"- Built {rng.choice(SKILLS)} jobs processing {rng.randint(1, 900)}M rows a day")
+        total -= rng.randint(0, 6)  # occasional gap between jobs
+        year, month = total // 12, total % 12 + 1
+    lines += ["", "SKILLS", ", ".join(rng.sample(SKILLS, rng.randint(4, 9))), "", "EDUCATION",
+              f"B.Sc. Computer Science, State University, {year - 4} - {year}"]
+    return lines
+
+
+def make_pdf(lines, lines_per_page: int = 50) -> bytes:
+    """Minimal single-font PDF writer (enough for pypdf to extract the text back)."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    kid_ids = [4 + 2 * i for i in range(len(pages))]
+    objs = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{k} 0 R" for k in kid_ids), len(pages))).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, page in enumerate(pages):
+        content_id = 5 + 2 * i
+        objs.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                     f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>").encode())
+        escaped = (l.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for l in page)
+        body = ("BT /F1 10 Tf 50 760 Td 14 TL\n" + "".join(f"({l}) '\n" for l in escaped) + "ET").encode("latin-1")
+        objs.append(b"<< /Length %d >>\nstream\n" % len(body) + body + b"\nendstream")
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objs):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n" % (i + 1) + obj + b"\nendobj\n"
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    data += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return data
+
+
+# -------------------------
+# Targets
+# -------------------------
+def _in_process_sender():
+    # must be set before app / resumeparser are imported
+    os.environ.setdefault("LLM_BACKEND", "mock")
+    os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+    import io
+    from app import create_app
+
+    # synthetic mock profiles must not land in the real __DATA__/profiles.db (they would show up in
+    # /api/profiles and /api/rank) or in the on-disk assessment cache
+    flask_app = create_app({"PROFILE_STORE_ENABLED": False, "ASSESSMENT_CACHE_DISK": False})
+    local = threading.local()
+
+    def send(pdf_bytes: bytes, filename: str):
+        if not hasattr(local, "client"):
+            local.client = flask_app.test_client()
+        resp = local.client.post("/api/process", data={"pdf_doc": (io.BytesIO(pdf_bytes), filename)},
+                                 content_type="multipart/form-data")
+        return resp.status_code, resp.get_json(silent=True) or {}
+
+    return send
+
+
+def _http_sender(url: str, api_key=None, timeout: float = 300.0):
+    endpoint = url.rstrip("/") + "/api/process"
+
+    def send(pdf_bytes: bytes, filename: str):
+        boundary = uuid.uuid4().hex
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"pdf_doc\"; filename=\"{filename}\"\r\n"
+                f"Content-Type: application/pdf\r\n\r\n").encode() + pdf_bytes + f"\r\n--{boundary}--\r\n".encode()
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        if api_key:
+            headers["x-openai-key"] = api_key
+        req = urllib.request.Request(endpoint, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return resp.status, json.loads(resp.read() or b"{}")
+        except urllib.error.HTTPError as e:
+            try:
+                return e.code, json.loads(e.read() or b"{}")
+            except ValueError:
+                return e.code, {}
+
+    return send
+
+
+# -------------------------
+# Runner / report
+# -------------------------
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def run(send, docs, concurrency: int) -> dict:
+    latencies, stage_ms, errors = [], {}, Counter()
+    lock = threading.Lock()
+
+    def one(i):
+        pdf_bytes = docs[i % len(docs)]
+        started = time.perf_counter()
+        try:
+            status, body = send(pdf_bytes, f"resume_{i}.pdf")
+        except Exception as e:
+            status, body = None, {"error": f"{type(e).__name__}: {e}"}
+        elapsed = time.perf_counter() - started
+        result = body.get("result") or {}
+        with lock:
+            latencies.append(elapsed)
+            if status != 200 or not body.get("success"):
+                errors[f"HTTP {status}: {str(body.get('error'))[:80]}"] += 1
+            elif result.get("error"):
+                errors[f"pipeline: {str(result.get('error'))[:80]}"] += 1
+            for stage, ms in (result.get("metadata") or {}).get("timings_ms", {}).items():
+                stage_ms.setdefault(stage, []).append(ms)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(len(docs))))
+    wall = time.perf_counter() - started
+    return {"wall": wall, "latencies": latencies, "stage_ms": stage_ms, "errors": errors}
+
+
+def report(stats: dict, concurrency: int) -> None:
+    lat = [x * 1000.0 for x in stats["latencies"]]
+    n = len(lat)
+    n_err = sum(stats["errors"].values())
+    print(f"requests={n} concurrency={concurrency} wall={stats['wall']:.2f}s "
+          f"throughput={n / stats['wall']:.2f} req/s errors={n_err} ({100.0 * n_err / max(n, 1):.1f}%)")
+    print(f"{'stage':<22}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = [("end_to_end", lat)] + sorted(stats["stage_ms"].items())
+    for name, values in rows:
+        print(f"{name:<22}{len(values):>6}{_percentile(values, 50):>10.1f}{_percentile(values, 95):>10.1f}"
+              f"{_percentile(values, 99):>10.1f}")
+    for message, count in stats["errors"].most_common(10):
+        print(f"  {count:>5} x {message}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test POST /api/process with synthetic resumes")
+    parser.add_argument("--url", help="base URL of a running server (default: in-process with the mock LLM)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--unique", type=int, default=0, help="distinct synthetic resumes (default: one per request)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--api-key", help="sent as x-openai-key (--url only)")
+    parser.add_argument("--mock-latency", help="MOCK_LLM_LATENCY for the in-process target, e.g. lognormal:0.8,0.4")
+    parser.add_argument("--mock-errors", help="MOCK_LLM_ERRORS for the in-process target, e.g. 429:0.02,500:0.01")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    docs = [make_pdf(synthetic_resume_lines(rng)) for _ in range(args.unique or args.requests)]
+    docs = [docs[i % len(docs)] for i in range(args.requests)]
+
+    if args.url:
+        send = _http_sender(args.url, args.api_key)
+    else:
+        if args.mock_latency:
+            os.environ["MOCK_LLM_LATENCY"] = args.mock_latency
+        if args.mock_errors:
+            os.environ["MOCK_LLM_ERRORS"] = args.mock_errors
+        os.environ.setdefault("MOCK_LLM_SEED", str(args.seed))
+        send = _in_process_sender()
+
+    report(run(send, docs, args.concurrency), args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
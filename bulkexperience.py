@@ -0,0 +1,138 @@
+# bulkexperience.py
+"""
+Experience analysis over many candidates at once.
+
+compute_experience_analysis() in resumeparser.py handles one employment_details list
+per call in pure Python. bulk_experience_analysis() takes thousands of them (e.g. the
+whole result archive after the tenure rules change) and does the arithmetic on NumPy
+datetime64 arrays:
+- per-job months: datetime64[M] differences, clipped at 0
+- merged coverage: one global sort by (candidate, start) and a running maximum of
+  end dates, with every candidate shifted into its own day range so the maximum never
+  leaks across candidates
+- gaps / overlaps between a candidate's jobs fall out of the same merge
+
+Dates are still parsed with resumeparser's parser (once per distinct raw string), so
+every per_job / total_* value is identical to the scalar analysis.
+"""
+
+from datetime import date
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from resumeparser import job_date_range_raw, parse_job_dates, per_job_entry, experience_totals
+
+
+def _parse_all(employment_lists, today: date):
+    """Flatten to per-job rows; parse each distinct (start_raw, end_raw) pair once."""
+    memo = {}
+    rows = []  # (candidate_idx, job, start_raw, end_raw, start_dt, end_dt)
+    for idx, jobs in enumerate(employment_lists):
+        for job in jobs or []:
+            start_raw, end_raw = job_date_range_raw(job)
+            key = (start_raw, end_raw)
+            try:
+                dates = memo[key]
+            except (KeyError, TypeError):
+                dates = parse_job_dates(start_raw, end_raw, today)
+                try:
+                    memo[key] = dates
+                except TypeError:
+                    pass  # unhashable raw values (model returned a list/dict): parse, don't memoize
+            rows.append((idx, job, start_raw, end_raw) + dates)
+    return rows
+
+
+def merge_coverage(owner: np.ndarray, start_days: np.ndarray, end_days: np.ndarray, n_owners: int):
+    """
+    Vectorized interval union per owner. Inputs are parallel int64 arrays (days since epoch),
+    intervals with start > end must already be removed. Touching intervals (start == previous end)
+    merge, as in merge_intervals_and_total_days().
+    Returns (covered_days, gap_days, n_blocks), one entry per owner.
+    """
+    covered = np.zeros(n_owners, dtype=np.int64)
+    gaps = np.zeros(n_owners, dtype=np.int64)
+    n_blocks = np.zeros(n_owners, dtype=np.int64)
+    if owner.size == 0:
+        return covered, gaps, n_blocks
+
+    order = np.lexsort((start_days, owner))
+    owner, start_days, end_days = owner[order], start_days[order], end_days[order]
+
+    # shift each owner into a disjoint range so a single global running max stays per-owner
+    base = start_days.min()
+    span = int(end_days.max() - base) + 2
+    offset = owner.astype(np.int64) * span - base
+    s = start_days + offset
+    e = end_days + offset
+    running_end = np.maximum.accumulate(e)
+
+    new_block = np.ones(s.size, dtype=bool)
+    new_block[1:] = s[1:] > running_end[:-1]
+    block_first = np.flatnonzero(new_block)
+    block_last = np.append(block_first[1:] - 1, s.size - 1)
+    block_owner = owner[block_first]
+    block_start = s[block_first]
+    block_end = running_end[block_last]
+
+    covered = np.bincount(block_owner, weights=block_end - block_start, minlength=n_owners).astype(np.int64)
+    n_blocks = np.bincount(block_owner, minlength=n_owners).astype(np.int64)
+    same_owner = block_owner[1:] == block_owner[:-1]
+    gap_lengths = (block_start[1:] - block_end[:-1])[same_owner]
+    gaps = np.bincount(block_owner[1:][same_owner], weights=gap_lengths, minlength=n_owners).astype(np.int64)
+    return covered, gaps, n_blocks
+
+
+def bulk_experience_analysis(employment_lists: Iterable, with_gaps: bool = False,
+                             today: Optional[date] = None) -> List[dict]:
+    """
+    One experience_analysis dict per employment_details list, in input order, each equal to
+    compute_experience_analysis(list, today). with_gaps=True adds:
+        gap_days      days between merged employment blocks
+        overlap_days  days counted by more than one job (sum of job lengths - covered days)
+        job_blocks    number of merged employment blocks
+    """
+    employment_lists = list(employment_lists)
+    n = len(employment_lists)
+    rows = _parse_all(employment_lists, today or date.today())
+
+    both = np.array([r[4] is not None and r[5] is not None for r in rows], dtype=bool)
+    owner_all = np.array([r[0] for r in rows], dtype=np.int64)
+    start_m = np.array([r[4] if ok else "NaT" for r, ok in zip(rows, both)], dtype="datetime64[M]")
+    end_m = np.array([r[5] if ok else "NaT" for r, ok in zip(rows, both)], dtype="datetime64[M]")
+    start_d = np.array([r[4] if ok else "NaT" for r, ok in zip(rows, both)], dtype="datetime64[D]")
+    end_d = np.array([r[5] if ok else "NaT" for r, ok in zip(rows, both)], dtype="datetime64[D]")
+
+    # months_between(): calendar-month difference, never negative
+    months = np.zeros(len(rows), dtype=np.int64)
+    if both.any():
+        months[both] = np.maximum((end_m[both] - start_m[both]).astype(np.int64), 0)
+
+    # merge_intervals_and_total_days() keeps only well-ordered intervals
+    valid = both.copy()
+    valid[both] = start_d[both] <= end_d[both]
+    s_days = start_d[valid].astype(np.int64)
+    e_days = end_d[valid].astype(np.int64)
+    covered, gaps, n_blocks = merge_coverage(owner_all[valid], s_days, e_days, n)
+    job_days = np.bincount(owner_all[valid], weights=e_days - s_days, minlength=n).astype(np.int64)
+
+    per_job = [[] for _ in range(n)]
+    for (idx, job, start_raw, end_raw, start_dt, end_dt), ok, m in zip(rows, both, months.tolist()):
+        per_job[idx].append(per_job_entry(job, start_raw, end_raw, start_dt, end_dt, m if ok else None))
+
+    out = []
+    for idx in range(n):
+        analysis = {"per_job": per_job[idx]}
+        analysis.update(experience_totals(int(covered[idx])))
+        if with_gaps:
+            analysis["gap_days"] = int(gaps[idx])
+            analysis["overlap_days"] = int(job_days[idx] - covered[idx])
+            analysis["job_blocks"] = int(n_blocks[idx])
+        out.append(analysis)
+    return out
+
+
+def bulk_from_results(results: Iterable[dict], with_gaps: bool = False, today: Optional[date] = None) -> List[dict]:
+    """Convenience wrapper for stored ats_extractor results (reads each result's employment_details)."""
+    return bulk_experience_analysis(((r or {}).get("employment_details") or [] for r in results), with_gaps, today)
@@ -0,0 +1,153 @@
+# clientpool.py
+"""
+Thread-safe registry of long-lived API clients.
+
+Building an AzureOpenAI client per request means a fresh HTTP connection pool
+(and TLS handshake) every time. The registry keeps one client per key, reuses it
+across requests, and bounds the cost of doing so:
+- at most `max_size` clients (least recently used is evicted first)
+- clients unused for `idle_seconds` are evicted
+- a client is only closed once no request is still using it (leases are ref-counted)
+Async clients (AsyncAzureOpenAI) work too: their close() coroutine is scheduled on the running loop.
+"""
+
+import time
+import inspect
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Hashable
+
+
+class _Entry:
+    __slots__ = ("client", "leases", "last_used", "retired")
+
+    def __init__(self, client):
+        self.client = client
+        self.leases = 0
+        self.last_used = time.monotonic()
+        self.retired = False
+
+
+class ClientRegistry:
+    def __init__(self, factory: Callable[..., object], max_size: int = 32, idle_seconds: float = 300.0):
+        """factory(*args) builds a new client; args are whatever is passed to lease()/acquire()."""
+        self.factory = factory
+        self.max_size = max(1, int(max_size))  # 0 would evict every client as soon as it is built
+        self.idle_seconds = idle_seconds
+        self._entries = OrderedDict()  # key -> _Entry
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def acquire(self, key: Hashable, *factory_args):
+        with self._lock:
+            self._evict_idle_locked()
+            entry = self._lease_locked(key)
+            if entry is not None:
+                return entry.client, entry
+
+        # built outside the lock: a slow factory must not hold up requests for other keys
+        client = self.factory(*factory_args)
+        with self._lock:
+            entry = self._lease_locked(key)
+            if entry is None:
+                entry = _Entry(client)
+                self._entries[key] = entry
+                self.created += 1
+                entry.leases += 1
+                while len(self._entries) > self.max_size:
+                    old_key = next(iter(self._entries))
+                    self._retire_locked(old_key)
+                return entry.client, entry
+        # another thread built one for this key first: use theirs, drop ours
+        _close(client)
+        return entry.client, entry
+
+    def _lease_locked(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.reused += 1
+            entry.leases += 1
+            entry.last_used = time.monotonic()
+        return entry
+
+    def release(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            if entry.retired and entry.leases <= 0:
+                _close(entry.client)
+
+    @contextmanager
+    def lease(self, key: Hashable, *factory_args):
+        client, entry = self.acquire(key, *factory_args)
+        try:
+            yield client
+        finally:
+            self.release(entry)
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            return self._evict_idle_locked()
+
+    def close_all(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._retire_locked(key)
+
+    def forget_all(self) -> None:
+        """Drop every client without closing it: after fork() the parent still owns their sockets."""
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+            }
+
+    def _evict_idle_locked(self) -> int:
+        if not self.idle_seconds:
+            return 0
+        cutoff = time.monotonic() - self.idle_seconds
+        stale = [k for k, e in self._entries.items() if e.leases <= 0 and e.last_used < cutoff]
+        for key in stale:
+            self._retire_locked(key)
+        return len(stale)
+
+    def _retire_locked(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        entry.retired = True
+        self.evicted += 1
+        # still in use by another request: the last release() closes it
+        if entry.leases <= 0:
+            _close(entry.client)
+
+
+def _close(client) -> None:
+    close = getattr(client, "close", None)
+    if close is not None:
+        try:
+            result = close()
+        except Exception:
+            return
+        if inspect.isawaitable(result):
+            _close_async(result)
+
+
+def _close_async(awaitable) -> None:
+    """Async clients (AsyncAzureOpenAI.close is a coroutine): close on the running loop if there is one."""
+    import asyncio
+    try:
+        asyncio.get_running_loop().create_task(awaitable)
+    except RuntimeError:
+        # evicted outside the loop that owns the client; its connections go when the client is collected
+        if inspect.iscoroutine(awaitable):
+            awaitable.close()
@@ -0,0 +1,104 @@
+# dateparse.py
+"""
+Resume date grammar: one compiled regex, one search per string, memoized.
+
+Understood (case-insensitive, anywhere in the string, leftmost match wins):
+    "Jan 2022", "January, 2022", "Jan. 2022", "March 15, 2019", "Mar-2019"
+    "Mar'19", "Mar '19", "'19"                  two-digit years (pivot: see _century)
+    "03/2019", "3-2019", "03.2019"              month / year
+    "2019-03", "2019/03", "2019-03-15"          ISO-style year / month
+    "Q2 2021", "2021 Q2", "Q2-2021"             first month of the quarter
+    "Summer 2018", "Fall '19"                   spring=Mar, summer=Jun, fall/autumn=Sep, winter=Jan
+    "2019"                                      bare year -> January
+    "Present", "current(ly)", "now", "to date", "till date", "ongoing", "today"
+
+parse_date_raw() is cached on the raw string and returns a date, PRESENT or None, so
+the cache never holds today's date; parse_date() resolves PRESENT against the `today`
+the caller passes (once per request), falling back to date.today().
+"""
+
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Optional
+
+PRESENT = "present"
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+SEASONS = {"spring": 3, "summer": 6, "fall": 9, "autumn": 9, "winter": 1}
+
+_MONTH = (r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+          r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?")
+_YEAR4 = r"(?:19|20)\d\d(?!\d)"
+_YEAR = rf"(?:{_YEAR4}|'\s?\d\d(?!\d))"
+_MM = r"(?:0?[1-9]|1[0-2])"
+
+DATE_GRAMMAR = re.compile(
+    rf"""
+    (?P<present>\b(?:present|current(?:ly)?|now|ongoing|today|(?:till|to)\s+date)\b)
+  | (?P<quarter_a>\bq(?P<qa>[1-4])[\s,/-]*(?P<qa_year>{_YEAR}))
+  | (?P<quarter_b>(?<!\d)(?P<qb_year>{_YEAR4})[\s,/-]*q(?P<qb>[1-4])\b)
+  | (?P<season>\b(?P<season_name>spring|summer|fall|autumn|winter)\b[\s,/-]*(?P<season_year>{_YEAR}))
+  | (?P<named>\b(?P<month_name>{_MONTH})\b\.?(?:\s+\d{{1,2}}(?:st|nd|rd|th)?)?[\s,./-]*(?P<named_year>{_YEAR}))
+  | (?P<iso>(?<!\d)(?P<iso_year>{_YEAR4})[-/.](?P<iso_month>{_MM})(?!\d))
+  | (?P<numeric>(?<![\d/.-])(?P<num_month>{_MM})[/.-](?P<num_year>{_YEAR4}))
+  | (?P<year>(?<!\d)(?P<bare_year>{_YEAR4}))
+  | (?P<short_year>(?<![\w'])'(?P<short>\d\d)(?!\d))
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# two-digit years up to this many years ahead of the current one are 20xx, the rest 19xx
+_PIVOT_AHEAD = 5
+_PIVOT = (date.today().year + _PIVOT_AHEAD) % 100
+
+
+def _century(text: str) -> int:
+    digits = re.sub(r"\D", "", text)
+    year = int(digits)
+    if len(digits) == 4:
+        return year
+    return 2000 + year if year <= _PIVOT else 1900 + year
+
+
+@lru_cache(maxsize=65536)
+def parse_date_raw(s: str):
+    """date(year, month, 1), PRESENT, or None for a stripped raw string."""
+    m = DATE_GRAMMAR.search(s)
+    if m is None:
+        return None
+    kind = m.lastgroup  # the outer alternative closes last, so this names the branch that matched
+    if kind == "present":
+        return PRESENT
+    if kind == "quarter_a":
+        return date(_century(m.group("qa_year")), 3 * int(m.group("qa")) - 2, 1)
+    if kind == "quarter_b":
+        return date(int(m.group("qb_year")), 3 * int(m.group("qb")) - 2, 1)
+    if kind == "season":
+        return date(_century(m.group("season_year")), SEASONS[m.group("season_name").lower()], 1)
+    if kind == "named":
+        return date(_century(m.group("named_year")), MONTHS[m.group("month_name")[:3].lower()], 1)
+    if kind == "iso":
+        return date(int(m.group("iso_year")), int(m.group("iso_month")), 1)
+    if kind == "numeric":
+        return date(int(m.group("num_year")), int(m.group("num_month")), 1)
+    if kind == "year":
+        return date(int(m.group("bare_year")), 1, 1)
+    return date(_century(m.group("short")), 1, 1)
+
+
+def parse_date(s, today: Optional[date] = None) -> Optional[date]:
+    """Parse one resume date; "present"-like values resolve to `today` (default date.today())."""
+    if not s or not isinstance(s, str):
+        return None
+    value = parse_date_raw(s.strip())
+    if value is PRESENT:
+        return today or date.today()
+    return value
+
+
+def cache_info():
+    return parse_date_raw.cache_info()
@@ -0,0 +1,495 @@
+# ingest.py
+"""
+Bulk ingestion: parse every PDF under a directory tree and stream the results to JSONL
+(or Parquet), without going through the web app.
+
+    python ingest.py /archive/cvs --out cvs.jsonl
+    python ingest.py /archive/cvs --out cvs_parquet --format parquet --concurrency 16
+    python ingest.py /archive/cvs --out cvs.jsonl --store __DATA__/profiles.db
+    python ingest.py /archive/cvs --out cvs.jsonl --batch --batch-size 5000
+
+Text is extracted on a process pool (--pdf-workers); ats_extractor runs on a thread pool
+of --concurrency calls (the shared RateLimiter still paces them against the quota). Only
+a bounded number of documents is in flight, so memory stays flat on any archive size.
+
+--batch sends the completions through the provider's batch API instead
+(resumeparser.ats_extractor_batch, see batchllm.py): documents are grouped in path order
+into batches of --batch-size, at most --concurrency batches run at once, and a batch's
+results are written when it completes. Request / result files and batch ids are kept
+under <out>.batches/, so an interrupted run picks up the batches it already submitted.
+
+Resuming: progress is checkpointed in <out>.checkpoint.db (SQLite), keyed on the PDF's
+SHA-256. Re-running the same command skips every document already written (or already
+failed, unless --retry-failed), as well as duplicates of the same content under other
+names. Results are buffered and written every --flush-every documents (or 10 s); a
+crash loses at most that buffer, which the next run redoes. Unchanged files (same
+size and mtime) aren't even re-read to hash them.
+
+Output records: {"doc_hash", "path", "processed_at", "result"} per line for JSONL;
+Parquet parts (part-00000.parquet, ... in the --out directory, needs pyarrow) have the
+same columns plus full_name, email, total_years and overall_score, with result as JSON
+text. Failures are kept in the checkpoint, not the output.
+
+Live progress (done / failed / skipped, throughput, ETA) goes to stderr.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from resumeparser import ats_extractor, ats_extractor_batch, normalization_enabled
+from pdftext import read_pdf_bytes, new_process_pool
+from resumestore import ResumeStore
+
+_CHECKPOINT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    doc_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS processed (
+    doc_hash TEXT PRIMARY KEY,
+    path TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    finished_at REAL NOT NULL
+);
+"""
+
+DONE = "done"
+FAILED = "failed"
+
+FLUSH_SECONDS = 10.0
+PROGRESS_SECONDS = 1.0
+
+
+# -------------------------
+# Checkpoint
+# -------------------------
+class Checkpoint:
+    """Which files hash to what, and which hashes are finished (done / failed)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_CHECKPOINT_SCHEMA)
+
+    def known_hash(self, path: str, size: int, mtime_ns: int):
+        row = self._conn.execute("SELECT size, mtime_ns, doc_hash FROM files WHERE path = ?", (path,)).fetchone()
+        return row[2] if row and row[0] == size and row[1] == mtime_ns else None
+
+    def remember_hash(self, path: str, size: int, mtime_ns: int, doc_hash: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns, doc_hash) VALUES (?, ?, ?, ?)",
+                           (path, size, mtime_ns, doc_hash))
+
+    def finished(self, retry_failed: bool) -> set:
+        query = "SELECT doc_hash FROM processed" + (" WHERE status = 'done'" if retry_failed else "")
+        return {row[0] for row in self._conn.execute(query)}
+
+    def mark(self, rows) -> None:
+        """rows: (doc_hash, path, status, error) tuples, committed together."""
+        now = time.time()
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO processed (doc_hash, path, status, error, finished_at) VALUES (?, ?, ?, ?, ?)",
+            [(doc_hash, path, status, error, now) for doc_hash, path, status, error in rows])
+        self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# -------------------------
+# Output sinks
+# -------------------------
+class JsonlSink:
+    def __init__(self, path: str):
+        self.path = path
+        self._drop_partial_line()
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def _drop_partial_line(self) -> None:
+        # a crash mid-write leaves an unterminated last line; cut it off before appending
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as fh:
+            fh.seek(0, os.SEEK_END)
+            size = fh.tell()
+            if size == 0:
+                return
+            fh.seek(max(0, size - 1))
+            if fh.read(1) == b"\n":
+                return
+            fh.seek(0)
+            keep = fh.read().rfind(b"\n") + 1
+            fh.truncate(keep)
+
+    def existing_hashes(self) -> set:
+        """doc_hashes already in the file (written before a crash, maybe without their checkpoint)."""
+        hashes = set()
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    hashes.add(json.loads(line)["doc_hash"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return hashes
+
+    def write(self, records) -> None:
+        self._fh.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class ParquetSink:
+    """One part file per flush, written to a temp name and renamed, so a part is either whole or absent."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise SystemExit("--format parquet needs pyarrow (pip install pyarrow)")
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._parts = len(self._part_files())
+
+    def _part_files(self):
+        return sorted(name for name in os.listdir(self.path)
+                      if name.startswith("part-") and name.endswith(".parquet"))
+
+    def existing_hashes(self) -> set:
+        import pyarrow.parquet as pq
+        hashes = set()
+        for name in self._part_files():
+            hashes.update(pq.read_table(os.path.join(self.path, name), columns=["doc_hash"]).column(0).to_pylist())
+        return hashes
+
+    def write(self, records) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = []
+        for record in records:
+            result = record["result"]
+            experience = result.get("experience_analysis") or {}
+            assessment = result.get("assessment") or {}
+            rows.append({
+                "doc_hash": record["doc_hash"],
+                "path": record["path"],
+                "processed_at": record["processed_at"],
+                "full_name": result.get("full_name"),
+                "email": result.get("email"),
+                "total_years": _number(experience.get("total_years_approx")),
+                "overall_score": _number(assessment.get("overall_score")),
+                "result": json.dumps(result, ensure_ascii=False),
+            })
+        final = os.path.join(self.path, f"part-{self._parts:05d}.parquet")
+        tmp = final + ".tmp"
+        pq.write_table(pa.Table.from_pylist(rows), tmp)
+        os.replace(tmp, final)
+        self._parts += 1
+
+    def close(self) -> None:
+        pass
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# -------------------------
+# Walking and hashing
+# -------------------------
+def find_pdfs(root: str):
+    """Every *.pdf under root (case-insensitive), in a stable order."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        found.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.lower().endswith(".pdf"))
+    return found
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+class Progress:
+    """done / failed / skipped counters with a throughput + ETA line on stderr."""
+
+    def __init__(self, total: int, stream=None):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+        self._stream = stream or sys.stderr
+        self._tty = self._stream.isatty()
+        self._last = 0.0
+
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        finished = self.done + self.failed
+        rate = finished / elapsed
+        remaining = self.total - self.skipped - finished
+        eta = _format_seconds(remaining / rate) if rate > 0 else "?"
+        return (f"{finished + self.skipped}/{self.total}  done {self.done}  failed {self.failed}  "
+                f"skipped {self.skipped}  |  {rate:.2f} files/s ({rate * 60:.0f}/min)  ETA {eta}")
+
+    def show(self, force: bool = False) -> None:
+        now = time.monotonic()
+        # a terminal gets a line rewritten in place; logs get one line every 30 s
+        if not force and now - self._last < (PROGRESS_SECONDS if self._tty else 30.0):
+            return
+        self._last = now
+        self._stream.write(("\r" + self.line() + "\033[K") if self._tty else self.line() + "\n")
+        self._stream.flush()
+
+    def finish(self) -> None:
+        self.show(force=True)
+        if self._tty:
+            self._stream.write("\n")
+        elapsed = time.monotonic() - self.started
+        self._stream.write(f"finished in {_format_seconds(elapsed)}: {self.done} done, {self.failed} failed, "
+                           f"{self.skipped} skipped\n")
+
+
+# -------------------------
+# Run
+# -------------------------
+def _parse(text: str) -> dict:
+    result = ats_extractor(text)
+    if not isinstance(result, dict):
+        return {"raw_output": str(result)}
+    return result
+
+
+def _parse_batch(texts: dict, work_dir: str, stop: threading.Event) -> dict:
+    results = ats_extractor_batch(texts, work_dir=work_dir, stop=stop)
+    return {doc_hash: result if isinstance(result, dict) else {"raw_output": str(result)}
+            for doc_hash, result in results.items()}
+
+
+def _failure(result: dict):
+    if "error" in result:
+        return str(result["error"])
+    if "raw_output" in result:
+        return "model output was not valid JSON"
+    return None
+
+
+def ingest(root: str, out: str, fmt: str = "jsonl", checkpoint_path=None, pdf_workers: int = 0,
+           concurrency: int = 8, flush_every: int = 50, retry_failed: bool = False, store_path=None,
+           progress_stream=None, batch_size: int = 0) -> Progress:
+    """
+    Process every new PDF under root; see the module docstring. batch_size > 0 switches to the
+    batch API with that many documents per batch. Returns the final counters.
+    """
+    sink = ParquetSink(out) if fmt == "parquet" else JsonlSink(out)
+    checkpoint = Checkpoint(checkpoint_path or out.rstrip("/\\") + ".checkpoint.db")
+    store = ResumeStore(store_path) if store_path else None
+
+    # written before a crash but never checkpointed: count them as done
+    written = sink.existing_hashes()
+    finished = checkpoint.finished(retry_failed)
+    missing = written - finished
+    if missing:
+        checkpoint.mark([(doc_hash, None, DONE, None) for doc_hash in missing])
+        finished |= missing
+
+    paths = find_pdfs(root)
+    progress = Progress(len(paths), progress_stream)
+    pdf_pool = new_process_pool(pdf_workers or os.cpu_count() or 2)
+    llm_pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest")
+    max_in_flight = 2 * concurrency + 2 * (pdf_workers or os.cpu_count() or 2)
+    batch_dir = out.rstrip("/\\") + ".batches"
+    stop = threading.Event()
+
+    pending = {}         # future -> (stage, doc_hash, path)
+    queued = set()       # hashes in flight, so duplicates within the run are processed once
+    buffer, marks = [], []
+    last_flush = time.monotonic()
+    # --batch: documents join a batch in path order (not PDF completion order), so a re-run
+    # builds the same batches and finds the ones it already submitted
+    order = []           # hashes being read, in path order
+    ready = {}           # doc_hash -> (path, text) read but not yet in a batch
+    batch_docs = {}      # doc_hash -> (path, text) for the next batch
+    batches = {}         # batch future -> {doc_hash: path}
+
+    def flush() -> None:
+        nonlocal buffer, marks, last_flush
+        if buffer:
+            sink.write(buffer)
+            if store is not None:
+                store.upsert_many((r["doc_hash"], r["result"], os.path.basename(r["path"])) for r in buffer)
+        if marks:
+            checkpoint.mark(marks)
+        buffer, marks, last_flush = [], [], time.monotonic()
+
+    def submit_next(items) -> bool:
+        for path in items:
+            try:
+                stat = os.stat(path)
+                doc_hash = checkpoint.known_hash(path, stat.st_size, stat.st_mtime_ns)
+                if doc_hash is None:
+                    doc_hash = _file_digest(path)
+                    checkpoint.remember_hash(path, stat.st_size, stat.st_mtime_ns, doc_hash)
+                if doc_hash in finished or doc_hash in queued:
+                    progress.skipped += 1
+                    continue
+                with open(path, "rb") as fh:
+                    pdf_bytes = fh.read()
+            except OSError as e:
+                progress.failed += 1
+                print(f"\n{path}: {e}", file=sys.stderr)
+                continue
+            queued.add(doc_hash)
+            if batch_size:
+                order.append(doc_hash)
+            pending[pdf_pool.submit(read_pdf_bytes, pdf_bytes, normalization_enabled())] = ("pdf", doc_hash, path)
+            return True
+        return False
+
+    def submit_batches() -> None:
+        nonlocal batch_docs
+        while True:
+            while order and order[0] in ready and len(batch_docs) < batch_size:
+                doc_hash = order.pop(0)
+                batch_docs[doc_hash] = ready.pop(doc_hash)
+            complete = len(batch_docs) >= batch_size or (exhausted and not order)
+            if not batch_docs or not complete or len(batches) >= concurrency:
+                return
+            work_dir = os.path.join(batch_dir, hashlib.sha256("".join(batch_docs).encode()).hexdigest()[:16])
+            future = llm_pool.submit(_parse_batch, {h: text for h, (_, text) in batch_docs.items()}, work_dir, stop)
+            pending[future] = ("batch", None, None)
+            batches[future] = {h: path for h, (path, _) in batch_docs.items()}
+            batch_docs = {}
+
+    def finish_item(doc_hash: str, path: str, result=None, error=None) -> None:
+        queued.discard(doc_hash)
+        finished.add(doc_hash)
+        if error is None:
+            progress.done += 1
+            buffer.append({"doc_hash": doc_hash, "path": path, "processed_at": time.time(), "result": result})
+            marks.append((doc_hash, path, DONE, None))
+        else:
+            progress.failed += 1
+            marks.append((doc_hash, path, FAILED, error))
+
+    items = iter(paths)
+    exhausted = False
+    try:
+        while True:
+            if batch_size:
+                while not exhausted and len(order) < max_in_flight and len(batch_docs) < batch_size:
+                    exhausted = not submit_next(items)
+                submit_batches()
+            else:
+                while not exhausted and len(pending) < max_in_flight:
+                    exhausted = not submit_next(items)
+            if not pending:
+                break
+            done, _ = wait(list(pending), timeout=PROGRESS_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, doc_hash, path = pending.pop(future)
+                if stage == "batch":
+                    members = batches.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        for member_hash, member_path in members.items():
+                            finish_item(member_hash, member_path, error=f"batch error: {e}")
+                        continue
+                    for member_hash, member_path in members.items():
+                        result = results.get(member_hash) or {"error": "missing from batch results"}
+                        finish_item(member_hash, member_path, result=result, error=_failure(result))
+                    continue
+                try:
+                    value = future.result()
+                except Exception as e:
+                    if stage == "pdf" and batch_size:
+                        order.remove(doc_hash)
+                    finish_item(doc_hash, path, error=f"{'PDF read' if stage == 'pdf' else 'parse'} error: {e}")
+                    continue
+                if stage == "pdf" and batch_size:
+                    ready[doc_hash] = (path, value)
+                elif stage == "pdf":
+                    pending[llm_pool.submit(_parse, value)] = ("llm", doc_hash, path)
+                else:
+                    finish_item(doc_hash, path, result=value, error=_failure(value))
+            if len(marks) >= flush_every or time.monotonic() - last_flush >= FLUSH_SECONDS:
+                flush()
+            progress.show()
+    finally:
+        # on Ctrl-C keep everything that did finish; unfinished documents are redone next run
+        stop.set()
+        for future in pending:
+            future.cancel()
+        llm_pool.shutdown(wait=False, cancel_futures=True)
+        pdf_pool.shutdown(wait=False, cancel_futures=True)
+        flush()
+        progress.finish()
+        sink.close()
+        checkpoint.close()
+        if store is not None:
+            store.close()
+    return progress
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Parse every PDF under a directory into JSONL / Parquet (resumable)")
+    parser.add_argument("root", help="directory to walk for *.pdf")
+    parser.add_argument("--out", required=True, help="JSONL file, or directory of Parquet parts")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default=None,
+                        help="default: parquet if --out ends with .parquet or is a directory, else jsonl")
+    parser.add_argument("--checkpoint", default=None, help="default: <out>.checkpoint.db")
+    parser.add_argument("--pdf-workers", type=int, default=0, help="text extraction processes (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, default=8, help="ats_extractor calls in flight")
+    parser.add_argument("--flush-every", type=int, default=50, help="documents per output write / checkpoint")
+    parser.add_argument("--retry-failed", action="store_true", help="process documents that failed before again")
+    parser.add_argument("--store", default=None, help="also upsert results into this profiles.db (resumestore)")
+    parser.add_argument("--batch", action="store_true",
+                        help="use the batch API (BATCH_PROVIDER); --concurrency is then batches in flight")
+    parser.add_argument("--batch-size", type=int, default=1000, help="documents per batch with --batch")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f"not a directory: {args.root}")
+    fmt = args.format or ("parquet" if args.out.endswith(".parquet") or os.path.isdir(args.out) else "jsonl")
+    try:
+        progress = ingest(args.root, args.out, fmt, args.checkpoint, args.pdf_workers, max(1, args.concurrency),
+                          max(1, args.flush_every), args.retry_failed, args.store,
+                          batch_size=max(1, args.batch_size) if args.batch else 0)
+    except KeyboardInterrupt:
+        print("interrupted; re-run the same command to resume", file=sys.stderr)
+        return 130
+    return 1 if progress.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
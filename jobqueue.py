@@ -0,0 +1,270 @@
+# jobqueue.py
+"""
+Background job queue for long-running resume parses.
+
+Jobs are persisted in SQLite (__DATA__/jobs.db) together with the uploaded PDF,
+so anything still queued when the process stops is picked up again on restart.
+
+Several processes (WSGI workers, replicas on a shared volume) can serve the same
+database. A running job carries its owner and a lease that the owner renews while
+the job is in flight; a job whose lease has run out (its process died) goes back to
+the queue and is picked up by whichever process claims it first.
+
+Per-request API keys are only held in memory and are never written to disk;
+a job recovered after a restart runs with the backend's default credentials.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import queue
+import sqlite3
+import threading
+import traceback
+from typing import Callable, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# how long a running job stays claimed without a heartbeat from its owner
+JOB_LEASE_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT,
+    pdf BLOB,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+# columns added after the first release; databases created before them get them on open
+_ADDED_COLUMNS = {"owner": "TEXT", "lease_until": "REAL"}
+
+
+class JobQueue:
+    def __init__(self, db_path: str, handler: Callable[[bytes, Optional[str]], dict], workers: int = 4,
+                 lease_seconds: float = JOB_LEASE_SECONDS):
+        """
+        handler(pdf_bytes, azure_api_key) -> result dict. A result containing "error"
+        marks the job as failed; an exception does the same.
+        """
+        self.db_path = db_path
+        self.handler = handler
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        # unique per JobQueue, so a restarted process never mistakes an old lease for its own
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in _ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._db_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._api_keys = {}
+        self._threads = []
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    # -------------------------
+    # DB helpers
+    # -------------------------
+    def _execute(self, sql: str, params=()):
+        with self._db_lock:
+            cur = self._conn.execute(sql, params)
+            return cur.rowcount
+
+    def _fetchone(self, sql: str, params=()):
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self) -> None:
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            # jobs left behind by a process that is gone go back to the queue; jobs another
+            # live process is running keep their lease. Then queue everything, oldest first
+            # (claiming is atomic, so a job queued in several processes still runs once).
+            self._reclaim_expired()
+            with self._db_lock:
+                rows = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+                ).fetchall()
+            for (job_id,) in rows:
+                self._queue.put(job_id)
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            t = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _reclaim_expired(self) -> list:
+        """Re-queue RUNNING jobs whose lease has run out; returns their ids, oldest first."""
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? AND (lease_until IS NULL OR lease_until < ?) "
+                    "ORDER BY created_at",
+                    (RUNNING, time.time()),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, started_at = NULL, owner = NULL, lease_until = NULL WHERE id = ?",
+                    [(QUEUED, job_id) for (job_id,) in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [job_id for (job_id,) in rows]
+
+    def _heartbeat(self) -> None:
+        # renew our leases well before they run out, and pick up jobs of processes that died
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            try:
+                self._execute(
+                    "UPDATE jobs SET lease_until = ? WHERE status = ? AND owner = ?",
+                    (time.time() + self.lease_seconds, RUNNING, self.owner),
+                )
+                for job_id in self._reclaim_expired():
+                    self._queue.put(job_id)
+            except Exception:
+                traceback.print_exc()
+
+    def _worker(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                # never let one job kill the worker thread, nor leave it RUNNING forever
+                traceback.print_exc()
+                self._mark_failed(job_id, e)
+            finally:
+                self._queue.task_done()
+
+    def _mark_failed(self, job_id: str, error: Exception) -> None:
+        # best effort: the failure may be the database itself
+        self._api_keys.pop(job_id, None)
+        try:
+            self._execute(
+                "UPDATE jobs SET status = ?, result = NULL, error = ?, finished_at = ?, pdf = NULL, lease_until = NULL "
+                "WHERE id = ? AND status = ? AND owner = ?",
+                (FAILED, f"{type(error).__name__}: {error}", time.time(), job_id, RUNNING, self.owner),
+            )
+        except Exception:
+            traceback.print_exc()
+
+    def _run(self, job_id: str) -> None:
+        # claim atomically so a cancelled (or already claimed) job is skipped
+        now = time.time()
+        claimed = self._execute(
+            "UPDATE jobs SET status = ?, started_at = ?, owner = ?, lease_until = ? WHERE id = ? AND status = ?",
+            (RUNNING, now, self.owner, now + self.lease_seconds, job_id, QUEUED),
+        )
+        if not claimed:
+            return
+        row = self._fetchone("SELECT pdf FROM jobs WHERE id = ?", (job_id,))
+        api_key = self._api_keys.pop(job_id, None)
+
+        result, error = None, None
+        try:
+            result = self.handler(bytes(row[0]), api_key)
+            if isinstance(result, dict) and result.get("error"):
+                error = str(result["error"])
+        except Exception as e:
+            error = str(e)
+
+        row = self._fetchone("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,))
+        if row and row[0]:
+            status = CANCELLED
+            result, error = None, None
+        else:
+            status = FAILED if error else DONE
+        # the PDF is only needed to (re)run the job; drop it once the job is final.
+        # If our lease lapsed and another process took the job over, its run wins.
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, pdf = NULL, lease_until = NULL "
+            "WHERE id = ? AND status = ? AND owner = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id, RUNNING,
+             self.owner),
+        )
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def submit(self, pdf_bytes: bytes, filename: Optional[str] = None, azure_api_key: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, status, filename, pdf, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, QUEUED, filename, sqlite3.Binary(pdf_bytes), time.time()),
+        )
+        if azure_api_key:
+            self._api_keys[job_id] = azure_api_key
+        self._queue.put(job_id)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[dict]:
+        row = self._fetchone(
+            "SELECT id, status, filename, error, cancel_requested, created_at, started_at, finished_at "
+            "FROM jobs WHERE id = ?",
+            (job_id,),
+        )
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "filename": row[2],
+            "error": row[3],
+            "cancel_requested": bool(row[4]),
+            "created_at": row[5],
+            "started_at": row[6],
+            "finished_at": row[7],
+        }
+
+    def result(self, job_id: str):
+        row = self._fetchone("SELECT result FROM jobs WHERE id = ?", (job_id,))
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a job. Queued jobs are cancelled immediately; running jobs are flagged and
+        their result is discarded when the in-flight call returns. Returns the new status,
+        or None if the job does not exist.
+        """
+        if self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, pdf = NULL WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), job_id, QUEUED),
+        ):
+            self._api_keys.pop(job_id, None)
+            return CANCELLED
+        self._execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+        job = self.status(job_id)
+        return job["status"] if job else None
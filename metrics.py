@@ -0,0 +1,196 @@
+# metrics.py
+"""
+In-process counters, gauges and histograms rendered in the Prometheus text format
+(served by app.py on GET /metrics). Dependency-free; every metric is thread-safe.
+
+Metrics used by the pipeline are defined at the bottom so resumeparser.py and app.py
+share one registry:
+    cv_stage_seconds{stage}             histogram: pdf_text, prepare, extraction, json_repair,
+                                        experience_analysis, assessment, upload_spool
+    cv_llm_calls_total{outcome}         completed / failed completions
+    cv_llm_tokens_total{kind}           prompt / completion tokens from resp.usage
+    cv_llm_continuations_total          follow-up calls for completions cut off at max_tokens
+    cv_batch_requests_total{outcome}    batch lines: completed / continued / retried / failed
+    cv_coalesced_requests_total{path}   requests served by an identical in-flight run (singleflight.py)
+    cv_llm_calls_saved_total            completions (and cv_llm_tokens_saved_total: tokens) those saved
+    cv_json_parse_total{outcome}        direct / repaired / failed (_attempt_fix_and_parse)
+    cv_cache_requests_total{result}     hit / miss on the result cache
+    cv_assessment_cache_requests_total{result}  hit / miss / refresh on the assessment cache
+    cv_http_request_seconds{endpoint}   histogram per Flask endpoint
+    cv_http_requests_total{endpoint,status}
+"""
+
+import math
+import threading
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+                                 for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value computed at scrape time: fn() -> number, or {label_values_tuple: number}."""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, fn: Callable, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+
+    def render(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        items = value.items() if isinstance(value, dict) else [((), value)]
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+                                 for k, v in sorted(items)]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, list] = {}  # key -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = self._header()
+        for key, series in items:
+            running = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                running += count
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {running}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(series[-1], 6))}")
+            lines.append(f"{self.name}_count{labels} {running}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name, help_text, fn, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, help_text, fn, labelnames))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram("cv_stage_seconds", "Wall time per pipeline stage.", ("stage",))
+LLM_CALLS = REGISTRY.counter("cv_llm_calls_total", "Chat completions by outcome.", ("outcome",))
+LLM_TOKENS = REGISTRY.counter("cv_llm_tokens_total", "Tokens reported in resp.usage.", ("kind",))
+LLM_CONTINUATIONS = REGISTRY.counter("cv_llm_continuations_total",
+                                     "Follow-up calls continuing a completion cut off at max_tokens.")
+BATCH_REQUESTS = REGISTRY.counter("cv_batch_requests_total", "Batch request lines by outcome.", ("outcome",))
+COALESCED_REQUESTS = REGISTRY.counter("cv_coalesced_requests_total",
+                                      "Requests that shared an identical in-flight pipeline run.", ("path",))
+LLM_CALLS_SAVED = REGISTRY.counter("cv_llm_calls_saved_total",
+                                   "Completions not made because a request shared an in-flight run.")
+LLM_TOKENS_SAVED = REGISTRY.counter("cv_llm_tokens_saved_total",
+                                    "Tokens not spent because a request shared an in-flight run.")
+JSON_PARSE = REGISTRY.counter("cv_json_parse_total", "Model output JSON parses by path taken.", ("outcome",))
+CACHE_REQUESTS = REGISTRY.counter("cv_cache_requests_total", "Result cache lookups.", ("result",))
+ASSESSMENT_CACHE_REQUESTS = REGISTRY.counter("cv_assessment_cache_requests_total",
+                                             "Assessment cache lookups (hit / miss / refresh).", ("result",))
+HTTP_SECONDS = REGISTRY.histogram("cv_http_request_seconds", "Request latency per endpoint.", ("endpoint",))
+HTTP_REQUESTS = REGISTRY.counter("cv_http_requests_total", "Requests per endpoint and status.",
+                                 ("endpoint", "status"))
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
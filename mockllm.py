@@ -0,0 +1,442 @@
+# mockllm.py
+"""
+Offline stand-in for the Azure OpenAI chat-completions client.
+
+Select it with LLM_BACKEND=mock (config.yaml or environment); _make_azure_client then
+returns a MockChatClient instead of AzureOpenAI (AsyncMockChatClient instead of
+AsyncAzureOpenAI for the async pipeline), and no Azure credentials are needed.
+
+The mock answers in the same shape as the SDK (resp.choices[0].message.content,
+finish_reason, resp.usage) with plausible JSON derived from the prompt:
+- extraction prompts -> a profile built from the resume text with regexes
+  (name, email, date-ranged job lines, known skills), limited to the keys in the schema
+- assessment prompts -> a small assessment
+- job-fit prompts -> fit_score from the known skills the job description and resume share
+- continuation prompts (after finish_reason "length") -> the rest of the answer that was cut off
+- combined prompts -> profile + assessment
+
+Latency and failures are configurable so load tests behave like the real service:
+    MOCK_LLM_LATENCY       "fixed:0.5" | "uniform:0.2,1.5" | "lognormal:0.8,0.4" (median s, sigma)
+    MOCK_LLM_TOKEN_LATENCY seconds added per completion token (default 0)
+    MOCK_LLM_ERRORS        "429:0.02,500:0.01,timeout:0.005" (kind:probability)
+    MOCK_LLM_SEED          RNG seed for reproducible runs
+    MOCK_LLM_RPM / MOCK_LLM_TPM   per-deployment quotas (0 = unlimited), enforced over a sliding
+                           MOCK_LLM_QUOTA_WINDOW_SECONDS window (default 60) like Azure: over
+                           quota -> 429 with Retry-After; every answer carries x-ratelimit-* headers.
+                           TPM counts prompt tokens + max_tokens at admission, as Azure does.
+"""
+
+import re
+import json
+import math
+import time
+import random
+import threading
+from collections import deque
+from types import SimpleNamespace
+from typing import Optional
+
+from normalize import count_tokens
+from preextract import EMAIL_RE, DATE_RANGE_RE
+
+KNOWN_SKILLS = {
+    "programming_scripting": ["Python", "Java", "Scala", "R", "Go", "JavaScript", "TypeScript", "C++", "Bash"],
+    "databases_data_management": ["SQL", "PostgreSQL", "MySQL", "MongoDB", "Snowflake", "Redshift", "BigQuery", "Cassandra"],
+    "analytics_bi": ["Tableau", "Power BI", "Looker", "Excel", "pandas", "NumPy"],
+    "tools_technologies": ["Spark", "Airflow", "Kafka", "Docker", "Kubernetes", "AWS", "Azure", "GCP", "dbt", "Git"],
+}
+
+
+class MockLLMError(Exception):
+    """Raised for injected failures when the openai package isn't importable."""
+
+
+# -------------------------
+# Latency / error models
+# -------------------------
+def parse_latency(spec: Optional[str]):
+    """Return a sampler f(rng) -> seconds for a latency spec string."""
+    spec = (spec or "fixed:0").strip()
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] if args else []
+    kind = kind.lower()
+    if kind == "fixed":
+        value = values[0] if values else 0.0
+        return lambda rng: value
+    if kind == "uniform":
+        low, high = (values + [0.0, 0.0])[:2]
+        return lambda rng: rng.uniform(low, high)
+    if kind == "lognormal":
+        median, sigma = (values + [0.5, 0.5])[:2]
+        mu = math.log(max(median, 1e-6))
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"Unknown latency spec: {spec!r}")
+
+
+def parse_errors(spec: Optional[str]):
+    """"429:0.02,500:0.01,timeout:0.005" -> [("429", 0.02), ("500", 0.01), ("timeout", 0.005)]"""
+    out = []
+    for part in (spec or "").split(","):
+        if ":" in part:
+            kind, prob = part.split(":", 1)
+            out.append((kind.strip().lower(), float(prob)))
+    return out
+
+
+def _make_error(kind: str, retry_after: Optional[float] = None, headers: Optional[dict] = None):
+    # imported here, not at module level: they dominate import time and most mock calls never fail
+    try:
+        import httpx
+        import openai
+    except Exception:
+        return MockLLMError(f"injected {kind}")
+    request = httpx.Request("POST", "http://mock-llm/chat/completions")
+    if kind == "timeout":
+        return openai.APITimeoutError(request=request)
+    status = int(kind) if kind.isdigit() else 500
+    headers = dict(headers or {})
+    if retry_after is not None:
+        headers["retry-after"] = f"{retry_after:.3f}"
+    response = httpx.Response(status, headers=headers, request=request)
+    cls = {429: openai.RateLimitError, 500: openai.InternalServerError}.get(status, openai.APIStatusError)
+    return cls(f"Mock LLM injected HTTP {status}", response=response, body=None)
+
+
+# -------------------------
+# Quotas
+# -------------------------
+class QuotaWindow:
+    """Sliding-window RPM / TPM accounting for one deployment, shared by every client using it."""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, window_seconds: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window_seconds
+        self._events = deque()  # (admitted_at, tokens)
+        self._tokens = 0
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+
+    def _expire(self, now: float) -> None:
+        while self._events and self._events[0][0] <= now - self.window:
+            self._tokens -= self._events.popleft()[1]
+
+    def _headers(self) -> dict:
+        headers = {}
+        if self.rpm:
+            headers["x-ratelimit-limit-requests"] = str(self.rpm)
+            headers["x-ratelimit-remaining-requests"] = str(max(0, self.rpm - len(self._events)))
+        if self.tpm:
+            headers["x-ratelimit-limit-tokens"] = str(self.tpm)
+            headers["x-ratelimit-remaining-tokens"] = str(max(0, self.tpm - self._tokens))
+        return headers
+
+    def admit(self, tokens: int):
+        """(admitted, x-ratelimit headers, retry_after seconds or None)."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            over_rpm = self.rpm and len(self._events) + 1 > self.rpm
+            over_tpm = self.tpm and self._events and self._tokens + tokens > self.tpm
+            if over_rpm or over_tpm:
+                self.rejected += 1
+                # retry once enough of the window has expired for this call to fit
+                retry_at = now - self.window
+                if over_rpm:
+                    retry_at = self._events[len(self._events) - self.rpm][0]
+                if over_tpm:
+                    freed = 0
+                    for admitted_at, n in self._events:
+                        freed += n
+                        if self._tokens - freed + tokens <= self.tpm:
+                            break
+                    retry_at = max(retry_at, admitted_at)
+                return False, self._headers(), max(0.0, retry_at + self.window - now)
+            self._events.append((now, tokens))
+            self._tokens += tokens
+            self.admitted += 1
+            return True, self._headers(), None
+
+
+_quotas = {}
+_quotas_lock = threading.Lock()
+
+
+def quota_for(deployment, rpm: int, tpm: int, window_seconds: float) -> Optional[QuotaWindow]:
+    if not rpm and not tpm:
+        return None
+    with _quotas_lock:
+        quota = _quotas.get(deployment)
+        if quota is None:
+            quota = _quotas[deployment] = QuotaWindow(rpm, tpm, window_seconds)
+        return quota
+
+
+# -------------------------
+# Fake answers
+# -------------------------
+def _resume_text(messages) -> str:
+    content = messages[-1].get("content", "") if messages else ""
+    m = re.search(r"```\n(.*)\n```", content, flags=re.DOTALL)
+    return m.group(1) if m else content
+
+
+def fake_profile(resume_text: str, schema: str) -> dict:
+    lines = [l.strip() for l in resume_text.splitlines() if l.strip()]
+    jobs = []
+    for line in lines:
+        m = DATE_RANGE_RE.search(line)
+        if not m:
+            continue
+        head = line[:m.start()].strip(" ,|-–—") or "Company"
+        parts = re.split(r"\s*[—|,]\s*|\s+-\s+", head)
+        company, title = parts[0], (parts[1] if len(parts) > 1 else None)
+        jobs.append({"company": company, "job_title": title, "start_date": m.group("start"),
+                     "end_date": m.group("end"), "location": None, "responsibilities": []})
+    lower = resume_text.lower()
+    skills = {cat: [s for s in names if re.search(r"(?<!\w)" + re.escape(s.lower()) + r"(?!\w)", lower)]
+              for cat, names in KNOWN_SKILLS.items()}
+    email = EMAIL_RE.search(resume_text)
+    profile = {
+        "full_name": lines[0] if lines else None,
+        "email": email.group(0) if email else None,
+        "github": None,
+        "linkedin": None,
+        "employment_details": jobs,
+        "technical_skills": skills,
+        "soft_skills": ["Communication"] if "communicat" in lower else [],
+        "education": [l for l in lines if re.search(r"\b(b\.?sc|m\.?sc|bachelor|master|ph\.?d|mba)\b", l, re.I)][:3],
+        "languages": [],
+        "certifications": [l for l in lines if "certified" in l.lower()][:5],
+    }
+    # only the keys the prompt asked for (pre-extraction drops some)
+    return {k: v for k, v in profile.items() if f'"{k}"' in schema}
+
+
+def fake_assessment(context_text: str) -> dict:
+    n_jobs = context_text.count('"company"')
+    score = max(0, min(100, 50 + 8 * n_jobs + (len(context_text) % 17)))
+    return {
+        "strengths": ["Relevant hands-on experience"] if n_jobs else [],
+        "weaknesses": [] if n_jobs else ["No dated employment history"],
+        "red_flags": [],
+        "recommendations": ["Proceed to technical screen"] if score >= 60 else ["Request more detail"],
+        "overall_score": score,
+    }
+
+
+def fake_fit_assessment(prompt: str) -> dict:
+    """Job-fit answer: known skills named in both the job description and the resume count as matched."""
+    job, _, resume = prompt.partition("Resume:")
+    job, resume = job.lower(), resume.lower()
+    wanted = [s for skills in KNOWN_SKILLS.values() for s in skills if _mentions(job, s.lower())]
+    matched = [s for s in wanted if _mentions(resume, s.lower())]
+    missing = [s for s in wanted if s not in matched]
+    score = int(round(100 * len(matched) / len(wanted))) if wanted else 50
+    return {
+        "fit_score": score,
+        "matched_requirements": matched,
+        "missing_requirements": missing,
+        "concerns": [],
+        "summary": f"Matches {len(matched)} of {len(wanted)} named skills.",
+    }
+
+
+def _mentions(text: str, skill: str) -> bool:
+    return re.search(r"(?<![\w+#])" + re.escape(skill) + r"(?![\w+#])", text) is not None
+
+
+# -------------------------
+# Client
+# -------------------------
+class _RawResponse:
+    """Like the SDK's with_raw_response result: .headers plus .parse() for the completion."""
+
+    def __init__(self, parsed, headers: dict):
+        self._parsed = parsed
+        self.headers = headers
+
+    def parse(self):
+        return self._parsed
+
+
+class _RawCompletions:
+    def __init__(self, owner: "MockChatClient"):
+        self._owner = owner
+
+    def create(self, model=None, messages=None, temperature=None, max_tokens=None, stream=False, **kwargs):
+        resp, headers = self._owner._complete(model, messages or [], max_tokens, stream, kwargs)
+        return _RawResponse(resp, headers)
+
+
+class _Completions:
+    def __init__(self, owner: "MockChatClient"):
+        self._owner = owner
+        self.with_raw_response = _RawCompletions(owner)
+
+    def create(self, model=None, messages=None, temperature=None, max_tokens=None, stream=False, **kwargs):
+        return self._owner._complete(model, messages or [], max_tokens, stream, kwargs)[0]
+
+
+class MockChatClient:
+    """Drop-in for the parts of AzureOpenAI the pipeline uses: client.chat.completions.create(...)."""
+
+    def __init__(self, latency: Optional[str] = None, token_latency: float = 0.0, errors: Optional[str] = None,
+                 seed: Optional[int] = None, rpm: int = 0, tpm: int = 0, quota_window_seconds: float = 60.0):
+        self._latency = parse_latency(latency)
+        self._rpm = rpm
+        self._tpm = tpm
+        self._quota_window = quota_window_seconds
+        self._token_latency = token_latency
+        self._errors = parse_errors(errors)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=_Completions(self))
+        self.calls = 0
+
+    def close(self):
+        pass
+
+    def _roll(self):
+        with self._rng_lock:
+            self.calls += 1
+            delay = max(0.0, self._latency(self._rng))
+            failure = None
+            for kind, prob in self._errors:
+                if self._rng.random() < prob:
+                    failure = kind
+                    break
+        return delay, failure
+
+    def _complete(self, model, messages, max_tokens, stream=False, extra=None):
+        """(response, headers) for one completion, or raises the injected / quota error.
+        stream=True returns an iterator of delta chunks instead (per-token latency is paid per chunk)."""
+        delay, failure, answer = self._answer(model, messages, max_tokens, stream, extra)
+        time.sleep(delay)
+        if failure:
+            raise _make_error(failure)
+        return answer
+
+    def _answer(self, model, messages, max_tokens, stream=False, extra=None):
+        """(seconds to wait, injected failure or None, (response, headers)); quota rejections raise right away."""
+        prompt_tokens = sum(count_tokens(m.get("content", "")) for m in messages)
+        headers = {}
+        quota = quota_for(model, self._rpm, self._tpm, self._quota_window)
+        if quota is not None:
+            admitted, headers, retry_after = quota.admit(prompt_tokens + (max_tokens or 0))
+            if not admitted:
+                raise _make_error("429", retry_after, headers)
+
+        delay, failure = self._roll()
+        # a continuation request carries the partial answer: answer the original prompt again
+        # and send only the part after it, as the model would
+        partial = None
+        if (len(messages) >= 3 and messages[-2].get("role") == "assistant"
+                and "Continue exactly where" in messages[-1].get("content", "")):
+            partial = messages[-2].get("content", "")
+            messages = messages[:-2]
+        system = messages[0].get("content", "") if messages else ""
+        if "job-fit assessment generator" in system:
+            payload = fake_fit_assessment(messages[-1].get("content", ""))
+        elif "assessment generator" in system:
+            payload = fake_assessment(messages[-1].get("content", ""))
+        else:
+            payload = fake_profile(_resume_text(messages), system)
+            if '"assessment"' in system:
+                payload["assessment"] = fake_assessment(json.dumps(payload))
+        content = json.dumps(payload, indent=2)
+        if partial is not None and content.startswith(partial):
+            content = content[len(partial):]
+
+        completion_tokens = count_tokens(content)
+        finish_reason = "stop"
+        if max_tokens and completion_tokens > max_tokens:
+            # behave like the real API: cut the output and report it
+            content = content[:max_tokens * 4]
+            completion_tokens = max_tokens
+            finish_reason = "length"
+
+        delay += 0 if stream else completion_tokens * self._token_latency
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                total_tokens=prompt_tokens + completion_tokens)
+        if stream:
+            options = (extra or {}).get("stream_options") or ((extra or {}).get("extra_body") or {}).get("stream_options")
+            include_usage = bool((options or {}).get("include_usage"))
+            return delay, failure, (self._stream(model, content, finish_reason, usage if include_usage else None),
+                                    headers)
+
+        return delay, failure, (SimpleNamespace(
+            id=f"mock-{self.calls}",
+            model=model,
+            choices=[SimpleNamespace(index=0, finish_reason=finish_reason,
+                                     message=SimpleNamespace(role="assistant", content=content))],
+            usage=usage,
+        ), headers)
+
+    def _stream(self, model, content: str, finish_reason: str, usage, chunk_chars: int = 16):
+        """Chunks shaped like the SDK's ChatCompletionChunk; a final usage-only chunk if requested."""
+        chunk_id = f"mock-{self.calls}"
+        for start in range(0, len(content), chunk_chars):
+            piece = content[start:start + chunk_chars]
+            if self._token_latency:
+                time.sleep(count_tokens(piece) * self._token_latency)
+            last = start + chunk_chars >= len(content)
+            yield SimpleNamespace(
+                id=chunk_id, model=model, usage=None,
+                choices=[SimpleNamespace(index=0, delta=SimpleNamespace(role="assistant", content=piece),
+                                         finish_reason=finish_reason if last else None)],
+            )
+        if usage is not None:
+            yield SimpleNamespace(id=chunk_id, model=model, choices=[], usage=usage)
+
+
+class _AsyncRawCompletions:
+    def __init__(self, owner: "AsyncMockChatClient"):
+        self._owner = owner
+
+    async def create(self, model=None, messages=None, temperature=None, max_tokens=None, **kwargs):
+        resp, headers = await self._owner._acomplete(model, messages or [], max_tokens, kwargs)
+        return _RawResponse(resp, headers)
+
+
+class _AsyncCompletions:
+    def __init__(self, owner: "AsyncMockChatClient"):
+        self._owner = owner
+        self.with_raw_response = _AsyncRawCompletions(owner)
+
+    async def create(self, model=None, messages=None, temperature=None, max_tokens=None, **kwargs):
+        return (await self._owner._acomplete(model, messages or [], max_tokens, kwargs))[0]
+
+
+class AsyncMockChatClient(MockChatClient):
+    """Drop-in for AsyncAzureOpenAI (await client.chat.completions.create(...)); latency is an asyncio.sleep.
+    Non-streaming only: the async pipeline doesn't stream."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chat = SimpleNamespace(completions=_AsyncCompletions(self))
+
+    async def _acomplete(self, model, messages, max_tokens, extra=None):
+        if (extra or {}).get("stream"):
+            raise NotImplementedError("AsyncMockChatClient does not stream")
+        import asyncio
+        delay, failure, answer = self._answer(model, messages, max_tokens, False, extra)
+        await asyncio.sleep(delay)
+        if failure:
+            raise _make_error(failure)
+        return answer
+
+
+def client_from_settings(get_setting, client_class=MockChatClient) -> MockChatClient:
+    """MockChatClient (or client_class=AsyncMockChatClient) configured from the MOCK_LLM_* settings."""
+    seed = get_setting("MOCK_LLM_SEED", None)
+    return client_class(
+        latency=get_setting("MOCK_LLM_LATENCY", "fixed:0"),
+        token_latency=get_setting("MOCK_LLM_TOKEN_LATENCY", 0.0),
+        errors=get_setting("MOCK_LLM_ERRORS", ""),
+        seed=int(seed) if seed is not None else None,
+        rpm=get_setting("MOCK_LLM_RPM", 0),
+        tpm=get_setting("MOCK_LLM_TPM", 0),
+        quota_window_seconds=get_setting("MOCK_LLM_QUOTA_WINDOW_SECONDS", 60.0),
+    )
@@ -0,0 +1,171 @@
+# normalize.py
+"""
+Resume text normalization and token budgeting, applied before the extraction prompt.
+
+normalize_text() cleans what pypdf leaves behind:
+- header / footer lines repeated at the top or bottom of most pages (pages are separated
+  by "\\f", see join_pages(); needs 3+ pages, body lines are never dropped)
+- words hyphenated across line breaks
+- bullet glyphs (•, ▪, ➢, ...) -> "- "
+- ligatures, non-breaking spaces, runs of spaces / blank lines
+
+count_tokens() uses tiktoken when it is installed (and its encoding is available
+locally), otherwise a ~4 chars/token estimate. enforce_token_budget() trims the
+text to a budget, dropping the least useful sections first.
+"""
+
+import re
+from collections import Counter
+from typing import Optional, Tuple
+
+from preextract import segment_sections
+
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+PAGE_BREAK = "\f"
+
+_BULLETS_RE = re.compile(r"^[ \t]*[•●○◦▪▫■□➢➤►▶‣∙·✓✔❖]+[ \t]*", re.MULTILINE)
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n[ \t]*([a-z])")
+_SPACES_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u202f\u3000]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_PAGE_NUMBER_RE = re.compile(r"^(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?$", re.IGNORECASE)
+_LIGATURES = {"\ufb01": "fi", "\ufb02": "fl", "\ufb00": "ff", "\ufb03": "ffi", "\ufb04": "ffl"}
+
+# header / footer detection only looks at this many non-blank lines at each end of a page,
+# and only on documents with at least MIN_PAGES_FOR_REPEATS pages
+EDGE_LINES = 3
+MIN_PAGES_FOR_REPEATS = 3
+
+# least useful first: dropped in this order when a resume is over budget
+SECTION_DROP_ORDER = ("interests", "references", "personal", "awards", "projects", "summary", "languages",
+                      "certifications")
+
+_encoding = None
+_encoding_name = None
+
+
+def _get_encoding():
+    global _encoding, _encoding_name
+    if _encoding is None and tiktoken is not None:
+        for name in ("o200k_base", "cl100k_base"):
+            try:
+                _encoding = tiktoken.get_encoding(name)
+                _encoding_name = name
+                break
+            except Exception:
+                # encodings are downloaded on first use; offline hosts fall back to the estimate
+                continue
+    return _encoding
+
+
+def tokenizer_name() -> str:
+    return f"tiktoken:{_encoding_name}" if _get_encoding() is not None else "estimate"
+
+
+def count_tokens(text: str) -> int:
+    enc = _get_encoding()
+    if enc is not None:
+        return len(enc.encode(text or "", disallowed_special=()))
+    # ~4 characters per token for English prose
+    return (len(text or "") + 3) // 4
+
+
+def _line_key(line: str) -> str:
+    # "Page 2 of 3" / "Jane Doe - CV - 2" repeat with different numbers on every page
+    return re.sub(r"\d+", "#", line.strip().lower())
+
+
+def _edge_lines(lines):
+    # running headers / footers sit in the first or last few lines of a page, never mid-body
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return set(filled[:EDGE_LINES] + filled[-EDGE_LINES:])
+
+
+def _remove_repeated_lines(pages):
+    if len(pages) < 2:
+        return pages
+    page_lines = [page.splitlines() for page in pages]
+    edges = [_edge_lines(lines) for lines in page_lines]
+    repeated = set()
+    # on two pages a repeated job title or section header looks just like a running header
+    if len(pages) >= MIN_PAGES_FOR_REPEATS:
+        min_pages = max(MIN_PAGES_FOR_REPEATS, (len(pages) + 1) // 2)
+        seen_on = Counter()
+        for lines, edge in zip(page_lines, edges):
+            seen_on.update({_line_key(lines[i]) for i in edge if len(lines[i].strip()) <= 80})
+        repeated = {key for key, n in seen_on.items() if n >= min_pages}
+    cleaned = []
+    for page_no, (lines, edge) in enumerate(zip(page_lines, edges)):
+        kept = []
+        for i, line in enumerate(lines):
+            if i in edge:
+                if _PAGE_NUMBER_RE.match(line.strip()):
+                    continue
+                # keep the first page's copy: running headers usually carry the candidate's name
+                if page_no > 0 and _line_key(line) in repeated:
+                    continue
+            kept.append(line)
+        cleaned.append("\n".join(kept))
+    return cleaned
+
+
+def join_pages(pages) -> str:
+    """
+    Page texts as one string for normalize_text(): the plain PDF layout (newline after every
+    page) with PAGE_BREAK between pages, so page numbers and running headers can be found.
+    Only for text that goes through normalize_text(), which takes the page breaks out again.
+    """
+    return PAGE_BREAK.join(page + "\n" for page in pages)
+
+
+def normalize_text(text: str) -> str:
+    text = text or ""
+    for src, dst in _LIGATURES.items():
+        text = text.replace(src, dst)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    pages = _remove_repeated_lines(text.split(PAGE_BREAK))
+    text = "\n".join(pages)
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
+    text = _BULLETS_RE.sub("- ", text)
+    text = _SPACES_RE.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    text = _BLANK_LINES_RE.sub("\n\n", text)
+    return text.strip()
+
+
+def enforce_token_budget(text: str, budget: Optional[int]) -> Tuple[str, bool]:
+    """
+    Return (text, truncated). Over budget: drop sections in SECTION_DROP_ORDER, then trim the
+    longest remaining section from its end, and as a last resort cut the text itself.
+    """
+    if not budget or count_tokens(text) <= budget:
+        return text, False
+
+    sections = [[name, body] for name, body in segment_sections(text)]
+
+    def render():
+        return "\n".join(body if name == "header" else f"{name.upper()}\n{body}" for name, body in sections)
+
+    for drop in SECTION_DROP_ORDER:
+        sections = [s for s in sections if s[0] != drop]
+        if count_tokens(render()) <= budget:
+            return render(), True
+
+    # trim the longest section a few lines at a time (keeps the start of every section)
+    while count_tokens(render()) > budget:
+        longest = max(sections, key=lambda s: len(s[1]))
+        lines = longest[1].split("\n")
+        if len(lines) <= 2:
+            break
+        longest[1] = "\n".join(lines[:max(2, len(lines) - max(1, len(lines) // 10))])
+
+    out = render()
+    if count_tokens(out) > budget:
+        # give up on structure: keep roughly `budget` tokens from the start
+        out = out[:budget * 4]
+        while count_tokens(out) > budget and len(out) > 100:
+            out = out[:int(len(out) * 0.9)]
+    return out, True
@@ -0,0 +1,168 @@
+# pdftext.py
+"""
+PDF -> plain text helpers.
+
+Kept free of Flask / OpenAI imports so the functions can run inside a
+ProcessPoolExecutor worker without dragging the web app into every child.
+
+read_pdf() extracts page by page and records how long each page took. Documents with
+at least `parallel_threshold` pages are split into page ranges and extracted on a
+process pool (pypdf is pure Python, so threads would just contend for the GIL).
+
+pypdf and the process pool machinery are imported on first use, not at import time, so
+pre-forking servers start fast; warm_up() loads them ahead of the first request.
+"""
+
+import io
+import os
+import atexit
+import time
+import hashlib
+import tempfile
+import threading
+from typing import List, NamedTuple, Optional
+
+_CHUNK_SIZE = 64 * 1024
+
+_page_pool = None
+_page_pool_workers = 0
+_page_pool_lock = threading.Lock()
+
+
+class PdfText(NamedTuple):
+    pages: List[Optional[str]]  # None for pages that failed extraction
+    page_seconds: List[float]
+
+    @property
+    def text(self) -> str:
+        # one join instead of repeated `data += page`; same layout as before (newline after every page)
+        return "".join(page + "\n" for page in self.pages if page is not None)
+
+    def joined(self, page_breaks: bool = False) -> str:
+        """text, or with page breaks between pages for normalize_text() (see normalize.join_pages)."""
+        if not page_breaks:
+            return self.text
+        from normalize import join_pages
+        return join_pages(page for page in self.pages if page is not None)
+
+    def slowest_pages(self, n: int = 3):
+        """[(page_no, seconds), ...] for the n slowest pages, 1-based page numbers."""
+        ranked = sorted(enumerate(self.page_seconds, start=1), key=lambda x: x[1], reverse=True)
+        return ranked[:n]
+
+
+def _open(source):
+    from pypdf import PdfReader
+    return PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _extract_page(reader, page_no: int):
+    started = time.perf_counter()
+    try:
+        text = reader.pages[page_no].extract_text() or ""
+    except Exception:
+        # skip pages that fail extraction
+        text = None
+    return text, time.perf_counter() - started
+
+
+def _extract_range(source, start: int, stop: int):
+    """Worker entry point: open the PDF (bytes or path) and extract pages [start, stop)."""
+    reader = _open(source)
+    return [_extract_page(reader, page_no) for page_no in range(start, stop)]
+
+
+def new_process_pool(max_workers: int):
+    """
+    ProcessPoolExecutor for the functions in this module. pypdf is imported here first:
+    workers are forked lazily, and a child forked while another thread of the parent is
+    half-way through importing pypdf would wait forever on that import's lock.
+    """
+    import pypdf  # noqa: F401
+    from concurrent.futures import ProcessPoolExecutor
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+    # shut down before interpreter teardown: the lazily imported executor module may be
+    # cleared before the pool is collected, and its cleanup callback then fails noisily
+    atexit.register(pool.shutdown)
+    return pool
+
+
+def _get_page_pool(max_workers: int):
+    global _page_pool, _page_pool_workers
+    with _page_pool_lock:
+        if _page_pool is None or _page_pool_workers != max_workers:
+            if _page_pool is not None:
+                _page_pool.shutdown(wait=False)
+            _page_pool = new_process_pool(max_workers)
+            _page_pool_workers = max_workers
+        return _page_pool
+
+
+def read_pdf(source, parallel_threshold: int = 0, max_workers: Optional[int] = None) -> PdfText:
+    """
+    Extract text from a PDF given as bytes, a path, or a binary file object.
+    parallel_threshold: page count at which extraction moves to a process pool (0 = never).
+    """
+    reader = _open(source)
+    n_pages = len(reader.pages)
+    workers = max_workers or os.cpu_count() or 1
+
+    if not parallel_threshold or n_pages < parallel_threshold or workers < 2:
+        results = [_extract_page(reader, page_no) for page_no in range(n_pages)]
+    else:
+        # workers need something picklable: the path, or the raw bytes for streams
+        if isinstance(source, (bytes, str, os.PathLike)):
+            payload = source
+        else:
+            source.seek(0)
+            payload = source.read()
+        n_chunks = min(workers, n_pages)
+        bounds = [(i * n_pages // n_chunks, (i + 1) * n_pages // n_chunks) for i in range(n_chunks)]
+        pool = _get_page_pool(workers)
+        futures = [pool.submit(_extract_range, payload, start, stop) for start, stop in bounds]
+        results = [item for fut in futures for item in fut.result()]
+
+    return PdfText([text for text, _ in results], [seconds for _, seconds in results])
+
+
+def read_pdf_bytes(pdf_bytes: bytes, page_breaks: bool = False) -> str:
+    """Extract text from an in-memory PDF (picklable entry point for process pools); see PdfText.joined()."""
+    return read_pdf(pdf_bytes).joined(page_breaks)
+
+
+async def read_pdf_bytes_async(pdf_bytes: bytes, executor=None, page_breaks: bool = False) -> str:
+    """
+    read_pdf_bytes() off the event loop. Pass a ProcessPoolExecutor for real parallelism
+    (pypdf holds the GIL, so on the default thread pool it still slows the loop down).
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, read_pdf_bytes, pdf_bytes, page_breaks)
+
+
+def warm_up() -> None:
+    """Import pypdf and run one tiny document through it (font / filter modules load lazily too)."""
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    buf = io.BytesIO()
+    writer.write(buf)
+    read_pdf(buf.getvalue())
+
+
+def spool_stream(stream, max_memory_bytes: int, tmp_dir=None):
+    """
+    Copy an upload stream into a SpooledTemporaryFile, hashing it on the way.
+    Small uploads stay in memory; anything above max_memory_bytes spills to a private
+    temp file (deleted on close). Returns (spool positioned at 0, sha256 hex digest).
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory_bytes, dir=tmp_dir)
+    digest = hashlib.sha256()
+    while True:
+        chunk = stream.read(_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool, digest.hexdigest()
@@ -0,0 +1,153 @@
+# preextract.py
+"""
+Deterministic pre-pass over extracted resume text.
+
+Pulls out the schema fields a regex can get right (email, LinkedIn / GitHub URLs),
+splits the text into sections by heading, and builds a reduced text for the model:
+contact details (phone numbers too) removed, sections the schema never uses
+(references, hobbies, personal details / declaration) dropped.
+
+Only the input side shrinks much. On the output side the model skips just the fields
+found here; employment dates and everything else in the JSON are still generated by
+the model (reducing output tokens further is out of scope for this pass).
+
+Public API:
+    preextract(text: str) -> dict
+        {"fields": {...}, "sections": [...], "dropped_sections": [...], "text": reduced_text}
+        fields holds None for anything the regexes didn't find.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/(?:in|pub)/[A-Za-z0-9_%-]+/?", re.IGNORECASE)
+GITHUB_RE = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?/?", re.IGNORECASE)
+PHONE_RE = re.compile(r"(?<![\w/])\+?\(?\d[\d\s().-]{7,}\d(?![\w/])")
+CONTACT_LABEL_RE = re.compile(
+    r"\b(?:e-?mail|phone|mobile|mob|tel|telephone|cell|contact|linkedin|github)\b\s*[:.]?", re.IGNORECASE
+)
+
+_MONTH = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+_DATE = rf"(?:{_MONTH}\.?,?\s*'?\d{{2,4}}|\d{{1,2}}/\d{{4}}|\d{{4}}-\d{{2}}|\d{{4}})"
+_OPEN_END = r"(?:present|current|now|till\s+date|to\s+date|ongoing)"
+DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{_DATE}|{_OPEN_END})(?!\d)", re.IGNORECASE
+)
+
+SECTION_ALIASES = {
+    "summary": ("summary", "profile", "professional summary", "career summary", "objective", "career objective", "about me"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "career history", "relevant experience"),
+    "education": ("education", "academic background", "qualifications", "academic qualifications",
+                  "education and training"),
+    "skills": ("skills", "technical skills", "core competencies", "key skills", "competencies", "technologies",
+               "skills and tools", "technical expertise"),
+    "certifications": ("certifications", "certificates", "licenses", "licenses and certifications",
+                       "certifications and training", "courses", "training"),
+    "languages": ("languages", "language skills"),
+    "projects": ("projects", "key projects", "personal projects", "academic projects"),
+    "awards": ("awards", "achievements", "honors", "honours", "awards and achievements", "publications"),
+    "references": ("references", "referees"),
+    "interests": ("interests", "hobbies", "hobbies and interests", "extracurricular activities"),
+    "personal": ("personal details", "personal information", "personal profile", "declaration"),
+}
+# nothing in the extraction schema comes from these, so the model never needs to read them
+DROP_SECTIONS = ("references", "interests", "personal")
+
+_HEADING_LOOKUP = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+
+def _heading_name(line: str) -> Optional[str]:
+    s = line.strip()
+    if not s or len(s) > 40:
+        return None
+    s = s.lower().replace("&", " and ")
+    s = re.sub(r"[^a-z ]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return _HEADING_LOOKUP.get(s)
+
+
+def segment_sections(text: str) -> List[Tuple[str, str]]:
+    """Split text into [(section_name, body), ...]; whatever precedes the first heading is "header"."""
+    sections = []
+    name, lines = "header", []
+    for line in text.splitlines():
+        heading = _heading_name(line)
+        if heading:
+            sections.append((name, "\n".join(lines)))
+            name, lines = heading, []
+        else:
+            lines.append(line)
+    sections.append((name, "\n".join(lines)))
+    return [(n, body) for n, body in sections if body.strip() or n != "header"]
+
+
+def _find_phone(text: str) -> Optional[str]:
+    for m in PHONE_RE.finditer(text):
+        candidate = m.group(0).strip()
+        digits = re.sub(r"\D", "", candidate)
+        if not 9 <= len(digits) <= 15:
+            continue
+        # "2019 - 2021" / "01.2019 - 03.2021" style date ranges are not phone numbers
+        if re.fullmatch(r"[\d./]*(?:19|20)\d\d\s*[-–]\s*[\d./]*(?:19|20)\d\d", candidate):
+            continue
+        return candidate
+    return None
+
+
+def _normalize_url(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    url = url.rstrip("/")
+    return url if url.lower().startswith("http") else "https://" + url
+
+
+def _strip_contacts(text: str, values) -> str:
+    out = []
+    for line in text.splitlines():
+        stripped = line
+        for value in values:
+            stripped = stripped.replace(value, "")
+        if stripped != line:
+            # drop the line entirely if only labels / separators are left
+            residue = CONTACT_LABEL_RE.sub("", stripped)
+            if not re.sub(r"[\s|•·,;:/()\-–]+", "", residue):
+                continue
+        out.append(stripped)
+    return "\n".join(out)
+
+
+def preextract(text: str) -> dict:
+    text = text or ""
+    email = EMAIL_RE.search(text)
+    linkedin = LINKEDIN_RE.search(text)
+    github = GITHUB_RE.search(text)
+    # look for the phone with emails / URLs masked so their digits can't match
+    masked = text
+    for m in (email, linkedin, github):
+        if m:
+            masked = masked.replace(m.group(0), " ")
+    phone = _find_phone(masked)
+
+    fields = {
+        "email": email.group(0) if email else None,
+        "linkedin": _normalize_url(linkedin.group(0) if linkedin else None),
+        "github": _normalize_url(github.group(0) if github else None),
+    }
+
+    sections = segment_sections(text)
+    kept = []
+    for name, body in sections:
+        if name in DROP_SECTIONS:
+            continue
+        kept.append(body if name == "header" else f"{name.upper()}\n{body}")
+    found = [m.group(0) for m in (email, linkedin, github) if m] + ([phone] if phone else [])
+    reduced = _strip_contacts("\n".join(kept), found)
+
+    return {
+        "fields": fields,
+        "sections": [name for name, _ in sections],
+        "dropped_sections": [name for name, _ in sections if name in DROP_SECTIONS],
+        "text": reduced,
+    }
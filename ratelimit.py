@@ -0,0 +1,331 @@
+# ratelimit.py
+"""
+Shared, quota-aware scheduler for chat-completion calls.
+
+Azure OpenAI enforces requests-per-minute (RPM) and tokens-per-minute (TPM) quotas per
+deployment of a resource and answers 429 once either is exceeded. Every call in the process
+goes through one RateLimiter per (endpoint, deployment), which:
+- holds two token buckets (requests, tokens) that refill continuously over the window;
+  a call waits until both can cover it (tokens = prompt estimate + max_tokens, which is
+  what Azure counts against TPM up front), then settles to the real usage afterwards
+  (for streamed completions, from the usage in the final chunk: settled_stream())
+- learns the quota from x-ratelimit-limit-* / x-ratelimit-remaining-* response headers
+  when no limit is configured, and never lets its buckets run ahead of what the server
+  says is remaining
+- on 429 / 5xx / timeouts, pauses *every* caller of that deployment until Retry-After
+  (or an exponential backoff with full jitter), so a burst of 429s turns into one wait
+  instead of a retry storm, then retries up to max_retries times
+
+Limits of 0 mean "unknown": the bucket doesn't throttle until headers report a quota.
+
+call() blocks the calling thread; acall() is the same scheduler for coroutines (waits with
+asyncio.sleep, so one event loop can keep many calls queued). Both share the buckets, so
+threads and coroutines of one process draw on the same quota.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import threading
+from typing import Awaitable, Callable, Optional
+
+RETRYABLE_STATUS = (408, 409, 429, 500, 502, 503, 504)
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value) -> Optional[float]:
+    """Seconds from "12", "0.5", "250ms", "6m0s" (OpenAI x-ratelimit-reset-* format); None if unparseable."""
+    if value is None:
+        return None
+    value = str(value).strip().lower()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Server-requested wait from retry-after-ms / retry-after headers (numeric forms only)."""
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms is not None:
+        try:
+            return float(ms) / 1000.0
+        except ValueError:
+            pass
+    return parse_duration(headers.get("retry-after"))
+
+
+def is_retryable(exc: Exception) -> bool:
+    # openai is imported lazily by the client code; if it was never imported, exc can't be one of its errors
+    openai = sys.modules.get("openai")
+    connection_error = getattr(openai, "APIConnectionError", None)
+    if connection_error is not None and isinstance(exc, connection_error):
+        return True  # includes APITimeoutError
+    status = getattr(exc, "status_code", None)
+    return status in RETRYABLE_STATUS
+
+
+def _error_headers(exc: Exception):
+    response = getattr(exc, "response", None)
+    return getattr(response, "headers", None)
+
+
+def _int_header(headers, name) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class _Bucket:
+    __slots__ = ("limit", "level", "updated")
+
+    def __init__(self, limit: float):
+        self.limit = float(limit or 0)
+        self.level = self.limit
+        self.updated = time.monotonic()
+
+    def refill(self, now: float, window: float) -> None:
+        if self.limit:
+            self.level = min(self.limit, self.level + (now - self.updated) * self.limit / window)
+        self.updated = now
+
+    def wait_for(self, amount: float, window: float) -> float:
+        """Seconds until `amount` is available (0 = now). Requests larger than the bucket wait for a full one."""
+        if not self.limit:
+            return 0.0
+        amount = min(amount, self.limit)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * window / self.limit
+
+
+class RateLimiter:
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_retries: int = 5, backoff_base: float = 1.0,
+                 backoff_max: float = 60.0, window_seconds: float = 60.0):
+        self.requests = _Bucket(rpm)
+        self.tokens = _Bucket(tpm)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.window = window_seconds
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._rng = random.Random()
+        # counters (read via stats())
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0  # 429s seen
+        self.wait_seconds = 0.0
+
+    # ---- admission ----
+    def _try_take_locked(self, estimated_tokens: int) -> float:
+        """Take one request + the token estimate if both fit (returns 0), else the seconds to wait."""
+        now = time.monotonic()
+        self.requests.refill(now, self.window)
+        self.tokens.refill(now, self.window)
+        wait = max(self._paused_until - now,
+                   self.requests.wait_for(1, self.window),
+                   self.tokens.wait_for(estimated_tokens, self.window))
+        if wait <= 0:
+            if self.requests.limit:
+                self.requests.level -= 1
+            if self.tokens.limit:
+                self.tokens.level -= estimated_tokens
+        return wait
+
+    def _admitted(self, started: float) -> float:
+        waited = time.monotonic() - started
+        with self._cond:
+            self.calls += 1
+            self.wait_seconds += waited
+        return waited
+
+    def acquire(self, estimated_tokens: int) -> float:
+        """Block until the call fits in both buckets and no backoff is active; returns seconds waited."""
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                wait = self._try_take_locked(estimated_tokens)
+                if wait <= 0:
+                    break
+                self._cond.wait(timeout=min(wait, 5.0))
+        return self._admitted(started)
+
+    async def aacquire(self, estimated_tokens: int) -> float:
+        """acquire() for coroutines: sleeps on the event loop instead of blocking a thread."""
+        import asyncio  # only loaded by async callers
+        started = time.monotonic()
+        while True:
+            with self._cond:
+                wait = self._try_take_locked(estimated_tokens)
+            if wait <= 0:
+                break
+            # settle() from another caller may free budget early; re-check at least every 0.25 s
+            await asyncio.sleep(min(wait, 0.25))
+        return self._admitted(started)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int], headers=None) -> None:
+        """Correct the token bucket to the real usage and sync both buckets with rate-limit headers."""
+        with self._cond:
+            if self.tokens.limit and actual_tokens is not None:
+                self.tokens.level = min(self.tokens.limit, self.tokens.level + estimated_tokens - actual_tokens)
+            if headers:
+                self._sync(headers)
+            self._cond.notify_all()
+
+    def settled_stream(self, chunks, estimated_tokens: int):
+        """
+        Pass a streamed completion's chunks through, settling the token bucket once the stream ends
+        from the usage in its last chunk (stream_options.include_usage). A stream that ends without
+        one (cut short, or the server ignored include_usage) keeps the up-front estimate charged.
+        """
+        actual_tokens = None
+        try:
+            for chunk in chunks:
+                usage = getattr(chunk, "usage", None)
+                if usage is not None:
+                    actual_tokens = getattr(usage, "total_tokens", None)
+                yield chunk
+        finally:
+            self.settle(estimated_tokens, actual_tokens)
+
+    def _sync(self, headers) -> None:
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            limit = _int_header(headers, f"x-ratelimit-limit-{kind}")
+            remaining = _int_header(headers, f"x-ratelimit-remaining-{kind}")
+            if limit and not bucket.limit:
+                # quota learned from the server
+                bucket.limit = float(limit)
+                bucket.level = float(remaining if remaining is not None else limit)
+            elif remaining is not None and bucket.limit:
+                # other processes / clients share the quota: trust the server when it says less is left
+                bucket.level = min(bucket.level, float(remaining))
+
+    # ---- failures ----
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Pause every caller: Retry-After if the server gave one, else full-jitter exponential backoff."""
+        if retry_after is not None:
+            delay = min(retry_after, self.backoff_max) + self._rng.uniform(0, 0.1 * self.backoff_base)
+        else:
+            delay = self._rng.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            if self.requests.limit:
+                self.requests.level = min(self.requests.level, 0.0)
+        return delay
+
+    def call(self, send: Callable[[], tuple], estimated_tokens: int, stats: Optional[dict] = None):
+        """
+        Run send() -> (response, headers) under the limiter, retrying retryable failures.
+        Per-call retries / wait time are added to `stats` ("retries", "throttled_ms") when given.
+        """
+        attempt = 0
+        while True:
+            self._note_wait(stats, self.acquire(estimated_tokens))
+            try:
+                resp, headers = send()
+            except Exception as e:
+                if not self._failed(e, attempt, estimated_tokens, stats):
+                    raise
+                attempt += 1
+                continue
+            return self._succeeded(resp, headers, estimated_tokens)
+
+    async def acall(self, send: Callable[[], Awaitable[tuple]], estimated_tokens: int, stats: Optional[dict] = None):
+        """call() for coroutines: `send` is an async callable returning (response, headers)."""
+        attempt = 0
+        while True:
+            self._note_wait(stats, await self.aacquire(estimated_tokens))
+            try:
+                resp, headers = await send()
+            except Exception as e:
+                if not self._failed(e, attempt, estimated_tokens, stats):
+                    raise
+                attempt += 1
+                continue
+            return self._succeeded(resp, headers, estimated_tokens)
+
+    @staticmethod
+    def _note_wait(stats: Optional[dict], waited: float) -> None:
+        if stats is not None and waited > 0.001:
+            stats["throttled_ms"] = round(stats.get("throttled_ms", 0) + waited * 1000.0, 2)
+
+    def _failed(self, e: Exception, attempt: int, estimated_tokens: int, stats: Optional[dict]) -> bool:
+        """Book-keeping for a failed attempt; True if it should be retried (after the backoff it set)."""
+        headers = _error_headers(e)
+        with self._cond:
+            # a rejected call still used a request slot but no tokens
+            if self.tokens.limit:
+                self.tokens.level = min(self.tokens.limit, self.tokens.level + estimated_tokens)
+            if getattr(e, "status_code", None) == 429:
+                self.throttled += 1
+            if headers:
+                self._sync(headers)
+        if not is_retryable(e) or attempt >= self.max_retries:
+            return False
+        self.backoff(attempt, retry_after_seconds(headers))
+        with self._cond:
+            self.retries += 1
+        if stats is not None:
+            stats["retries"] = stats.get("retries", 0) + 1
+        return True
+
+    def _succeeded(self, resp, headers, estimated_tokens: int):
+        usage = getattr(resp, "usage", None)
+        self.settle(estimated_tokens, getattr(usage, "total_tokens", None), headers)
+        return resp
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "rpm_limit": self.requests.limit,
+                "tpm_limit": self.tokens.limit,
+                "calls": self.calls,
+                "retries": self.retries,
+                "throttled_429": self.throttled,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+# -------------------------
+# One limiter per (endpoint, deployment)
+# -------------------------
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(key, factory: Callable[[], RateLimiter]) -> RateLimiter:
+    """The shared limiter for `key`, e.g. (endpoint, deployment): the scope Azure applies a quota to."""
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = factory()
+        return limiter
+
+
+def all_stats() -> dict:
+    with _limiters_lock:
+        return {key: limiter.stats() for key, limiter in _limiters.items()}
+
+
+def _reset_after_fork() -> None:
+    # a forked worker must not inherit locks another thread of the parent may have been holding
+    global _limiters_lock
+    _limiters_lock = threading.Lock()
+    _limiters.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
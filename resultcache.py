@@ -0,0 +1,187 @@
+# resultcache.py
+"""
+Content-addressed cache for parsed resume results.
+
+Two tiers:
+- LRUCache: in-process, thread-safe, bounded by entry count and TTL.
+- DiskCache: one JSON file per entry under __DATA__/cache, survives restarts.
+
+TieredCache checks memory first, then disk (promoting disk hits back into memory).
+Keys come from make_cache_key(pdf_bytes, deployment, prompt_version), so re-uploading
+the exact same PDF against the same deployment / prompts is a hit.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+_CACHE_KEY_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def is_cache_key(key) -> bool:
+    """True for a key make_cache_key() could have produced (a sha256 hex digest)."""
+    return isinstance(key, str) and _CACHE_KEY_RE.fullmatch(key) is not None
+
+
+def make_cache_key(pdf_bytes: bytes, deployment: Optional[str], prompt_version: str) -> str:
+    """sha256 over the document digest plus everything else that changes the model output."""
+    return make_cache_key_for_digest(hashlib.sha256(pdf_bytes).hexdigest(), deployment, prompt_version)
+
+
+def make_cache_key_for_digest(doc_digest: str, deployment: Optional[str], prompt_version: str) -> str:
+    """Same as make_cache_key, for callers that hashed the document while streaming it."""
+    material = f"{doc_digest}:{deployment or ''}:{prompt_version}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# -------------------------
+# In-process tier
+# -------------------------
+class LRUCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if self.ttl_seconds and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> int:
+        with self._lock:
+            n = len(self._data)
+            self._data.clear()
+            return n
+
+    def __len__(self):
+        return len(self._data)
+
+
+# -------------------------
+# On-disk tier
+# -------------------------
+class DiskCache:
+    def __init__(self, directory: str, ttl_seconds: float = 7 * 24 * 3600.0):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # keys reach this from clients (DELETE /api/cache/<key>): never build a path from anything else
+        if not is_cache_key(key):
+            raise ValueError(f"invalid cache key: {key!r}")
+        # shard by prefix so a large cache doesn't end up as one huge directory
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key: str):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if self.ttl_seconds and time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self.delete(key)
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump({"created_at": time.time(), "value": value}, fh)
+            # atomic swap so concurrent readers never see a half-written entry
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(self._path(key))
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def clear(self) -> int:
+        n = 0
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(root, name))
+                        n += 1
+                    except OSError:
+                        continue
+        return n
+
+
+# -------------------------
+# Memory + disk
+# -------------------------
+class TieredCache:
+    def __init__(self, memory: LRUCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                return value
+        return None
+
+    def set(self, key: str, value) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except OSError:
+                # a full / read-only disk must not break the request; memory tier still works
+                pass
+
+    def invalidate(self, key: str) -> bool:
+        removed = self.memory.delete(key)
+        if self.disk is not None:
+            removed = self.disk.delete(key) or removed
+        return removed
+
+    def clear(self) -> int:
+        n = self.memory.clear()
+        if self.disk is not None:
+            n = max(n, self.disk.clear())
+        return n
@@ -388,6 +388,8 @@ Public API:
                   azure_api_key: Optional[str] = None,
                   azure_endpoint: Optional[str] = None,
                   deployment: Optional[str] = None) -> dict
+    ats_extractor_stages(...)  -> generator of (stage, payload), same arguments
+    ats_extractor_batch({doc_id: text}, ...) -> {doc_id: dict}, through a batch API (batchllm.py)
 
 Notes:
 - If azure_api_key / azure_endpoint / deployment are provided to ats_extractor, those are used for the single request.
@@ -399,35 +401,166 @@ Notes:
 from typing import Optional
 import os
 import json
-import yaml
 import re
+import copy
+import time
+import hashlib
+import threading
 from datetime import date
 from datetime import datetime
 
-# try to import AzureOpenAI wrapper from OpenAI package (as in your screenshot)
-try:
-    # The newer OpenAI package exposes AzureOpenAI class in some releases.
-    # If your local openai package doesn't have it, use the standard OpenAI client and adapt accordingly.
-    from openai import AzureOpenAI
-except Exception as e:
-    AzureOpenAI = None  # we'll raise later with clear message
+from clientpool import ClientRegistry
+from preextract import preextract as run_preextract
+from normalize import normalize_text, enforce_token_budget, count_tokens, tokenizer_name
+from dateparse import parse_date
+from ratelimit import RateLimiter, limiter_for
+from metrics import observe_stage, LLM_CALLS, LLM_TOKENS, LLM_CONTINUATIONS, JSON_PARSE, ASSESSMENT_CACHE_REQUESTS
+from streamparse import IncrementalJSONParser
+from sectionchunks import chunk_resume, merge_chunk_profiles
+from resultcache import LRUCache, DiskCache, TieredCache
+
+
+def _import_openai():
+    """
+    (AzureOpenAI, AsyncAzureOpenAI, httpx), imported on first client creation rather than at module
+    import: openai + httpx are most of this module's import time. Missing pieces come back as None.
+    """
+    try:
+        # The newer OpenAI package exposes AzureOpenAI class in some releases.
+        # If your local openai package doesn't have it, use the standard OpenAI client and adapt accordingly.
+        from openai import AzureOpenAI
+    except Exception:
+        AzureOpenAI = None  # we'll raise later with clear message
+    try:
+        from openai import AsyncAzureOpenAI
+    except Exception:
+        AsyncAzureOpenAI = None
+    try:
+        import httpx
+    except Exception:
+        httpx = None
+    return AzureOpenAI, AsyncAzureOpenAI, httpx
 
 # -------------------------
 # Load default Azure config from config.yaml or environment
 # -------------------------
 CONFIG_PATH = "config.yaml"
 cfg = {}
-if os.path.exists(CONFIG_PATH):
+# set by configure(); checked before config.yaml and the environment
+_overrides = {}
+
+
+def load_config(path: str = CONFIG_PATH) -> dict:
+    """config.yaml as a dict ({} when missing or unreadable); yaml is only imported if the file exists."""
+    if not os.path.exists(path):
+        return {}
     try:
-        with open(CONFIG_PATH, "r") as fh:
-            cfg = yaml.load(fh, Loader=yaml.FullLoader) or {}
+        import yaml
+        with open(path, "r") as fh:
+            return yaml.load(fh, Loader=yaml.FullLoader) or {}
     except Exception:
-        cfg = {}
+        return {}
+
+# "azure" (default) or "mock" (offline stand-in from mockllm.py, for load tests / benchmarks)
+LLM_BACKEND_AZURE = "azure"
+LLM_BACKEND_MOCK = "mock"
 
-DEFAULT_AZURE_API_KEY = cfg.get("AZURE_API_KEY") or os.environ.get("AZURE_API_KEY") or os.environ.get("OPENAI_API_KEY")
-DEFAULT_AZURE_ENDPOINT = cfg.get("AZURE_ENDPOINT") or os.environ.get("AZURE_ENDPOINT") or os.environ.get("OPENAI_ENDPOINT")
-DEFAULT_AZURE_DEPLOYMENT = cfg.get("AZURE_DEPLOYMENT") or os.environ.get("AZURE_DEPLOYMENT") or cfg.get("AZURE_DEPLOYMENT_NAME")
-DEFAULT_AZURE_API_VERSION = cfg.get("AZURE_API_VERSION") or os.environ.get("AZURE_API_VERSION") or "2024-12-01-preview"
+# Bump whenever the extraction / assessment prompts change so cached results are not reused.
+PROMPT_VERSION = "1"
+
+PIPELINE_TWO_CALL = "two_call"   # extraction completion, then a separate assessment completion
+PIPELINE_COMBINED = "combined"   # one completion returns profile + assessment
+PIPELINE_CHUNKED = "chunked"     # long resumes: one extraction completion per section chunk, in parallel
+
+
+def get_setting(name: str, default=None):
+    """
+    Look up an optional setting: configure() overrides first, then config.yaml, then the environment,
+    then `default`. String values are coerced to the type of `default` (bool / int / float) when one is given.
+    """
+    value = _overrides.get(name)
+    if value is None:
+        value = cfg.get(name)
+    if value is None:
+        value = os.environ.get(name)
+    if value is None:
+        return default
+    if isinstance(value, str) and default is not None and not isinstance(default, str):
+        if isinstance(default, bool):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        try:
+            return type(default)(value)
+        except ValueError:
+            return default
+    return value
+
+
+def _resolve_defaults() -> None:
+    """(Re)compute the module-level defaults from cfg / overrides / environment."""
+    global DEFAULT_AZURE_API_KEY, DEFAULT_AZURE_ENDPOINT, DEFAULT_AZURE_DEPLOYMENT, DEFAULT_AZURE_API_VERSION
+    global LLM_BACKEND, DEFAULT_PIPELINE_MODE, DEFAULT_PREEXTRACT, DEFAULT_NORMALIZE, DEFAULT_TOKEN_BUDGET
+    global DEFAULT_STREAM, ASSESSMENT_CACHE_ENABLED, MAX_CONTINUATIONS, CHUNK_MAX_TOKENS, CHUNK_MIN_TOKENS
+    DEFAULT_AZURE_API_KEY = get_setting("AZURE_API_KEY") or os.environ.get("OPENAI_API_KEY")
+    DEFAULT_AZURE_ENDPOINT = get_setting("AZURE_ENDPOINT") or os.environ.get("OPENAI_ENDPOINT")
+    DEFAULT_AZURE_DEPLOYMENT = get_setting("AZURE_DEPLOYMENT") or get_setting("AZURE_DEPLOYMENT_NAME")
+    DEFAULT_AZURE_API_VERSION = get_setting("AZURE_API_VERSION") or "2024-12-01-preview"
+
+    LLM_BACKEND = get_setting("LLM_BACKEND", LLM_BACKEND_AZURE)
+    DEFAULT_PIPELINE_MODE = get_setting("PIPELINE_MODE", PIPELINE_TWO_CALL)
+    # Regex pre-pass for contact fields / sections before the model call (see preextract.py)
+    DEFAULT_PREEXTRACT = get_setting("PREEXTRACT", False)
+    # Text cleanup and prompt size cap before the model call (see normalize.py)
+    DEFAULT_NORMALIZE = get_setting("NORMALIZE_TEXT", True)
+    DEFAULT_TOKEN_BUDGET = get_setting("RESUME_TOKEN_BUDGET", 12000)
+    # stream the extraction completion and report profile fields as they are generated
+    DEFAULT_STREAM = get_setting("STREAM_EXTRACTION", False)
+    # memoized assessments (see get_assessment_cache)
+    ASSESSMENT_CACHE_ENABLED = get_setting("ASSESSMENT_CACHE_ENABLED", True)
+    # a completion cut off at max_tokens is continued this many times before giving up
+    MAX_CONTINUATIONS = get_setting("LLM_MAX_CONTINUATIONS", 2)
+    # PIPELINE_CHUNKED: prompt tokens per chunk; shorter resumes still go in one completion
+    CHUNK_MAX_TOKENS = get_setting("CHUNK_MAX_TOKENS", 1500)
+    CHUNK_MIN_TOKENS = get_setting("CHUNK_MIN_TOKENS", 2500)
+
+
+cfg = load_config()
+_resolve_defaults()
+
+
+def configure(overrides: Optional[dict] = None, config_path: Optional[str] = None) -> None:
+    """
+    Re-read config.yaml (or config_path) and apply `overrides` on top of it, then re-resolve every
+    default in this module. Used by app.create_app(config); call before serving requests.
+    """
+    global cfg, _overrides, _assessment_cache
+    cfg = load_config(config_path or CONFIG_PATH)
+    _overrides = dict(overrides or {})
+    _resolve_defaults()
+    for registry in (_client_registry, _async_client_registry):
+        registry.max_size = get_setting("AZURE_CLIENT_POOL_SIZE", 32)
+        registry.idle_seconds = get_setting("AZURE_CLIENT_IDLE_SECONDS", 300.0)
+    with _assessment_cache_lock:
+        _assessment_cache = None  # rebuilt with the new settings on next use
+
+
+def normalization_enabled(normalize: Optional[bool] = None) -> bool:
+    """Whether ats_extractor runs normalize_text(); PDF text for it keeps its page breaks (pdftext.PdfText.joined)."""
+    return DEFAULT_NORMALIZE if normalize is None else normalize
+
+
+def pipeline_fingerprint(pipeline_mode: Optional[str] = None, preextract: Optional[bool] = None,
+                         normalize: Optional[bool] = None, token_budget: Optional[int] = None) -> str:
+    """Everything besides the document that changes the result; used to namespace cached results."""
+    use_preextract = DEFAULT_PREEXTRACT if preextract is None else preextract
+    use_normalize = DEFAULT_NORMALIZE if normalize is None else normalize
+    budget = DEFAULT_TOKEN_BUDGET if token_budget is None else token_budget
+    return ":".join([
+        PROMPT_VERSION,
+        pipeline_mode or DEFAULT_PIPELINE_MODE,
+        "pre" if use_preextract else "raw",
+        "norm" if use_normalize else "verbatim",
+        str(budget or 0),
+    ])
 
 # -------------------------
 # Utilities: clean & parse JSON-like model output
@@ -453,43 +586,33 @@ def _attempt_fix_and_parse(s: str):
     if not isinstance(s, str):
         raise ValueError("Expected string input for JSON parsing.")
     try:
-        return json.loads(s)
+        parsed = json.loads(s)
+        JSON_PARSE.inc(outcome="direct")
+        return parsed
     except json.JSONDecodeError:
+        started = time.perf_counter()
         fixed = s.replace("“", "\"").replace("”", "\"").replace("‘", "\"").replace("’", "\"")
         fixed = re.sub(r"(?<!\\)\'", "\"", fixed)
         fixed = re.sub(r",\s*(\}|])", r"\1", fixed)
         idx = fixed.find("{")
         if idx > 0:
             fixed = fixed[idx:]
-        return json.loads(fixed)
+        try:
+            parsed = json.loads(fixed)
+        except json.JSONDecodeError:
+            JSON_PARSE.inc(outcome="failed")
+            raise
+        finally:
+            observe_stage("json_repair", time.perf_counter() - started)
+        JSON_PARSE.inc(outcome="repaired")
+        return parsed
 
 # -------------------------
 # Date parsing & experience analysis helpers
 # -------------------------
-MONTHS = {
-    'jan':1,'feb':2,'mar':3,'apr':4,'may':5,'jun':6,
-    'jul':7,'aug':8,'sep':9,'sept':9,'oct':10,'nov':11,'dec':12
-}
-
-def parse_fuzzy_date(s: Optional[str]):
-    if not s or not isinstance(s, str):
-        return None
-    s = s.strip()
-    low = s.lower()
-    if low in ("present", "current", "now"):
-        return date.today()
-    m = re.search(r"([A-Za-z]{3,9})\s+(\d{4})", s)
-    if m:
-        mon = m.group(1)[:3].lower()
-        year = int(m.group(2))
-        mon_num = MONTHS.get(mon)
-        if mon_num:
-            return date(year, mon_num, 1)
-    m2 = re.search(r"(\d{4})", s)
-    if m2:
-        year = int(m2.group(1))
-        return date(year, 1, 1)
-    return None
+def parse_fuzzy_date(s: Optional[str], today: Optional[date] = None):
+    # compiled + memoized grammar in dateparse.py; "present" resolves to `today`
+    return parse_date(s, today)
 
 def months_between(start_date: date, end_date: date):
     if not start_date or not end_date:
@@ -533,23 +656,310 @@ def merge_intervals_and_total_days(intervals):
 # Azure OpenAI helpers
 # -------------------------
 def _make_azure_client(azure_api_key: str, azure_endpoint: str, api_version: str = DEFAULT_AZURE_API_VERSION):
+    if LLM_BACKEND == LLM_BACKEND_MOCK:
+        import mockllm
+        return mockllm.client_from_settings(get_setting)
+    AzureOpenAI, _, httpx = _import_openai()
     if AzureOpenAI is None:
         raise RuntimeError(
             "AzureOpenAI client not available. Ensure you installed a compatible 'openai' Python package "
             "that exports AzureOpenAI (or adapt this file to your SDK)."
         )
+    kwargs = {}
+    if httpx is not None:
+        # keep-alive pool shared by every request that reuses this client
+        kwargs["http_client"] = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=get_setting("AZURE_HTTP_MAX_CONNECTIONS", 100),
+                max_keepalive_connections=get_setting("AZURE_HTTP_MAX_KEEPALIVE", 20),
+                keepalive_expiry=get_setting("AZURE_HTTP_KEEPALIVE_SECONDS", 60.0),
+            ),
+            timeout=httpx.Timeout(get_setting("AZURE_HTTP_TIMEOUT_SECONDS", 120.0), connect=10.0),
+        )
     client = AzureOpenAI(
         api_key=azure_api_key,
         azure_endpoint=azure_endpoint,
-        api_version=api_version
+        api_version=api_version,
+        max_retries=0,  # retries are scheduled by ratelimit.RateLimiter, shared across requests
+        **kwargs
     )
     return client
 
+
+# Clients are reused across requests, including ones built from per-request x-openai-key headers.
+_client_registry = ClientRegistry(
+    lambda *args: _make_azure_client(*args),
+    max_size=get_setting("AZURE_CLIENT_POOL_SIZE", 32),
+    idle_seconds=get_setting("AZURE_CLIENT_IDLE_SECONDS", 300.0),
+)
+
+
+def _leased_azure_client(azure_api_key: str, azure_endpoint: str, api_version: str = DEFAULT_AZURE_API_VERSION):
+    """Context manager yielding a pooled client; the raw key is hashed so it never sits in the registry's keys."""
+    key_digest = hashlib.sha256(azure_api_key.encode("utf-8")).hexdigest()
+    return _client_registry.lease(
+        (key_digest, azure_endpoint, api_version),
+        azure_api_key, azure_endpoint, api_version,
+    )
+
+
+def _make_async_azure_client(azure_api_key: str, azure_endpoint: str, api_version: str = DEFAULT_AZURE_API_VERSION):
+    if LLM_BACKEND == LLM_BACKEND_MOCK:
+        import mockllm
+        return mockllm.client_from_settings(get_setting, mockllm.AsyncMockChatClient)
+    _, AsyncAzureOpenAI, httpx = _import_openai()
+    if AsyncAzureOpenAI is None:
+        raise RuntimeError("AsyncAzureOpenAI client not available. Install an 'openai' package (>= 1.0) that exports it.")
+    kwargs = {}
+    if httpx is not None:
+        kwargs["http_client"] = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=get_setting("AZURE_ASYNC_HTTP_MAX_CONNECTIONS", 500),
+                max_keepalive_connections=get_setting("AZURE_ASYNC_HTTP_MAX_KEEPALIVE", 100),
+                keepalive_expiry=get_setting("AZURE_HTTP_KEEPALIVE_SECONDS", 60.0),
+            ),
+            timeout=httpx.Timeout(get_setting("AZURE_HTTP_TIMEOUT_SECONDS", 120.0), connect=10.0),
+        )
+    return AsyncAzureOpenAI(
+        api_key=azure_api_key,
+        azure_endpoint=azure_endpoint,
+        api_version=api_version,
+        max_retries=0,  # same shared RateLimiter as the sync client
+        **kwargs
+    )
+
+
+# Async clients hold connections bound to the event loop that opened them, so the loop is part of the key.
+_async_client_registry = ClientRegistry(
+    lambda *args: _make_async_azure_client(*args),
+    max_size=get_setting("AZURE_CLIENT_POOL_SIZE", 32),
+    idle_seconds=get_setting("AZURE_CLIENT_IDLE_SECONDS", 300.0),
+)
+
+
+def warm_up_client() -> bool:
+    """
+    Build the pooled client for the default credentials now (importing openai / httpx) so the
+    first request doesn't pay for it. No network call. False if no default credentials are set.
+    """
+    key, endpoint, _, api_version = _resolve_azure_settings(None, None, None, None)
+    if not key or not endpoint:
+        return False
+    with _leased_azure_client(key, endpoint, api_version=api_version):
+        pass
+    return True
+
+
+def _reset_after_fork() -> None:
+    # pooled clients hold connections opened by the parent; a forked worker builds its own
+    global _chunk_pool
+    _client_registry.forget_all()
+    _async_client_registry.forget_all()
+    _chunk_pool = None  # the parent's threads don't exist in the child
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _leased_async_azure_client(azure_api_key: str, azure_endpoint: str, api_version: str = DEFAULT_AZURE_API_VERSION):
+    """_leased_azure_client() for the running event loop's AsyncAzureOpenAI client."""
+    import asyncio
+    key_digest = hashlib.sha256(azure_api_key.encode("utf-8")).hexdigest()
+    return _async_client_registry.lease(
+        (key_digest, azure_endpoint, api_version, id(asyncio.get_running_loop())),
+        azure_api_key, azure_endpoint, api_version,
+    )
+
+def _new_rate_limiter() -> RateLimiter:
+    return RateLimiter(
+        rpm=get_setting("AZURE_RPM_LIMIT", 0),
+        tpm=get_setting("AZURE_TPM_LIMIT", 0),
+        max_retries=get_setting("LLM_MAX_RETRIES", 5),
+        backoff_base=get_setting("LLM_BACKOFF_BASE_SECONDS", 1.0),
+        backoff_max=get_setting("LLM_BACKOFF_MAX_SECONDS", 60.0),
+        window_seconds=get_setting("RATE_LIMIT_WINDOW_SECONDS", 60.0),
+    )
+
+
+def _client_endpoint(client) -> str:
+    # AzureOpenAI clients carry their resource URL as base_url; the mock has none (one local "resource")
+    return str(getattr(client, "base_url", "") or "")
+
+
+def _limiter(client, deployment: str) -> RateLimiter:
+    """The RateLimiter shared by every call to this deployment of this endpoint (Azure's quota scope)."""
+    return limiter_for((_client_endpoint(client), deployment), _new_rate_limiter)
+
+
+def _chat_completion(client, deployment: str, messages: list, max_tokens: int, usage: Optional[dict] = None,
+                     stream: bool = False):
+    """
+    client.chat.completions.create() through the endpoint + deployment's shared RateLimiter
+    (waits for RPM/TPM budget, retries 429/5xx/timeouts honoring Retry-After).
+    stream=True returns the chunk iterator; read it with _stream_deltas() (usage arrives in the last chunk,
+    and settles the limiter's token bucket when the stream ends).
+    """
+    estimated_tokens = _estimate_tokens(messages, max_tokens)
+    completions = client.chat.completions
+    raw_api = getattr(completions, "with_raw_response", None)
+
+    def send():
+        kwargs = _completion_kwargs(deployment, messages, max_tokens, stream)
+        if raw_api is None:
+            return completions.create(**kwargs), None
+        raw = raw_api.create(**kwargs)
+        return raw.parse(), raw.headers
+
+    limiter = _limiter(client, deployment)
+    try:
+        resp = limiter.call(send, estimated_tokens, usage)
+    except Exception:
+        LLM_CALLS.inc(outcome="failed")
+        raise
+    LLM_CALLS.inc(outcome="completed")
+    if stream:
+        return limiter.settled_stream(resp, estimated_tokens)
+    _count_tokens_used(usage, resp)
+    return resp
+
+
+async def _chat_completion_async(client, deployment: str, messages: list, max_tokens: int,
+                                 usage: Optional[dict] = None):
+    """_chat_completion() for AsyncAzureOpenAI: same limiter (awaited, not blocking), same metrics. No streaming."""
+    estimated_tokens = _estimate_tokens(messages, max_tokens)
+    completions = client.chat.completions
+    raw_api = getattr(completions, "with_raw_response", None)
+
+    async def send():
+        kwargs = _completion_kwargs(deployment, messages, max_tokens)
+        if raw_api is None:
+            return await completions.create(**kwargs), None
+        raw = await raw_api.create(**kwargs)
+        return raw.parse(), raw.headers
+
+    try:
+        resp = await _limiter(client, deployment).acall(send, estimated_tokens, usage)
+    except Exception:
+        LLM_CALLS.inc(outcome="failed")
+        raise
+    LLM_CALLS.inc(outcome="completed")
+    _count_tokens_used(usage, resp)
+    return resp
+
+
+def _estimate_tokens(messages: list, max_tokens: int) -> int:
+    # what Azure charges against TPM at admission: prompt + max_tokens
+    return sum(count_tokens(m.get("content", "")) for m in messages) + max_tokens
+
+
+def _completion_kwargs(deployment: str, messages: list, max_tokens: int, stream: bool = False) -> dict:
+    kwargs = dict(model=deployment, messages=messages, temperature=0.0, max_tokens=max_tokens)
+    if stream:
+        # openai 1.16 has no stream_options argument; pass it through as body
+        kwargs.update(stream=True, extra_body={"stream_options": {"include_usage": True}})
+    return kwargs
+
+
+def _count_tokens_used(usage: Optional[dict], resp) -> None:
+    resp_usage = getattr(resp, "usage", None)
+    LLM_TOKENS.inc(getattr(resp_usage, "prompt_tokens", 0) or 0, kind="prompt")
+    LLM_TOKENS.inc(getattr(resp_usage, "completion_tokens", 0) or 0, kind="completion")
+    _record_usage(usage, resp)
+
+
+def _stream_deltas(chunks, usage: Optional[dict] = None):
+    """Yield the text deltas of a streamed completion; token usage is recorded when the stream ends."""
+    usage_chunk = None
+    for chunk in chunks:
+        for choice in getattr(chunk, "choices", None) or []:
+            delta = getattr(getattr(choice, "delta", None), "content", None)
+            if delta:
+                yield delta
+        if getattr(chunk, "usage", None) is not None:
+            usage_chunk = chunk
+    _count_tokens_used(usage, usage_chunk)
+
+
+def _record_usage(usage: Optional[dict], resp) -> None:
+    """Accumulate resp.usage token counts into `usage` (no-op when usage is None)."""
+    if usage is None:
+        return
+    resp_usage = getattr(resp, "usage", None)
+    usage["calls"] = usage.get("calls", 0) + 1
+    for k in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        usage[k] = usage.get(k, 0) + (getattr(resp_usage, k, 0) or 0)
+
+
+CONTINUE_PROMPT = ("Your previous answer was cut off. Continue exactly where it stopped: output only the rest of "
+                   "the JSON, without repeating anything.")
+
+
+def _continuation(messages: list, parts: list, resp, usage: Optional[dict], attempt: int):
+    """Messages for the next call if resp was cut off at max_tokens (and continuations are left), else None."""
+    choice = resp.choices[0]
+    content = choice.message.content or ""
+    if attempt:
+        content = re.sub(r"^```(?:json)?\s*", "", content, flags=re.IGNORECASE)  # a continuation may re-open a fence
+    parts.append(content)
+    if getattr(choice, "finish_reason", None) != "length" or attempt >= MAX_CONTINUATIONS:
+        return None
+    LLM_CONTINUATIONS.inc()
+    if usage is not None:
+        usage["continuations"] = usage.get("continuations", 0) + 1
+    return messages + [{"role": "assistant", "content": "".join(parts)}, {"role": "user", "content": CONTINUE_PROMPT}]
+
+
+def _completion_text(client, deployment: str, messages: list, max_tokens: int, usage: Optional[dict] = None) -> str:
+    """
+    Content of a completion. A reply cut off at max_tokens (finish_reason == "length") is
+    continued in a follow-up call with the partial answer as context, up to
+    MAX_CONTINUATIONS times, and the pieces are joined.
+    """
+    parts, attempt, pending = [], 0, messages
+    while pending is not None:
+        resp = _chat_completion(client, deployment, pending, max_tokens, usage)
+        pending = _continuation(messages, parts, resp, usage, attempt)
+        attempt += 1
+    return "".join(parts)
+
+
+async def _completion_text_async(client, deployment: str, messages: list, max_tokens: int,
+                                 usage: Optional[dict] = None) -> str:
+    parts, attempt, pending = [], 0, messages
+    while pending is not None:
+        resp = await _chat_completion_async(client, deployment, pending, max_tokens, usage)
+        pending = _continuation(messages, parts, resp, usage, attempt)
+        attempt += 1
+    return "".join(parts)
+
+
+def _add_usage(total: Optional[dict], part: dict) -> None:
+    """Sum one call's usage dict (tokens, calls, retries, ...) into the request's."""
+    if total is None:
+        return
+    for k, v in part.items():
+        total[k] = round(total.get(k, 0) + v, 2) if isinstance(v, float) else total.get(k, 0) + v
+
 # -------------------------
 # GPT-based assessment (Azure)
 # -------------------------
-def generate_assessment_with_gpt(parsed_obj: dict, client, deployment: str):
-    context = {
+ASSESSMENT_GUIDELINES = (
+    "Guidelines:\n- Strengths: clear technical/domain strengths.\n- Weaknesses: missing details (education missing, unclear dates) or weak areas.\n- Red flags: gaps longer than 12 months, overlapping inconsistent dates, >3 jobs in 2 years.\n- Recommendations: suggested roles/next steps.\n"
+)
+
+
+def _apply_assessment_defaults(parsed: dict) -> dict:
+    defaults = {"strengths": [], "weaknesses": [], "red_flags": [], "recommendations": [], "overall_score": 0}
+    for k, v in defaults.items():
+        if k not in parsed:
+            parsed[k] = v
+    return parsed
+
+
+def assessment_context(parsed_obj: dict) -> dict:
+    """The only part of the profile the assessment prompt sees."""
+    return {
         "full_name": parsed_obj.get("full_name"),
         "email": parsed_obj.get("email"),
         "linkedin": parsed_obj.get("linkedin"),
@@ -559,6 +969,91 @@ def generate_assessment_with_gpt(parsed_obj: dict, client, deployment: str):
         "education": parsed_obj.get("education", [])
     }
 
+
+def _canonical(value):
+    # whitespace / case differences between two exports of the same CV shouldn't change the key
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def assessment_cache_key(context: dict, deployment: Optional[str]) -> str:
+    """sha256 of the canonicalized context (sorted keys, normalized whitespace / case) + deployment + prompt version."""
+    canonical = json.dumps(_canonical(context), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    material = f"{canonical}\n{deployment or ''}\n{PROMPT_VERSION}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# Assessments keyed on their input: re-exports of the same CV (different PDF bytes, same profile)
+# reuse the earlier assessment instead of paying for another completion (ASSESSMENT_CACHE_ENABLED).
+ASSESSMENT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__DATA__", "assessment_cache")
+_assessment_cache = None
+_assessment_cache_lock = threading.Lock()
+
+
+def get_assessment_cache() -> TieredCache:
+    """Created on first use (so importing this module never touches the disk)."""
+    global _assessment_cache
+    with _assessment_cache_lock:
+        if _assessment_cache is None:
+            disk_ttl = get_setting("ASSESSMENT_CACHE_DISK_TTL_SECONDS", 30 * 24 * 3600.0)
+            _assessment_cache = TieredCache(
+                LRUCache(
+                    max_entries=get_setting("ASSESSMENT_CACHE_MAX_ENTRIES", 1024),
+                    ttl_seconds=get_setting("ASSESSMENT_CACHE_TTL_SECONDS", 24 * 3600.0),
+                ),
+                DiskCache(ASSESSMENT_CACHE_PATH, ttl_seconds=disk_ttl) if get_setting("ASSESSMENT_CACHE_DISK", True) else None,
+            )
+        return _assessment_cache
+
+
+def cached_assessment(parsed_obj: dict, client, deployment: str, usage: Optional[dict] = None,
+                      refresh: bool = False):
+    """
+    generate_assessment_with_gpt() behind the assessment cache. refresh=True skips the lookup and
+    overwrites the entry. Returns (assessment, served_from_cache).
+    """
+    key, hit = _assessment_cache_lookup(parsed_obj, deployment, refresh)
+    if hit is not None:
+        return hit, True
+    assessment = generate_assessment_with_gpt(parsed_obj, client, deployment, usage)
+    _assessment_cache_store(key, assessment)
+    return assessment, False
+
+
+def _assessment_cache_lookup(parsed_obj: dict, deployment: str, refresh: bool):
+    """(cache key or None when the cache is off, cached assessment or None)."""
+    if not ASSESSMENT_CACHE_ENABLED:
+        return None, None
+    key = assessment_cache_key(assessment_context(parsed_obj), deployment)
+    if refresh:
+        ASSESSMENT_CACHE_REQUESTS.inc(result="refresh")
+        return key, None
+    hit = get_assessment_cache().get(key)
+    ASSESSMENT_CACHE_REQUESTS.inc(result="hit" if hit is not None else "miss")
+    return key, (copy.deepcopy(hit) if hit is not None else None)
+
+
+def _assessment_cache_store(key: Optional[str], assessment: dict) -> None:
+    if key is not None and "error" not in assessment:
+        get_assessment_cache().set(key, copy.deepcopy(assessment))
+
+
+def generate_assessment_with_gpt(parsed_obj: dict, client, deployment: str, usage: Optional[dict] = None):
+    try:
+        resp = _chat_completion(client, deployment, _assessment_messages(parsed_obj), 500, usage)
+        return _assessment_from_response(resp)
+    except Exception as e:
+        return _failed_assessment(e)
+
+
+def _assessment_messages(parsed_obj: dict) -> list:
+    context = assessment_context(parsed_obj)
+
     system = {
         "role": "system",
         "content": "You are a JSON-only assessment generator for resumes. Output MUST be valid JSON and nothing else."
@@ -585,95 +1080,157 @@ def generate_assessment_with_gpt(parsed_obj: dict, client, deployment: str):
             "strengths (list), weaknesses (list), red_flags (list), recommendations (list), overall_score (integer 0-100).\n"
             "Return only JSON.\n\n"
             + json.dumps(context, indent=2) +
-            "\n\nGuidelines:\n- Strengths: clear technical/domain strengths.\n- Weaknesses: missing details (education missing, unclear dates) or weak areas.\n- Red flags: gaps longer than 12 months, overlapping inconsistent dates, >3 jobs in 2 years.\n- Recommendations: suggested roles/next steps.\n"
+            "\n\n" + ASSESSMENT_GUIDELINES
         )
     }
 
-    messages = [system, example_user, example_assistant, user_prompt]
+    return [system, example_user, example_assistant, user_prompt]
+
+
+def _assessment_from_response(resp) -> dict:
+    return _assessment_from_text(resp.choices[0].message.content)
+
+
+def _assessment_from_text(raw: str) -> dict:
+    cleaned = _clean_model_output(raw)
+    parsed = _attempt_fix_and_parse(cleaned)
+    return _apply_assessment_defaults(parsed)
+
+
+def _failed_assessment(e: Exception) -> dict:
+    return {"strengths": [], "weaknesses": [], "red_flags": [], "recommendations": [], "overall_score": 0, "error": str(e)}
 
-    try:
-        resp = client.chat.completions.create(
-            model=deployment,
-            messages=messages,
-            temperature=0.0,
-            max_tokens=500
-        )
-        raw = resp.choices[0].message.content
-        cleaned = _clean_model_output(raw)
-        parsed = _attempt_fix_and_parse(cleaned)
-        defaults = {"strengths": [], "weaknesses": [], "red_flags": [], "recommendations": [], "overall_score": 0}
-        for k, v in defaults.items():
-            if k not in parsed:
-                parsed[k] = v
-        return parsed
-    except Exception as e:
-        return {"strengths": [], "weaknesses": [], "red_flags": [], "recommendations": [], "overall_score": 0, "error": str(e)}
 
 # -------------------------
-# MAIN parser function (Azure)
+# Job-fit assessment (ranked shortlists)
 # -------------------------
-def ats_extractor(resume_data: str,
-                  azure_api_key: Optional[str] = None,
-                  azure_endpoint: Optional[str] = None,
-                  deployment: Optional[str] = None,
-                  api_version: Optional[str] = None) -> dict:
-    """
-    Parse resume text and return a Python dict.
-    Provide optional per-request azure_api_key / azure_endpoint / deployment.
-    """
+FIT_GUIDELINES = (
+    "Guidelines:\n- matched_requirements: requirements of the job the candidate clearly meets, with evidence.\n- missing_requirements: requirements with no evidence in the resume.\n- concerns: tenure, seniority or domain mismatches worth raising in a screen.\n- fit_score: 0-100, how well the candidate fits THIS job (not the candidate's overall quality).\n"
+)
 
-    # decide values (per-request override -> config -> env)
-    key_to_use = azure_api_key or DEFAULT_AZURE_API_KEY
-    endpoint_to_use = azure_endpoint or DEFAULT_AZURE_ENDPOINT
-    deployment_to_use = deployment or DEFAULT_AZURE_DEPLOYMENT
-    api_version_to_use = api_version or DEFAULT_AZURE_API_VERSION
 
-    if not key_to_use or not endpoint_to_use or not deployment_to_use:
-        return {"error": "Azure credentials or deployment not provided. Provide azure_api_key, azure_endpoint, and deployment."}
+def _apply_fit_defaults(parsed: dict) -> dict:
+    defaults = {"fit_score": 0, "matched_requirements": [], "missing_requirements": [], "concerns": [], "summary": ""}
+    for k, v in defaults.items():
+        if k not in parsed:
+            parsed[k] = v
+    return parsed
+
+
+def fit_cache_key(parsed_obj: dict, job_description: str, deployment: Optional[str]) -> str:
+    """Like assessment_cache_key, over the profile context and the (canonicalized) job description."""
+    return assessment_cache_key({"job_fit": assessment_context(parsed_obj), "job_description": job_description},
+                                deployment)
 
-    # create Azure client for this request
-    client = _make_azure_client(key_to_use, endpoint_to_use, api_version=api_version_to_use)
 
-    # --------- (A) parse resume into structured JSON via model ----------
+def _fit_messages(parsed_obj: dict, job_description: str) -> list:
     system = {
         "role": "system",
-        "content": (
-            "You are a JSON-only extraction engine. Given a resume, output ONLY valid JSON following this schema exactly:\n"
-            "{\n"
-            '  "full_name": "",\n'
-            '  "email": "",\n'
-            '  "github": null,\n'
-            '  "linkedin": null,\n'
-            '  "employment_details": [ { "company":"", "job_title":"", "start_date":"", "end_date":"", "location":null, "responsibilities": [] } ],\n'
-            '  "technical_skills": { "analytics_bi": [], "databases_data_management": [], "programming_scripting": [], "tools_technologies": [] },\n'
-            '  "soft_skills": [],\n'
-            '  "education": [],\n'
-            '  "languages": [],\n'
-            '  "certifications": []\n'
-            "}\n"
-            "Return only the JSON object with those keys. Use null or empty arrays where appropriate."
-        )
+        "content": "You are a JSON-only job-fit assessment generator: you compare one parsed resume with one job description. Output MUST be valid JSON and nothing else."
     }
     user_prompt = {
         "role": "user",
-        "content": "Resume Text:\n```\n" + resume_data + "\n```\n\nReturn JSON only."
+        "content": (
+            "Compare the parsed resume JSON with the job description below and produce a concise JSON object with keys:\n"
+            "fit_score (integer 0-100), matched_requirements (list), missing_requirements (list), concerns (list), summary (one sentence).\n"
+            "Return only JSON.\n\n"
+            "Job description:\n" + job_description.strip() + "\n\n"
+            "Resume:\n" + json.dumps(assessment_context(parsed_obj), indent=2) +
+            "\n\n" + FIT_GUIDELINES
+        )
     }
+    return [system, user_prompt]
+
+
+def _fit_from_response(resp) -> dict:
+    cleaned = _clean_model_output(resp.choices[0].message.content)
+    return _apply_fit_defaults(_attempt_fix_and_parse(cleaned))
+
 
+def assess_fit(parsed_obj: dict, job_description: str,
+               azure_api_key: Optional[str] = None,
+               azure_endpoint: Optional[str] = None,
+               deployment: Optional[str] = None,
+               api_version: Optional[str] = None,
+               usage: Optional[dict] = None,
+               refresh: bool = False) -> dict:
+    """
+    How well one stored profile fits a job description (one completion), for the top of a
+    skillindex ranking. Cached in the assessment cache keyed on profile + job description.
+    Errors come back as {"fit_score": 0, ..., "error": "..."}.
+    """
+    key_to_use, endpoint_to_use, deployment_to_use, api_version_to_use = _resolve_azure_settings(
+        azure_api_key, azure_endpoint, deployment, api_version
+    )
+    if not key_to_use or not endpoint_to_use or not deployment_to_use:
+        return _apply_fit_defaults({"error": "Azure credentials or deployment not provided."})
+
+    key = fit_cache_key(parsed_obj, job_description, deployment_to_use) if ASSESSMENT_CACHE_ENABLED else None
+    if key is not None and not refresh:
+        hit = get_assessment_cache().get(key)
+        ASSESSMENT_CACHE_REQUESTS.inc(result="hit" if hit is not None else "miss")
+        if hit is not None:
+            return copy.deepcopy(hit)
     try:
-        resp = client.chat.completions.create(
-            model=deployment_to_use,
-            messages=[system, user_prompt],
-            temperature=0.0,
-            max_tokens=2000
-        )
-        raw = resp.choices[0].message.content
-        cleaned = _clean_model_output(raw)
-        parsed = _attempt_fix_and_parse(cleaned)
+        with _leased_azure_client(key_to_use, endpoint_to_use, api_version=api_version_to_use) as client:
+            resp = _chat_completion(client, deployment_to_use, _fit_messages(parsed_obj, job_description), 600, usage)
+        fit = _fit_from_response(resp)
     except Exception as e:
-        return {"error": f"Parsing error: {str(e)}"}
+        return _apply_fit_defaults({"error": str(e)})
+    _assessment_cache_store(key, fit)
+    return fit
+
+# -------------------------
+# Pipeline stages (Azure)
+# -------------------------
+EXTRACTION_SCHEMA_FIELDS = [
+    ("full_name", '"full_name": ""'),
+    ("email", '"email": ""'),
+    ("github", '"github": null'),
+    ("linkedin", '"linkedin": null'),
+    ("employment_details", '"employment_details": [ { "company":"", "job_title":"", "start_date":"", "end_date":"", "location":null, "responsibilities": [] } ]'),
+    ("technical_skills", '"technical_skills": { "analytics_bi": [], "databases_data_management": [], "programming_scripting": [], "tools_technologies": [] }'),
+    ("soft_skills", '"soft_skills": []'),
+    ("education", '"education": []'),
+    ("languages", '"languages": []'),
+    ("certifications", '"certifications": []'),
+]
+ASSESSMENT_SCHEMA_FIELD = ("assessment", '"assessment": { "strengths": [], "weaknesses": [], "red_flags": [], "recommendations": [], "overall_score": 0 }')
+
+# Fields preextract.py can find deterministically; with pre-extraction on, the model isn't asked for
+# the ones it actually found.
+PREEXTRACTED_FIELDS = ("email", "github", "linkedin")
+
+
+def build_extraction_prompt(omit_fields=(), with_assessment: bool = False) -> str:
+    """System prompt for the extraction completion, optionally without some fields / with the assessment block."""
+    fields = [line for key, line in EXTRACTION_SCHEMA_FIELDS if key not in omit_fields]
+    if with_assessment:
+        fields.append(ASSESSMENT_SCHEMA_FIELD[1])
+    prompt = (
+        "You are a JSON-only extraction engine. Given a resume, output ONLY valid JSON following this schema exactly:\n"
+        "{\n"
+        + ",\n".join("  " + line for line in fields) + "\n"
+        "}\n"
+        "Return only the JSON object with those keys"
+        + (" (including assessment)" if with_assessment else "")
+        + ". Use null or empty arrays where appropriate."
+    )
+    if with_assessment:
+        # Single-call mode: same schema plus the assessment block, so one completion replaces two.
+        prompt += (
+            "\nFor assessment, judge the candidate from the extracted data: overall_score is an integer 0-100.\n"
+            + ASSESSMENT_GUIDELINES
+        )
+    return prompt
+
+
+EXTRACTION_SYSTEM_PROMPT = build_extraction_prompt()
+COMBINED_SYSTEM_PROMPT = build_extraction_prompt(with_assessment=True)
 
-    # ensure expected keys exist
-    defaults = {
+
+def _profile_defaults() -> dict:
+    return {
         "full_name": None,
         "email": None,
         "github": None,
@@ -690,66 +1247,741 @@ def ats_extractor(resume_data: str,
         "languages": [],
         "certifications": []
     }
-    for k, v in defaults.items():
+
+
+def _apply_profile_defaults(parsed: dict) -> dict:
+    """Ensure expected keys exist."""
+    for k, v in _profile_defaults().items():
         if k not in parsed or parsed[k] is None:
             parsed[k] = v
+    return parsed
 
-    # --------- (B) Experience analysis ----------
-    exp_entries = parsed.get("employment_details", []) or []
-    analysis_entries = []
-    intervals = []
 
-    for job in exp_entries:
-        start_raw = job.get("start_date") or job.get("start") or ""
-        end_raw = job.get("end_date") or job.get("end") or job.get("to") or ""
-        if (not end_raw) and isinstance(start_raw, str) and ("–" in start_raw or "-" in start_raw):
-            parts = re.split(r"\s*[–-]\s*", start_raw)
-            if len(parts) >= 2:
-                start_raw = parts[0].strip()
-                possible_end = parts[1].strip()
-                end_raw = end_raw or possible_end
-
-        start_dt = parse_fuzzy_date(start_raw)
-        end_dt = parse_fuzzy_date(end_raw) if end_raw else None
-        if end_dt is None and isinstance(end_raw, str) and re.search(r"\b(present|current|now)\b", (end_raw or ""), flags=re.IGNORECASE):
-            end_dt = date.today()
+def _extraction_messages(system_prompt: str, resume_data: str) -> list:
+    system = {"role": "system", "content": system_prompt}
+    user_prompt = {
+        "role": "user",
+        "content": "Resume Text:\n```\n" + resume_data + "\n```\n\nReturn JSON only."
+    }
+    return [system, user_prompt]
 
-        duration_months = None
-        duration_human = None
-        if start_dt and end_dt:
-            months = months_between(start_dt, end_dt)
-            duration_months = months
-            duration_human = human_duration_from_months(months)
-            intervals.append((start_dt, end_dt))
 
-        analysis_entries.append({
-            "company": job.get("company"),
-            "job_title": job.get("job_title"),
-            "start_date_raw": start_raw or None,
-            "end_date_raw": end_raw or None,
-            "start_date_parsed": start_dt.isoformat() if start_dt else None,
-            "end_date_parsed": end_dt.isoformat() if end_dt else None,
-            "duration_months": duration_months,
-            "duration_human": duration_human,
-            "responsibilities": job.get("responsibilities", []) or []
-        })
-
-    total_days = merge_intervals_and_total_days(intervals)
+def _extraction_prompt(omit_fields=(), with_assessment: bool = False):
+    """(system prompt, max_tokens) for the extraction completion."""
+    if with_assessment:
+        return (build_extraction_prompt(omit_fields, with_assessment=True) if omit_fields else COMBINED_SYSTEM_PROMPT,
+                2500)
+    return build_extraction_prompt(omit_fields) if omit_fields else EXTRACTION_SYSTEM_PROMPT, 2000
+
+
+def _completion_json(client, deployment: str, system_prompt: str, resume_data: str, max_tokens: int, usage=None) -> dict:
+    text = _completion_text(client, deployment, _extraction_messages(system_prompt, resume_data), max_tokens, usage)
+    return _attempt_fix_and_parse(_clean_model_output(text))
+
+
+def extract_profile(resume_data: str, client, deployment: str, usage: Optional[dict] = None,
+                    omit_fields=()) -> dict:
+    """Stage A: parse resume text into the structured profile via the model. Raises on failure."""
+    prompt, max_tokens = _extraction_prompt(omit_fields)
+    parsed = _completion_json(client, deployment, prompt, resume_data, max_tokens, usage)
+    return _apply_profile_defaults(parsed)
+
+
+def extract_profile_with_assessment(resume_data: str, client, deployment: str, usage: Optional[dict] = None,
+                                    omit_fields=()):
+    """Stage A + C in one completion (PIPELINE_COMBINED). Returns (profile, assessment). Raises on failure."""
+    prompt, max_tokens = _extraction_prompt(omit_fields, with_assessment=True)
+    parsed = _completion_json(client, deployment, prompt, resume_data, max_tokens, usage)
+    return _split_combined(parsed)
+
+
+# -------------------------
+# Chunked extraction (PIPELINE_CHUNKED)
+# -------------------------
+_chunk_pool = None
+_chunk_pool_lock = threading.Lock()
+
+
+def _get_chunk_pool():
+    # threads, not processes: each chunk just waits on its completion
+    global _chunk_pool
+    with _chunk_pool_lock:
+        if _chunk_pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _chunk_pool = ThreadPoolExecutor(max_workers=get_setting("CHUNK_CONCURRENCY", 8),
+                                             thread_name_prefix="chunk")
+        return _chunk_pool
+
+
+def _chunk_plan(resume_data: str, omit_fields=()):
+    """[(chunk, system prompt), ...] for a resume worth chunking, else None (extract it in one completion)."""
+    if count_tokens(resume_data) < CHUNK_MIN_TOKENS:
+        return None
+    chunks = chunk_resume(resume_data, CHUNK_MAX_TOKENS)
+    if len(chunks) < 2:
+        return None
+    all_fields = [key for key, _ in EXTRACTION_SCHEMA_FIELDS]
+    return [(chunk, build_extraction_prompt(set(omit_fields) | {k for k in all_fields if k not in chunk.fields}))
+            for chunk in chunks]
+
+
+def _chunk_metadata(plan, chunk_usages) -> list:
+    return [{"kind": chunk.kind, "tokens": chunk.tokens, "continuations": part.get("continuations", 0)}
+            for (chunk, _), part in zip(plan, chunk_usages)]
+
+
+def _merge_chunks(plan, parsed_chunks, chunk_usages, usage: Optional[dict], metadata: Optional[dict]) -> dict:
+    for part in chunk_usages:
+        _add_usage(usage, part)
+    if metadata is not None:
+        metadata["chunks"] = _chunk_metadata(plan, chunk_usages)
+    return _apply_profile_defaults(merge_chunk_profiles([chunk for chunk, _ in plan], parsed_chunks))
+
+
+def extract_profile_chunked(resume_data: str, client, deployment: str, usage: Optional[dict] = None,
+                            omit_fields=(), metadata: Optional[dict] = None) -> dict:
+    """
+    Stage A for long resumes: one extraction completion per section chunk (sectionchunks.py),
+    run in parallel and merged in document order. Resumes under CHUNK_MIN_TOKENS, or with no
+    experience section to split, go through extract_profile(). Raises if any chunk fails.
+    metadata["chunks"] gets [{"kind", "tokens", "continuations"}, ...] per chunk.
+    """
+    plan = _chunk_plan(resume_data, omit_fields)
+    if plan is None:
+        return extract_profile(resume_data, client, deployment, usage, omit_fields)
+    # one usage dict per chunk: _record_usage isn't safe to share between threads
+    chunk_usages = [{} for _ in plan]
+    futures = [_get_chunk_pool().submit(_completion_json, client, deployment, prompt, chunk.text, 2000, part)
+               for (chunk, prompt), part in zip(plan, chunk_usages)]
+    parsed_chunks = [future.result() for future in futures]
+    return _merge_chunks(plan, parsed_chunks, chunk_usages, usage, metadata)
+
+
+def _split_combined(parsed: dict):
+    assessment = parsed.pop("assessment", None)
+    if not isinstance(assessment, dict):
+        assessment = {}
+    return _apply_profile_defaults(parsed), _apply_assessment_defaults(assessment)
+
+
+def stream_profile_events(resume_data: str, client, deployment: str, usage: Optional[dict] = None,
+                          omit_fields=(), with_assessment: bool = False):
+    """
+    Streamed Stage A (or A + C with with_assessment). While the model is still generating, yields
+        ("field", key, value)  each top-level field once complete (full_name, technical_skills, ...)
+        ("item", key, value)   each element of a top-level array (employment_details entries, ...)
+    then ("parsed", profile) -- or ("parsed", (profile, assessment)) with with_assessment -- built
+    from the full text exactly as the non-streaming path would. Raises on failure.
+    """
+    prompt, max_tokens = _extraction_prompt(omit_fields, with_assessment)
+    chunks = _chat_completion(client, deployment, _extraction_messages(prompt, resume_data), max_tokens, usage,
+                              stream=True)
+    parser = IncrementalJSONParser()
+    pieces = []
+    for delta in _stream_deltas(chunks, usage):
+        pieces.append(delta)
+        for event in parser.feed(delta):
+            yield event
+    parsed = _attempt_fix_and_parse(_clean_model_output("".join(pieces)))
+    yield "parsed", (_split_combined(parsed) if with_assessment else _apply_profile_defaults(parsed))
+
+
+# "Jan 2020 - Mar 2022", "Jan 2020 -Mar 2022", "2019–2021", "2019-Present",
+# but not the hyphens of "2019-03" / "2019-03-15"
+_RANGE_SEPARATOR_RE = re.compile(r"\s+-\s*|\s*-\s+|\s*[–—]\s*|(?<=\d{4})-(?!\d{1,2}(?![\d/.]))")
+
+
+def job_date_range_raw(job: dict):
+    """(start_raw, end_raw) for one employment entry, splitting "Jan 2020 - Mar 2022" style start values."""
+    start_raw = job.get("start_date") or job.get("start") or ""
+    end_raw = job.get("end_date") or job.get("end") or job.get("to") or ""
+    if (not end_raw) and isinstance(start_raw, str):
+        parts = _RANGE_SEPARATOR_RE.split(start_raw)
+        if len(parts) >= 2:
+            start_raw = parts[0].strip()
+            possible_end = parts[1].strip()
+            end_raw = end_raw or possible_end
+    return start_raw, end_raw
+
+
+def parse_job_dates(start_raw, end_raw, today: Optional[date] = None):
+    """(start_dt, end_dt) for raw values from job_date_range_raw(); either may be None."""
+    start_dt = parse_fuzzy_date(start_raw, today)
+    end_dt = parse_fuzzy_date(end_raw, today) if end_raw else None
+    return start_dt, end_dt
+
+
+def per_job_entry(job: dict, start_raw, end_raw, start_dt, end_dt, duration_months) -> dict:
+    return {
+        "company": job.get("company"),
+        "job_title": job.get("job_title"),
+        "start_date_raw": start_raw or None,
+        "end_date_raw": end_raw or None,
+        "start_date_parsed": start_dt.isoformat() if start_dt else None,
+        "end_date_parsed": end_dt.isoformat() if end_dt else None,
+        "duration_months": duration_months,
+        "duration_human": human_duration_from_months(duration_months),
+        "responsibilities": job.get("responsibilities", []) or []
+    }
+
+
+def experience_totals(total_days: int) -> dict:
     total_months = total_days // 30
     total_years = round(total_days / 365.25, 2) if total_days > 0 else 0.0
     total_human = human_duration_from_months(total_months) if total_months and total_months > 0 else "0 mo"
-
-    experience_analysis = {
-        "per_job": analysis_entries,
+    return {
         "total_days_covered": total_days,
         "total_months_approx": total_months,
         "total_years_approx": total_years,
         "total_human_readable": total_human
     }
-    parsed["experience_analysis"] = experience_analysis
 
-    # --------- (C) Assessment generation (Azure) ----------
-    assessment = generate_assessment_with_gpt(parsed, client, deployment_to_use)
-    parsed["assessment"] = assessment
 
+def compute_experience_analysis(employment_details, today: Optional[date] = None) -> dict:
+    """Stage B: per-job durations and merged total experience (no model call)."""
+    exp_entries = employment_details or []
+    analysis_entries = []
+    intervals = []
+    today = today or date.today()  # one "present" for every job in the request
+
+    for job in exp_entries:
+        start_raw, end_raw = job_date_range_raw(job)
+        start_dt, end_dt = parse_job_dates(start_raw, end_raw, today)
+
+        duration_months = None
+        if start_dt and end_dt:
+            duration_months = months_between(start_dt, end_dt)
+            intervals.append((start_dt, end_dt))
+
+        analysis_entries.append(per_job_entry(job, start_raw, end_raw, start_dt, end_dt, duration_months))
+
+    result = {"per_job": analysis_entries}
+    result.update(experience_totals(merge_intervals_and_total_days(intervals)))
+    return result
+
+
+def prepare_llm_input(resume_data: str, mode: str, use_preextract: bool, use_normalize: bool,
+                      token_budget: Optional[int], metadata: dict):
+    """
+    Local stages before the model call: normalize -> pre-extract -> token budget.
+    Returns (text for the prompt, schema fields to omit, preextract result or None); fills metadata.
+    Only fields the pre-pass found are omitted; merge them back with _apply_preextracted().
+    """
+    tokens = {"tokenizer": tokenizer_name(), "before_normalization": count_tokens(resume_data)}
+    llm_text = normalize_text(resume_data) if use_normalize else resume_data
+    tokens["after_normalization"] = count_tokens(llm_text)
+    omit_fields, pre = (), None
+
+    if use_preextract:
+        pre = run_preextract(llm_text)
+        omit_fields = tuple(field for field in PREEXTRACTED_FIELDS if pre["fields"].get(field))
+        prompt_before = COMBINED_SYSTEM_PROMPT if mode == PIPELINE_COMBINED else EXTRACTION_SYSTEM_PROMPT
+        prompt_after = build_extraction_prompt(omit_fields, with_assessment=(mode == PIPELINE_COMBINED))
+        metadata["preextract"] = {
+            "input_chars_before": len(llm_text) + len(prompt_before),
+            "input_chars_after": len(pre["text"]) + len(prompt_after),
+            "input_tokens_saved": count_tokens(llm_text) + count_tokens(prompt_before)
+                                  - count_tokens(pre["text"]) - count_tokens(prompt_after),
+            # the model no longer writes the omitted fields; everything else it still generates
+            "output_tokens_saved": count_tokens(json.dumps({field: pre["fields"][field] for field in omit_fields}))
+                                   if omit_fields else 0,
+            "fields_not_requested": list(omit_fields),
+            "dropped_sections": pre["dropped_sections"],
+        }
+        llm_text = pre["text"]
+
+    llm_text, truncated = enforce_token_budget(llm_text, token_budget)
+    tokens.update({"sent": count_tokens(llm_text), "budget": token_budget, "truncated": truncated})
+    metadata["tokens"] = tokens
+    return llm_text, omit_fields, pre
+
+
+def _apply_preextracted(parsed: dict, pre: Optional[dict]) -> None:
+    if pre is not None:
+        parsed.update({field: value for field, value in pre["fields"].items() if value})
+
+
+def _resolve_azure_settings(azure_api_key, azure_endpoint, deployment, api_version):
+    # decide values (per-request override -> config -> env)
+    if LLM_BACKEND == LLM_BACKEND_MOCK:
+        # the mock needs no credentials; placeholders keep the rest of the pipeline unchanged
+        return (azure_api_key or "mock", azure_endpoint or "mock://local", deployment or "mock-deployment",
+                api_version or DEFAULT_AZURE_API_VERSION)
+    return (
+        azure_api_key or DEFAULT_AZURE_API_KEY,
+        azure_endpoint or DEFAULT_AZURE_ENDPOINT,
+        deployment or DEFAULT_AZURE_DEPLOYMENT,
+        api_version or DEFAULT_AZURE_API_VERSION,
+    )
+
+
+def _time_stage(timings: dict, stage: str, started: float) -> None:
+    """Record a finished stage in the request's timings_ms and the cv_stage_seconds histogram."""
+    seconds = time.perf_counter() - started
+    timings[stage] = round(seconds * 1000.0, 2)
+    observe_stage(stage, seconds)
+
+
+# -------------------------
+# Pipeline stages shared by the sync, async and batch entry points
+# -------------------------
+# The three differ only in how the completions are sent; everything before and after them goes
+# through these helpers so the result shape can't drift between them.
+MISSING_CREDENTIALS_ERROR = ("Azure credentials or deployment not provided. Provide azure_api_key, azure_endpoint, "
+                             "and deployment.")
+
+
+def _pipeline_options(pipeline_mode: Optional[str], preextract: Optional[bool], normalize: Optional[bool],
+                      token_budget: Optional[int]):
+    """(mode, use_preextract, use_normalize, budget): per-call options, falling back to the configured defaults."""
+    return (pipeline_mode or DEFAULT_PIPELINE_MODE,
+            DEFAULT_PREEXTRACT if preextract is None else preextract,
+            DEFAULT_NORMALIZE if normalize is None else normalize,
+            DEFAULT_TOKEN_BUDGET if token_budget is None else token_budget)
+
+
+def _prepare_text(resume_data: str, mode: str, use_preextract: bool, use_normalize: bool,
+                  token_budget: Optional[int], **extra_metadata):
+    """
+    (A0) New result metadata plus the timed local preparation (prepare_llm_input).
+    Returns (metadata, text for the prompt, schema fields to omit, preextract result or None).
+    """
+    metadata = {"pipeline_mode": mode, **extra_metadata, "usage": {}, "timings_ms": {}}
+    started = time.perf_counter()
+    llm_text, omit_fields, pre = prepare_llm_input(resume_data, mode, use_preextract, use_normalize, token_budget,
+                                                   metadata)
+    _time_stage(metadata["timings_ms"], "prepare", started)
+    return metadata, llm_text, omit_fields, pre
+
+
+def _parsing_error(e: Exception) -> dict:
+    return {"error": f"Parsing error: {str(e)}"}
+
+
+def _profile_parsed(parsed: dict, pre: Optional[dict], metadata: dict, extraction_started: float) -> dict:
+    """End of (A): time the extraction and merge the pre-extracted fields the model wasn't asked for."""
+    _time_stage(metadata["timings_ms"], "extraction", extraction_started)
+    _apply_preextracted(parsed, pre)
+    return parsed
+
+
+def _add_experience_analysis(parsed: dict, metadata: dict) -> dict:
+    """(B) Experience analysis over the parsed employment history."""
+    started = time.perf_counter()
+    parsed["experience_analysis"] = compute_experience_analysis(parsed.get("employment_details", []))
+    _time_stage(metadata["timings_ms"], "experience_analysis", started)
+    return parsed["experience_analysis"]
+
+
+def _finish_result(parsed: dict, assessment: dict, metadata: dict) -> dict:
+    """(C) done: attach the assessment and the metadata; the result dict every entry point returns."""
+    parsed["assessment"] = assessment
+    parsed["metadata"] = metadata
     return parsed
+
+
+# -------------------------
+# MAIN parser function (Azure)
+# -------------------------
+def ats_extractor_stages(resume_data: str,
+                         azure_api_key: Optional[str] = None,
+                         azure_endpoint: Optional[str] = None,
+                         deployment: Optional[str] = None,
+                         api_version: Optional[str] = None,
+                         pipeline_mode: Optional[str] = None,
+                         preextract: Optional[bool] = None,
+                         normalize: Optional[bool] = None,
+                         token_budget: Optional[int] = None,
+                         stream: Optional[bool] = None,
+                         refresh_assessment: bool = False):
+    """
+    Run the pipeline one stage at a time, yielding (stage, payload) as each finishes:
+        ("profile_parsed", profile) -> ("experience_computed", experience_analysis)
+        -> ("assessment_ready", assessment) -> ("done", full result dict)
+    On failure yields ("error", {"error": ...}) and stops.
+    stream: stream the extraction completion; before profile_parsed, yields
+        ("profile_partial", {"kind": "field"|"item", "key": ..., "value": ...}) as pieces are generated.
+    refresh_assessment: ignore the assessment cache for this request (the new assessment replaces the entry).
+    pipeline_mode: PIPELINE_TWO_CALL (default), PIPELINE_COMBINED (one completion for profile + assessment)
+        or PIPELINE_CHUNKED (long resumes extracted per section chunk in parallel; not streamed).
+    preextract: take contact fields from a local regex pass and send the model a reduced text.
+    normalize / token_budget: clean the text and cap its size (in tokens) before the model sees it.
+    """
+    mode, use_preextract, use_normalize, budget = _pipeline_options(pipeline_mode, preextract, normalize,
+                                                                    token_budget)
+    use_stream = DEFAULT_STREAM if stream is None else stream
+    key_to_use, endpoint_to_use, deployment_to_use, api_version_to_use = _resolve_azure_settings(
+        azure_api_key, azure_endpoint, deployment, api_version
+    )
+
+    if not key_to_use or not endpoint_to_use or not deployment_to_use:
+        yield "error", {"error": MISSING_CREDENTIALS_ERROR}
+        return
+
+    # reuse a pooled Azure client (and its open connections) for this request
+    with _leased_azure_client(key_to_use, endpoint_to_use, api_version=api_version_to_use) as client:
+
+        # --------- (A0) normalization, pre-extraction, token budget (local) ----------
+        metadata, llm_text, omit_fields, pre = _prepare_text(resume_data, mode, use_preextract, use_normalize,
+                                                             budget)
+        usage = metadata["usage"]
+        assessment = None
+
+        # --------- (A) parse resume into structured JSON via model ----------
+        started = time.perf_counter()
+        try:
+            if use_stream and mode != PIPELINE_CHUNKED:
+                combined = mode == PIPELINE_COMBINED
+                for kind, *rest in stream_profile_events(llm_text, client, deployment_to_use, usage, omit_fields,
+                                                         with_assessment=combined):
+                    if kind == "parsed":
+                        parsed, assessment = rest[0] if combined else (rest[0], None)
+                    else:
+                        yield "profile_partial", {"kind": kind, "key": rest[0], "value": rest[1]}
+            elif mode == PIPELINE_COMBINED:
+                parsed, assessment = extract_profile_with_assessment(llm_text, client, deployment_to_use, usage,
+                                                                     omit_fields)
+            elif mode == PIPELINE_CHUNKED:
+                parsed = extract_profile_chunked(llm_text, client, deployment_to_use, usage, omit_fields, metadata)
+            else:
+                parsed = extract_profile(llm_text, client, deployment_to_use, usage, omit_fields)
+        except Exception as e:
+            yield "error", _parsing_error(e)
+            return
+        yield "profile_parsed", _profile_parsed(parsed, pre, metadata, started)
+
+        # --------- (B) Experience analysis ----------
+        yield "experience_computed", _add_experience_analysis(parsed, metadata)
+
+        # --------- (C) Assessment generation (Azure) ----------
+        if assessment is None:
+            started = time.perf_counter()
+            assessment, metadata["assessment_cached"] = cached_assessment(parsed, client, deployment_to_use, usage,
+                                                                          refresh=refresh_assessment)
+            _time_stage(metadata["timings_ms"], "assessment", started)
+        _finish_result(parsed, assessment, metadata)
+        yield "assessment_ready", assessment
+
+    yield "done", parsed
+
+
+def ats_extractor(resume_data: str,
+                  azure_api_key: Optional[str] = None,
+                  azure_endpoint: Optional[str] = None,
+                  deployment: Optional[str] = None,
+                  api_version: Optional[str] = None,
+                  pipeline_mode: Optional[str] = None,
+                  preextract: Optional[bool] = None,
+                  normalize: Optional[bool] = None,
+                  token_budget: Optional[int] = None,
+                  refresh_assessment: bool = False) -> dict:
+    """
+    Parse resume text and return a Python dict.
+    Provide optional per-request azure_api_key / azure_endpoint / deployment, and pipeline options
+    (pipeline_mode / preextract / normalize / token_budget / refresh_assessment, see ats_extractor_stages).
+    """
+    stages = ats_extractor_stages(resume_data, azure_api_key, azure_endpoint, deployment, api_version,
+                                  pipeline_mode=pipeline_mode, preextract=preextract, normalize=normalize,
+                                  token_budget=token_budget, refresh_assessment=refresh_assessment)
+    for stage, payload in stages:
+        if stage in ("error", "done"):
+            return payload
+    return {"error": "Pipeline finished without a result."}
+
+
+def ats_extractor_stream(resume_data: str, **options):
+    """
+    Generator API for callers that render or index partial profiles while the model is generating:
+    ats_extractor_stages(..., stream=True). Yields ("profile_partial", {...}) events during
+    extraction, then the usual profile_parsed / experience_computed / assessment_ready / done.
+    """
+    options.setdefault("stream", True)
+    return ats_extractor_stages(resume_data, **options)
+
+
+# -------------------------
+# Async pipeline (AsyncAzureOpenAI)
+# -------------------------
+# Same stages and result shape as ats_extractor() (the shared stage helpers above), but the two
+# completions are awaited instead of blocking a worker thread, so one event loop can keep hundreds
+# of resumes in flight. The local stages take milliseconds and run inline.
+async def generate_assessment_with_gpt_async(parsed_obj: dict, client, deployment: str,
+                                             usage: Optional[dict] = None) -> dict:
+    try:
+        resp = await _chat_completion_async(client, deployment, _assessment_messages(parsed_obj), 500, usage)
+        return _assessment_from_response(resp)
+    except Exception as e:
+        return _failed_assessment(e)
+
+
+async def cached_assessment_async(parsed_obj: dict, client, deployment: str, usage: Optional[dict] = None,
+                                  refresh: bool = False):
+    key, hit = _assessment_cache_lookup(parsed_obj, deployment, refresh)
+    if hit is not None:
+        return hit, True
+    assessment = await generate_assessment_with_gpt_async(parsed_obj, client, deployment, usage)
+    _assessment_cache_store(key, assessment)
+    return assessment, False
+
+
+async def _completion_json_async(client, deployment: str, system_prompt: str, resume_data: str, max_tokens: int,
+                                 usage=None) -> dict:
+    text = await _completion_text_async(client, deployment, _extraction_messages(system_prompt, resume_data),
+                                        max_tokens, usage)
+    return _attempt_fix_and_parse(_clean_model_output(text))
+
+
+async def _extract_async(resume_data: str, client, deployment: str, usage: dict, omit_fields, combined: bool):
+    """(profile, assessment or None) from one awaited extraction completion. Raises on failure."""
+    prompt, max_tokens = _extraction_prompt(omit_fields, with_assessment=combined)
+    parsed = await _completion_json_async(client, deployment, prompt, resume_data, max_tokens, usage)
+    if combined:
+        return _split_combined(parsed)
+    return _apply_profile_defaults(parsed), None
+
+
+async def _extract_chunked_async(resume_data: str, client, deployment: str, usage: dict, omit_fields,
+                                 metadata: dict):
+    """extract_profile_chunked() with the chunk completions gathered on the event loop."""
+    import asyncio
+    plan = _chunk_plan(resume_data, omit_fields)
+    if plan is None:
+        return await _extract_async(resume_data, client, deployment, usage, omit_fields, combined=False)
+    chunk_usages = [{} for _ in plan]
+    parsed_chunks = await asyncio.gather(*(
+        _completion_json_async(client, deployment, prompt, chunk.text, 2000, part)
+        for (chunk, prompt), part in zip(plan, chunk_usages)
+    ))
+    return _merge_chunks(plan, parsed_chunks, chunk_usages, usage, metadata), None
+
+
+async def ats_extractor_async(resume_data: str,
+                              azure_api_key: Optional[str] = None,
+                              azure_endpoint: Optional[str] = None,
+                              deployment: Optional[str] = None,
+                              api_version: Optional[str] = None,
+                              pipeline_mode: Optional[str] = None,
+                              preextract: Optional[bool] = None,
+                              normalize: Optional[bool] = None,
+                              token_budget: Optional[int] = None,
+                              refresh_assessment: bool = False) -> dict:
+    """
+    Coroutine version of ats_extractor(): same options, same result dict (or {"error": ...}).
+    Must run inside an event loop; the AsyncAzureOpenAI client is pooled per loop.
+    """
+    mode, use_preextract, use_normalize, budget = _pipeline_options(pipeline_mode, preextract, normalize,
+                                                                    token_budget)
+    key_to_use, endpoint_to_use, deployment_to_use, api_version_to_use = _resolve_azure_settings(
+        azure_api_key, azure_endpoint, deployment, api_version
+    )
+
+    if not key_to_use or not endpoint_to_use or not deployment_to_use:
+        return {"error": MISSING_CREDENTIALS_ERROR}
+
+    with _leased_async_azure_client(key_to_use, endpoint_to_use, api_version=api_version_to_use) as client:
+
+        metadata, llm_text, omit_fields, pre = _prepare_text(resume_data, mode, use_preextract, use_normalize,
+                                                             budget)
+        usage = metadata["usage"]
+
+        started = time.perf_counter()
+        try:
+            if mode == PIPELINE_CHUNKED:
+                parsed, assessment = await _extract_chunked_async(llm_text, client, deployment_to_use, usage,
+                                                                  omit_fields, metadata)
+            else:
+                parsed, assessment = await _extract_async(llm_text, client, deployment_to_use, usage, omit_fields,
+                                                          combined=(mode == PIPELINE_COMBINED))
+        except Exception as e:
+            return _parsing_error(e)
+        _profile_parsed(parsed, pre, metadata, started)
+        _add_experience_analysis(parsed, metadata)
+
+        if assessment is None:
+            started = time.perf_counter()
+            assessment, metadata["assessment_cached"] = await cached_assessment_async(
+                parsed, client, deployment_to_use, usage, refresh=refresh_assessment
+            )
+            _time_stage(metadata["timings_ms"], "assessment", started)
+
+    return _finish_result(parsed, assessment, metadata)
+
+
+# -------------------------
+# Batch pipeline (batchllm.py)
+# -------------------------
+# Same stages and result shape as ats_extractor() (the shared stage helpers), for many resumes
+# at once: the extraction completions of every resume go out as one batch job, then the
+# assessments of every profile not already in the assessment cache as a second one. Results take minutes to hours instead
+# of seconds, at batch prices and outside the interactive quota: for backfills (ingest.py --batch).
+BATCH_WORK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__DATA__", "batches")
+
+
+def batch_provider_from_settings(azure_api_key: Optional[str] = None, azure_endpoint: Optional[str] = None,
+                                 api_version: Optional[str] = None):
+    """
+    BATCH_PROVIDER "azure" (Azure OpenAI Batch API) or "local" (batchllm.LocalBatchProvider over the
+    interactive client, i.e. the mockllm client with LLM_BACKEND=mock). Defaults to "local" with
+    the mock backend, else "azure".
+    """
+    import batchllm
+    key, endpoint, _, version = _resolve_azure_settings(azure_api_key, azure_endpoint, None, api_version)
+    kind = get_setting("BATCH_PROVIDER", "local" if LLM_BACKEND == LLM_BACKEND_MOCK else "azure")
+    if not key or not endpoint:
+        raise ValueError("Azure credentials not provided. Provide azure_api_key and azure_endpoint.")
+    if kind == "local":
+        return batchllm.LocalBatchProvider(_make_azure_client(key, endpoint, version),
+                                           os.path.join(BATCH_WORK_DIR, "local"),
+                                           get_setting("BATCH_LOCAL_CONCURRENCY", 8))
+    return batchllm.AzureBatchProvider(key, endpoint, get_setting("AZURE_BATCH_API_VERSION", "2024-10-21"),
+                                       poll_seconds=get_setting("BATCH_POLL_SECONDS", 30.0))
+
+
+def _batch_complete(provider, requests: dict, deployment: str, work_dir: str, name: str, stop) -> dict:
+    import batchllm
+    return batchllm.complete_all(provider, requests, deployment, work_dir, name=name,
+                                 max_continuations=MAX_CONTINUATIONS, continue_prompt=CONTINUE_PROMPT,
+                                 max_retries=get_setting("BATCH_MAX_RETRIES", 2),
+                                 max_requests=get_setting("BATCH_MAX_REQUESTS", 50000), stop=stop)
+
+
+def _batch_deployment(deployment: Optional[str]) -> Optional[str]:
+    # Azure runs batches on a separate Global-Batch deployment
+    return deployment or get_setting("AZURE_BATCH_DEPLOYMENT") or _resolve_azure_settings(None, None, None, None)[2]
+
+
+def generate_assessments_batch(profiles: dict, provider=None, deployment: Optional[str] = None,
+                               work_dir: Optional[str] = None, usages: Optional[dict] = None, stop=None) -> dict:
+    """
+    generate_assessment_with_gpt() for {doc_id: parsed profile} as one batch job; returns
+    {doc_id: assessment} (with "error" for the ones that failed). usages, if given, gets each
+    doc_id's token usage summed into it. Blocks until the batch is done; raises batchllm.BatchError
+    if it fails as a whole.
+    """
+    provider = provider or batch_provider_from_settings()
+    deployment_to_use = _batch_deployment(deployment)
+    ids = list(profiles)
+    requests = {f"{n}:assess": (_assessment_messages(profiles[doc_id]), 500) for n, doc_id in enumerate(ids)}
+    completions = _batch_complete(provider, requests, deployment_to_use, work_dir or BATCH_WORK_DIR, "assess", stop)
+    assessments = {}
+    for n, doc_id in enumerate(ids):
+        completion = completions[f"{n}:assess"]
+        if usages is not None:
+            _add_usage(usages.setdefault(doc_id, {}), completion.usage)
+        try:
+            if completion.error is not None:
+                raise RuntimeError(completion.error)
+            assessments[doc_id] = _assessment_from_text(completion.text)
+        except Exception as e:
+            assessments[doc_id] = _failed_assessment(e)
+    return assessments
+
+
+def _batch_profile(completions: dict, n: int, plan, combined: bool, usage: dict, metadata: dict):
+    """(profile, assessment or None) for document n from the extraction batch. Raises on failure."""
+    if plan is not None:
+        parts = [completions[f"{n}:chunk{i}"] for i in range(len(plan))]
+        failed = next((part.error for part in parts if part.error is not None), None)
+        if failed is not None:
+            for part in parts:
+                _add_usage(usage, part.usage)
+            raise RuntimeError(failed)
+        parsed_chunks = [_attempt_fix_and_parse(_clean_model_output(part.text)) for part in parts]
+        return _merge_chunks(plan, parsed_chunks, [part.usage for part in parts], usage, metadata), None
+    completion = completions[f"{n}:extract"]
+    _add_usage(usage, completion.usage)
+    if completion.error is not None:
+        raise RuntimeError(completion.error)
+    parsed = _attempt_fix_and_parse(_clean_model_output(completion.text))
+    if combined:
+        return _split_combined(parsed)
+    return _apply_profile_defaults(parsed), None
+
+
+def ats_extractor_batch(documents: dict,
+                        provider=None,
+                        work_dir: Optional[str] = None,
+                        azure_api_key: Optional[str] = None,
+                        azure_endpoint: Optional[str] = None,
+                        deployment: Optional[str] = None,
+                        api_version: Optional[str] = None,
+                        pipeline_mode: Optional[str] = None,
+                        preextract: Optional[bool] = None,
+                        normalize: Optional[bool] = None,
+                        token_budget: Optional[int] = None,
+                        refresh_assessment: bool = False,
+                        stop=None) -> dict:
+    """
+    ats_extractor() for {doc_id: resume text} through a batch provider (batch_provider_from_settings()
+    by default). Returns {doc_id: result dict or {"error": ...}}, each shaped like ats_extractor's;
+    metadata also carries "batch" (the provider name) and the shared batch wall times in timings_ms.
+    Blocks until both batches are done. work_dir (default __DATA__/batches) keeps the request /
+    result files; an interrupted run (or one stopped with the `stop` threading.Event) resumes the
+    batches it already submitted when called again with the same documents. Raises
+    batchllm.BatchError if a batch fails as a whole.
+    """
+    mode, use_preextract, use_normalize, budget = _pipeline_options(pipeline_mode, preextract, normalize,
+                                                                    token_budget)
+    work_dir = work_dir or BATCH_WORK_DIR
+    deployment_to_use = _batch_deployment(deployment)
+    if not deployment_to_use:
+        return {doc_id: {"error": "Azure batch deployment not provided. Set AZURE_BATCH_DEPLOYMENT or pass deployment."}
+                for doc_id in documents}
+    provider = provider or batch_provider_from_settings(azure_api_key, azure_endpoint, api_version)
+
+    # --------- (A0) local preparation, one extraction request per resume (or per chunk) ----------
+    ids = list(documents)
+    docs, requests = [], {}
+    for n, doc_id in enumerate(ids):
+        metadata, llm_text, omit_fields, pre = _prepare_text(documents[doc_id], mode, use_preextract, use_normalize,
+                                                             budget, batch=provider.name)
+        plan = _chunk_plan(llm_text, omit_fields) if mode == PIPELINE_CHUNKED else None
+        if plan is not None:
+            for i, (chunk, prompt) in enumerate(plan):
+                requests[f"{n}:chunk{i}"] = (_extraction_messages(prompt, chunk.text), 2000)
+        else:
+            prompt, max_tokens = _extraction_prompt(omit_fields, with_assessment=(mode == PIPELINE_COMBINED))
+            requests[f"{n}:extract"] = (_extraction_messages(prompt, llm_text), max_tokens)
+        docs.append((metadata, pre, plan))
+
+    # --------- (A) extraction batch ----------
+    started = time.perf_counter()
+    completions = _batch_complete(provider, requests, deployment_to_use, work_dir, "extract", stop)
+    extraction_ms = round((time.perf_counter() - started) * 1000.0, 2)
+
+    results, to_assess, cache_keys = {}, {}, {}
+    for n, doc_id in enumerate(ids):
+        metadata, pre, plan = docs[n]
+        metadata["timings_ms"]["batch_extraction"] = extraction_ms
+        try:
+            parsed, assessment = _batch_profile(completions, n, plan, mode == PIPELINE_COMBINED, metadata["usage"],
+                                                metadata)
+        except Exception as e:
+            results[doc_id] = _parsing_error(e)
+            continue
+        _apply_preextracted(parsed, pre)
+
+        # --------- (B) Experience analysis ----------
+        _add_experience_analysis(parsed, metadata)
+
+        if assessment is None:
+            cache_keys[doc_id], assessment = _assessment_cache_lookup(parsed, deployment_to_use, refresh_assessment)
+            metadata["assessment_cached"] = assessment is not None
+            if assessment is None:
+                to_assess[doc_id] = parsed
+        results[doc_id] = _finish_result(parsed, assessment, metadata)
+
+    # --------- (C) assessment batch, for cache misses ----------
+    if to_assess:
+        started = time.perf_counter()
+        usages = {}
+        assessments = generate_assessments_batch(to_assess, provider, deployment_to_use, work_dir, usages, stop)
+        assessment_ms = round((time.perf_counter() - started) * 1000.0, 2)
+        for doc_id, assessment in assessments.items():
+            _assessment_cache_store(cache_keys[doc_id], assessment)
+            metadata = results[doc_id]["metadata"]
+            _add_usage(metadata["usage"], usages.get(doc_id, {}))
+            metadata["timings_ms"]["batch_assessment"] = assessment_ms
+            results[doc_id]["assessment"] = assessment
+
+    return {doc_id: results[doc_id] for doc_id in ids}
@@ -0,0 +1,545 @@
+# resumestore.py
+"""
+Persistent store of parsed profiles, queryable without re-running the pipeline.
+
+Every successful ats_extractor result is kept in SQLite (__DATA__/profiles.db), keyed on
+the SHA-256 of the uploaded PDF, so re-uploads overwrite instead of duplicating:
+    profiles        full_name, email, filename, total_years (experience_analysis.total_years_approx),
+                    overall_score (assessment.overall_score), updated_at
+    profile_results the full result JSON (profile, experience_analysis, assessment)
+    skills / terms  distinct normalized technical_skills entries (name, category) and
+                    employer / job title phrases, linked through profile_skills / profile_terms
+
+Filtering runs on an in-memory index built from those tables on the first query:
+numeric columns plus one posting list (profile slots) per skill, category and phrase.
+A filter is a NumPy mask over all profiles, so a query that matches a third of 100k
+profiles still answers in a few milliseconds; SQLite only fetches the requested page.
+Writes through this store update the index in place; commits from other processes
+(other workers, the ingest CLI) are picked up on the next query.
+
+Skill filters are exact on the normalized skill ("Apache  Spark" == "apache spark").
+Employer and title filters match on word boundaries: every word-suffix of a title is
+indexed, so "data engineer" finds "Senior Data Engineer", and a prefix is enough
+("data eng").
+"""
+
+import re
+import json
+import time
+import bisect
+import sqlite3
+import threading
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    doc_hash TEXT NOT NULL UNIQUE,
+    full_name TEXT,
+    email TEXT,
+    filename TEXT,
+    total_years REAL,
+    overall_score INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_updated ON profiles (updated_at);
+
+CREATE TABLE IF NOT EXISTS profile_results (
+    profile_id INTEGER PRIMARY KEY,
+    result TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS skills (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    UNIQUE (name, category)
+);
+
+CREATE TABLE IF NOT EXISTS profile_skills (
+    skill_id INTEGER NOT NULL,
+    profile_id INTEGER NOT NULL,
+    PRIMARY KEY (profile_id, skill_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    field TEXT NOT NULL,
+    phrase TEXT NOT NULL,
+    UNIQUE (field, phrase)
+);
+
+CREATE TABLE IF NOT EXISTS profile_terms (
+    term_id INTEGER NOT NULL,
+    profile_id INTEGER NOT NULL,
+    PRIMARY KEY (profile_id, term_id)
+) WITHOUT ROWID;
+"""
+
+SORTS = ("recent", "score", "years")
+TERM_FIELDS = ("employer", "title")
+
+_WORD_RE = re.compile(r"[\w+#.]+")
+_PREFIX_END = "\U0010ffff"  # sorts after every other character
+# seconds of slack when picking up other processes' writes by updated_at (clock skew between workers)
+_SYNC_SLACK_SECONDS = 5.0
+
+
+def normalize_skill(value) -> str:
+    return " ".join(str(value).lower().split())
+
+
+def _words(value) -> List[str]:
+    return [w.strip(".") for w in _WORD_RE.findall(str(value).lower()) if w.strip(".")]
+
+
+def _phrases(value) -> List[str]:
+    """Word suffixes of a name: "Senior Data Engineer" -> senior data engineer, data engineer, engineer."""
+    words = _words(value)
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_SUMMARY_COLUMNS = "doc_hash, full_name, email, filename, total_years, overall_score, updated_at"
+_IN_BATCH = 500  # bound parameters per IN (...) query
+
+
+def _summary(row) -> dict:
+    """Summary dict from the _SUMMARY_COLUMNS of one profiles row."""
+    return {
+        "profile_id": row[0],
+        "full_name": row[1],
+        "email": row[2],
+        "filename": row[3],
+        "total_years": row[4],
+        "overall_score": row[5],
+        "updated_at": row[6],
+    }
+
+
+def _rows_for(result: dict):
+    """(summary columns, skill rows, term rows) pulled out of one ats_extractor result."""
+    experience = result.get("experience_analysis") or {}
+    assessment = result.get("assessment") or {}
+    score = None if assessment.get("error") else _number(assessment.get("overall_score"))
+    summary = (
+        result.get("full_name") or None,
+        result.get("email") or None,
+        _number(experience.get("total_years_approx")),
+        int(score) if score is not None else None,
+    )
+
+    skills = set()
+    technical = result.get("technical_skills") or {}
+    if isinstance(technical, dict):
+        for category, values in technical.items():
+            for value in values if isinstance(values, list) else [values]:
+                if value:
+                    skills.add((normalize_skill(value), str(category)))
+
+    terms = set()
+    for job in result.get("employment_details") or []:
+        if not isinstance(job, dict):
+            continue
+        for field, key in (("employer", "company"), ("title", "job_title")):
+            for phrase in _phrases(job.get(key) or ""):
+                terms.add((field, phrase))
+    return summary, skills, terms
+
+
+# -------------------------
+# In-memory filter index
+# -------------------------
+class _FilterIndex:
+    """
+    Column arrays and posting lists over "slots" (one per stored version of a profile).
+    Updating a profile appends a new slot and retires the old one, so posting lists are
+    append-only; retired slots are masked out and dropped on the next rebuild.
+    """
+
+    def __init__(self):
+        self.slot_of = {}             # profile id -> live slot
+        self.ids = array("q")         # slot -> profile id
+        self.alive = bytearray()
+        self.years = array("d")       # NaN when unknown
+        self.score = array("d")
+        self.updated = array("d")
+        self.skills = {}              # normalized name -> {category: slots}
+        self.categories = {}          # category -> slots
+        self.terms = {field: {} for field in TERM_FIELDS}         # phrase -> slots
+        self.sorted_terms = {field: [] for field in TERM_FIELDS}  # for prefix ranges
+        self.retired = 0
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    def add_profile(self, profile_id: int, total_years, score, updated_at: float) -> int:
+        self.remove(profile_id)
+        slot = len(self.ids)
+        self.slot_of[profile_id] = slot
+        self.ids.append(profile_id)
+        self.alive.append(1)
+        self.years.append(float("nan") if total_years is None else float(total_years))
+        self.score.append(float("nan") if score is None else float(score))
+        self.updated.append(float(updated_at))
+        return slot
+
+    def add_skill(self, slot: int, name: str, category: str) -> None:
+        self.skills.setdefault(name, {}).setdefault(category, array("i")).append(slot)
+        self.categories.setdefault(category, array("i")).append(slot)
+
+    def add_term(self, slot: int, field: str, phrase: str) -> None:
+        postings = self.terms[field].get(phrase)
+        if postings is None:
+            postings = self.terms[field][phrase] = array("i")
+            bisect.insort(self.sorted_terms[field], phrase)
+        postings.append(slot)
+
+    def remove(self, profile_id: int) -> bool:
+        slot = self.slot_of.pop(profile_id, None)
+        if slot is None:
+            return False
+        self.alive[slot] = 0
+        self.retired += 1
+        return True
+
+    def needs_compaction(self) -> bool:
+        return self.retired > max(1000, len(self.slot_of))
+
+    def select(self, skills: Sequence[str], category: Optional[str], employer: Optional[str], title: Optional[str],
+               min_years, max_years, min_score, max_score, sort: str, limit: int, offset: int):
+        """(total matches, profile ids of the requested page in order)."""
+        import numpy as np  # loaded on the first query, not when the web app starts
+
+        n = len(self.ids)
+        mask = np.frombuffer(bytes(self.alive), dtype=np.uint8).astype(bool)
+
+        def restrict(posting_lists):
+            hit = np.zeros(n, dtype=bool)
+            for postings in posting_lists:
+                hit[np.array(postings, dtype=np.intc)] = True
+            mask[:] &= hit
+
+        for skill in skills:
+            by_category = self.skills.get(normalize_skill(skill), {})
+            if category:
+                restrict([by_category[category]] if category in by_category else [])
+            else:
+                restrict(list(by_category.values()))
+        if category and not skills:
+            restrict([self.categories[category]] if category in self.categories else [])
+        for field, value in (("employer", employer), ("title", title)):
+            phrase = " ".join(_words(value or ""))
+            if phrase:
+                phrases = self.sorted_terms[field]
+                lo = bisect.bisect_left(phrases, phrase)
+                hi = bisect.bisect_left(phrases, phrase + _PREFIX_END)
+                restrict([self.terms[field][p] for p in phrases[lo:hi]])
+
+        years = np.array(self.years, dtype=float)
+        score = np.array(self.score, dtype=float)
+        with np.errstate(invalid="ignore"):  # NaN (unknown) never satisfies a bound
+            for column, low, high in ((years, min_years, max_years), (score, min_score, max_score)):
+                if low is not None:
+                    mask &= column >= low
+                if high is not None:
+                    mask &= column <= high
+
+        slots = np.flatnonzero(mask)
+        total = int(slots.size)
+        if total == 0 or offset >= total:
+            return total, []
+        # descending, newest first on ties, unknown values last (lexsort: last key is the primary one)
+        keys = [-np.array(self.updated, dtype=float)[slots]]
+        if sort in ("score", "years"):
+            primary = (score if sort == "score" else years)[slots]
+            keys.append(-np.nan_to_num(primary, nan=-np.inf))
+        wanted = offset + limit
+        if total > wanted:
+            # only rows up to the page's last primary key (ties included) need a full sort
+            cutoff = np.partition(keys[-1], wanted - 1)[wanted - 1]
+            keep = keys[-1] <= cutoff
+            slots, keys = slots[keep], [key[keep] for key in keys]
+        order = slots[np.lexsort(keys)][offset:offset + limit]
+        return total, [self.ids[slot] for slot in order.tolist()]
+
+
+class ResumeStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._skill_ids = {}  # (name, category) -> id
+        self._term_ids = {}   # (field, phrase) -> id
+        self._index = None
+        self._data_version = None
+        self._synced_until = 0.0
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def upsert(self, doc_hash: str, result: dict, filename: Optional[str] = None) -> None:
+        self.upsert_many([(doc_hash, result, filename)])
+
+    def upsert_many(self, items: Iterable[Tuple[str, dict, Optional[str]]]) -> int:
+        """Insert or replace (doc_hash, result, filename) items in one transaction; returns how many."""
+        now = time.time()
+        count = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for doc_hash, result, filename in items:
+                    self._upsert_locked(doc_hash, result, filename, now)
+                    count += 1
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                # ids handed out, and index entries added, inside the rolled-back transaction
+                self._skill_ids.clear()
+                self._term_ids.clear()
+                self._index = None
+                raise
+        return count
+
+    def _upsert_locked(self, doc_hash: str, result: dict, filename: Optional[str], now: float) -> None:
+        (full_name, email, total_years, score), skills, terms = _rows_for(result)
+        conn = self._conn
+        conn.execute(
+            "INSERT INTO profiles (doc_hash, full_name, email, filename, total_years, overall_score, "
+            "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (doc_hash) DO UPDATE SET full_name = excluded.full_name, email = excluded.email, "
+            "filename = COALESCE(excluded.filename, profiles.filename), total_years = excluded.total_years, "
+            "overall_score = excluded.overall_score, updated_at = excluded.updated_at",
+            (doc_hash, full_name, email, filename, total_years, score, now, now),
+        )
+        profile_id = conn.execute("SELECT id FROM profiles WHERE doc_hash = ?", (doc_hash,)).fetchone()[0]
+        conn.execute("INSERT OR REPLACE INTO profile_results (profile_id, result) VALUES (?, ?)",
+                     (profile_id, json.dumps(result)))
+        conn.execute("DELETE FROM profile_skills WHERE profile_id = ?", (profile_id,))
+        conn.execute("DELETE FROM profile_terms WHERE profile_id = ?", (profile_id,))
+        conn.executemany("INSERT INTO profile_skills (skill_id, profile_id) VALUES (?, ?)",
+                         [(self._id_locked("skills", ("name", "category"), self._skill_ids, key), profile_id)
+                          for key in skills])
+        conn.executemany("INSERT INTO profile_terms (term_id, profile_id) VALUES (?, ?)",
+                         [(self._id_locked("terms", ("field", "phrase"), self._term_ids, key), profile_id)
+                          for key in terms])
+
+        if self._index is not None:
+            slot = self._index.add_profile(profile_id, total_years, score, now)
+            for name, category in skills:
+                self._index.add_skill(slot, name, category)
+            for field, phrase in terms:
+                self._index.add_term(slot, field, phrase)
+
+    def _id_locked(self, table: str, columns: Tuple[str, str], memo: dict, key: tuple) -> int:
+        """Id of a dictionary row (skills / terms), inserting it on first sight."""
+        row_id = memo.get(key)
+        if row_id is None:
+            self._conn.execute(f"INSERT OR IGNORE INTO {table} ({columns[0]}, {columns[1]}) VALUES (?, ?)", key)
+            row_id = memo[key] = self._conn.execute(
+                f"SELECT id FROM {table} WHERE {columns[0]} = ? AND {columns[1]} = ?", key
+            ).fetchone()[0]
+        return row_id
+
+    def delete(self, doc_hash: str) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute("SELECT id FROM profiles WHERE doc_hash = ?", (doc_hash,)).fetchone()
+                if row is not None:
+                    for table in ("profile_skills", "profile_terms", "profile_results"):
+                        self._conn.execute(f"DELETE FROM {table} WHERE profile_id = ?", (row[0],))
+                    self._conn.execute("DELETE FROM profiles WHERE id = ?", (row[0],))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if row is None:
+                return False
+            if self._index is not None:
+                self._index.remove(row[0])
+        return True
+
+    # -------------------------
+    # Index maintenance
+    # -------------------------
+    def _ensure_index_locked(self) -> _FilterIndex:
+        # data_version changes only when *another* connection committed
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._index is None or self._index.needs_compaction():
+            self._rebuild_index_locked()
+        elif version != self._data_version:
+            self._sync_index_locked()
+        self._data_version = version
+        return self._index
+
+    def _rebuild_index_locked(self) -> None:
+        """Build the index from scratch: one grouped query per link table, parsed with NumPy."""
+        import numpy as np
+
+        conn = self._conn
+        index = _FilterIndex()
+        conn.execute("BEGIN")  # one snapshot for every read below
+        try:
+            for profile_id, total_years, score, updated_at in conn.execute(
+                    "SELECT id, total_years, overall_score, updated_at FROM profiles ORDER BY id"):
+                index.add_profile(profile_id, total_years, score, updated_at)
+            ids = np.array(index.ids, dtype=np.int64)
+
+            def slots(joined: str) -> array:
+                # ids are sorted, so a profile id's position is its slot
+                positions = np.searchsorted(ids, np.fromstring(joined, dtype=np.int64, sep=","))
+                postings = array("i")
+                postings.frombytes(positions.astype(np.intc).tobytes())
+                return postings
+
+            for name, category, joined in conn.execute(
+                    "SELECT s.name, s.category, g.ids FROM (SELECT skill_id, group_concat(profile_id) AS ids "
+                    "FROM profile_skills GROUP BY skill_id) g JOIN skills s ON s.id = g.skill_id"):
+                postings = slots(joined)
+                index.skills.setdefault(name, {})[category] = postings
+                index.categories.setdefault(category, array("i")).extend(postings)
+            for field, phrase, joined in conn.execute(
+                    "SELECT t.field, t.phrase, g.ids FROM (SELECT term_id, group_concat(profile_id) AS ids "
+                    "FROM profile_terms GROUP BY term_id) g JOIN terms t ON t.id = g.term_id"):
+                if field in index.terms:
+                    index.terms[field][phrase] = slots(joined)
+            newest = conn.execute("SELECT MAX(updated_at) FROM profiles").fetchone()[0]
+        finally:
+            conn.execute("COMMIT")
+        for field, phrases in index.terms.items():
+            index.sorted_terms[field] = sorted(phrases)
+        self._synced_until = newest or 0.0
+        self._index = index
+
+    def _sync_index_locked(self) -> None:
+        """Apply other processes' commits: re-read recently updated profiles; rebuild if rows disappeared."""
+        conn = self._conn
+        index = self._index
+        since = (self._synced_until - _SYNC_SLACK_SECONDS,)
+        changed = "(SELECT id FROM profiles WHERE updated_at >= ?)"
+        slots = {}
+        for profile_id, total_years, score, updated_at in conn.execute(
+                "SELECT id, total_years, overall_score, updated_at FROM profiles WHERE updated_at >= ?", since):
+            slots[profile_id] = index.add_profile(profile_id, total_years, score, updated_at)
+            self._synced_until = max(self._synced_until, updated_at)
+        if slots:
+            for profile_id, name, category in conn.execute(
+                    "SELECT x.profile_id, s.name, s.category FROM profile_skills x JOIN skills s ON s.id = x.skill_id "
+                    f"WHERE x.profile_id IN {changed}", since):
+                if profile_id in slots:
+                    index.add_skill(slots[profile_id], name, category)
+            for profile_id, field, phrase in conn.execute(
+                    "SELECT x.profile_id, t.field, t.phrase FROM profile_terms x JOIN terms t ON t.id = x.term_id "
+                    f"WHERE x.profile_id IN {changed}", since):
+                if profile_id in slots and field in index.terms:
+                    index.add_term(slots[profile_id], field, phrase)
+        # dictionary rows may have been added by the other writer
+        self._skill_ids.clear()
+        self._term_ids.clear()
+        if len(index) != conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]:
+            self._rebuild_index_locked()
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def get(self, doc_hash: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT r.result FROM profiles p JOIN profile_results r ON r.profile_id = p.id "
+                                     "WHERE p.doc_hash = ?", (doc_hash,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def query(self, skills: Sequence[str] = (), category: Optional[str] = None, min_years: Optional[float] = None,
+              max_years: Optional[float] = None, employer: Optional[str] = None, title: Optional[str] = None,
+              min_score: Optional[float] = None, max_score: Optional[float] = None, sort: str = "recent",
+              limit: int = 50, offset: int = 0, full: bool = False) -> dict:
+        """
+        Profiles matching every given filter:
+            skills      each one must be present (in `category`, if given)
+            category    technical_skills category; alone, the profile needs any skill in it
+            min/max_years, min/max_score   inclusive bounds (profiles without a value never match)
+            employer, title                word-boundary prefix match on any job
+        sort: recent (updated_at), score or years, descending.
+        Returns {"total", "limit", "offset", "profiles": [summary, ...]}; full=True adds each "result".
+        """
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of {list(SORTS)}")
+        limit, offset = int(limit), int(offset)
+        columns = "p.id, " + ", ".join("p." + c for c in _SUMMARY_COLUMNS.split(", "))
+        if full:
+            columns += ", r.result"
+        with self._lock:
+            index = self._ensure_index_locked()
+            total, page = index.select(skills, category, employer, title, min_years, max_years,
+                                       min_score, max_score, sort, limit, offset)
+            rows = {}
+            if page:
+                rows = {row[0]: row for row in self._conn.execute(
+                    f"SELECT {columns} FROM profiles p LEFT JOIN profile_results r ON r.profile_id = p.id "
+                    f"WHERE p.id IN ({','.join('?' * len(page))})", page)}
+
+        profiles = []
+        for profile_id in page:
+            row = rows.get(profile_id)
+            if row is None:
+                continue
+            item = _summary(row[1:8])
+            if full:
+                item["result"] = json.loads(row[8]) if row[8] else None
+            profiles.append(item)
+        return {"total": total, "limit": limit, "offset": offset, "profiles": profiles}
+
+    def summaries(self, doc_hashes: Sequence[str]) -> dict:
+        """doc_hash -> the summary query() returns for it (missing profiles are left out)."""
+        found = {}
+        with self._lock:
+            for start in range(0, len(doc_hashes), _IN_BATCH):
+                part = list(doc_hashes[start:start + _IN_BATCH])
+                for row in self._conn.execute(
+                        f"SELECT {_SUMMARY_COLUMNS} FROM profiles WHERE doc_hash IN ({','.join('?' * len(part))})",
+                        part):
+                    found[row[0]] = _summary(row)
+        return found
+
+    def results(self, doc_hashes: Sequence[str]) -> dict:
+        """doc_hash -> stored result, for many profiles at once."""
+        found = {}
+        with self._lock:
+            for start in range(0, len(doc_hashes), _IN_BATCH):
+                part = list(doc_hashes[start:start + _IN_BATCH])
+                for doc_hash, result in self._conn.execute(
+                        "SELECT p.doc_hash, r.result FROM profiles p JOIN profile_results r ON r.profile_id = p.id "
+                        f"WHERE p.doc_hash IN ({','.join('?' * len(part))})", part):
+                    found[doc_hash] = json.loads(result)
+        return found
+
+    def changed_since(self, since: Optional[float] = None) -> List[Tuple[str, float]]:
+        """(doc_hash, updated_at) of profiles written at or after `since` (all of them when None), oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT doc_hash, updated_at FROM profiles WHERE updated_at >= ? ORDER BY updated_at",
+                (float("-inf") if since is None else since,)
+            ).fetchall()
+
+    def doc_hashes(self) -> set:
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT doc_hash FROM profiles")}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
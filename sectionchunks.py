@@ -0,0 +1,182 @@
+# sectionchunks.py
+"""
+Split long resumes into section chunks for parallel extraction, and merge the per-chunk
+profiles back into one (PIPELINE_CHUNKED in resumeparser.py).
+
+A single extraction completion has max_tokens=2000; a senior CV with a dozen jobs can
+need more, and truncated JSON fails to parse. Chunking asks each completion for only the
+fields its chunk can contain:
+    profile     header / summary (name, contacts) + skills, education, certifications,
+                languages, projects, awards          -> every non-employment field
+    experience  the experience section, cut between jobs  -> employment_details, technical_skills
+Sections are found with preextract.segment_sections(); the experience section is cut at
+lines that start a new job (a date range, plus the title / company line just above it)
+and packed into chunks of at most `max_tokens` prompt tokens. The profile chunk is split
+by section the same way if it is too long on its own.
+
+merge_chunk_profiles() is deterministic: chunks are merged in document order whatever
+order their completions finished in; scalars keep the first non-empty value; lists are
+de-duplicated on a normalized form; employment_details entries with the same company,
+title and start date (or no start date) are merged, keeping the first one's values and
+the union of responsibilities.
+"""
+
+import re
+import json
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from preextract import segment_sections, DATE_RANGE_RE, DROP_SECTIONS
+from normalize import count_tokens
+
+PROFILE_FIELDS = ("full_name", "email", "github", "linkedin", "technical_skills", "soft_skills", "education",
+                  "languages", "certifications")
+# skills named only in job bullets ("built X with Airflow") would be lost otherwise
+EXPERIENCE_FIELDS = ("employment_details", "technical_skills")
+
+_BULLET_RE = re.compile(r"^\s*(?:[-*•·▪◦‣–]|\d+[.)])\s")
+
+
+class Chunk(NamedTuple):
+    kind: str                 # "profile" | "experience"
+    fields: tuple             # schema keys this chunk's completion is asked for
+    text: str
+    tokens: int
+
+
+def _job_blocks(body: str) -> List[str]:
+    """Experience text cut before every job: at a date-range line, or at the non-bullet line right above it."""
+    lines = body.splitlines()
+    starts = []
+    for i, line in enumerate(lines):
+        if not DATE_RANGE_RE.search(line) or _BULLET_RE.match(line):
+            continue
+        start = i
+        if i > 0 and lines[i - 1].strip() and not _BULLET_RE.match(lines[i - 1]) and len(lines[i - 1]) < 100:
+            start = i - 1  # "Senior Data Engineer, Acme" above "Jan 2020 - Present"
+        if not starts or start > starts[-1]:
+            starts.append(start)
+    if not starts:
+        return [body]
+    if starts[0] > 0:
+        starts[0] = 0  # text before the first job belongs to it
+    bounds = starts + [len(lines)]
+    return ["\n".join(lines[a:b]) for a, b in zip(bounds, bounds[1:])]
+
+
+def _pack(pieces: Sequence[str], max_tokens: int) -> List[str]:
+    """Greedy packing of consecutive pieces into texts of at most max_tokens (a bigger piece stays alone)."""
+    packed, current, size = [], [], 0
+    for piece in pieces:
+        tokens = count_tokens(piece)
+        if current and size + tokens > max_tokens:
+            packed.append("\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += tokens
+    if current:
+        packed.append("\n".join(current))
+    return packed
+
+
+def chunk_resume(text: str, max_tokens: int = 1500) -> List[Chunk]:
+    """
+    Section chunks of a resume, in document order, or [] when there is no experience
+    section to split on (the caller then extracts the text in one completion).
+    """
+    sections = [(name, body) for name, body in segment_sections(text) if name not in DROP_SECTIONS]
+    experience = [body for name, body in sections if name == "experience" and body.strip()]
+    if not experience:
+        return []
+
+    profile_pieces = [body if name == "header" else f"{name.upper()}\n{body}"
+                      for name, body in sections if name != "experience" and body.strip()]
+    job_pieces = [block for body in experience for block in _job_blocks(body)]
+
+    chunks = [Chunk("profile", PROFILE_FIELDS, piece, count_tokens(piece))
+              for piece in _pack(profile_pieces, max_tokens)]
+    chunks += [Chunk("experience", EXPERIENCE_FIELDS, "EXPERIENCE\n" + piece, count_tokens(piece))
+               for piece in _pack(job_pieces, max_tokens)]
+    return chunks
+
+
+# -------------------------
+# Merging
+# -------------------------
+def _norm(value) -> str:
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return " ".join(re.findall(r"\w+", str(value or "").lower()))
+
+
+def _empty(value) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _union(target: list, items) -> None:
+    seen = {_norm(item) for item in target}
+    for item in items if isinstance(items, list) else [items]:
+        key = _norm(item)
+        if not _empty(item) and key not in seen:
+            seen.add(key)
+            target.append(item)
+
+
+def _merge_job(kept: dict, job: dict) -> None:
+    for key, value in job.items():
+        if key == "responsibilities":
+            # a copy: kept is a shallow copy of the model's job, whose list must not change
+            current = kept.get("responsibilities")
+            if isinstance(current, list):
+                kept["responsibilities"] = list(current)
+            else:
+                kept["responsibilities"] = [] if _empty(current) else [current]
+            _union(kept["responsibilities"], value or [])
+        elif _empty(kept.get(key)) and not _empty(value):
+            kept[key] = value
+
+
+def merge_employment(job_lists: Sequence[list]) -> list:
+    """Concatenate per-chunk employment_details in order, merging repeats of the same job."""
+    merged, by_key, by_role = [], {}, {}
+    for jobs in job_lists:
+        for job in jobs or []:
+            if not isinstance(job, dict):
+                continue
+            company, title, start = _norm(job.get("company")), _norm(job.get("job_title")), _norm(job.get("start_date"))
+            if not company and not title:
+                merged.append(dict(job))
+                continue
+            # a job cut across two chunks may come back once with dates and once without
+            kept = by_key.get((company, title, start)) or (by_role.get((company, title)) if not start else None)
+            if kept is None:
+                kept = dict(job)
+                merged.append(kept)
+                by_key[(company, title, start)] = kept
+                by_role.setdefault((company, title), kept)
+            else:
+                _merge_job(kept, job)
+    return merged
+
+
+def merge_chunk_profiles(chunks: Sequence[Chunk], profiles: Sequence[Optional[dict]]) -> dict:
+    """One profile from the per-chunk profiles (same order as chunks); keys outside a chunk's fields are ignored."""
+    merged: Dict[str, object] = {}
+    jobs = []
+    for chunk, profile in zip(chunks, profiles):
+        if not isinstance(profile, dict):
+            continue
+        for key in chunk.fields:
+            value = profile.get(key)
+            if key == "employment_details":
+                jobs.append(value if isinstance(value, list) else [])
+            elif key == "technical_skills":
+                skills = merged.setdefault("technical_skills", {})
+                if isinstance(value, dict):
+                    for category, values in value.items():
+                        _union(skills.setdefault(category, []), values or [])
+            elif isinstance(value, list):
+                _union(merged.setdefault(key, []), value)
+            elif _empty(merged.get(key)) and not _empty(value):
+                merged[key] = value
+    merged["employment_details"] = merge_employment(jobs)
+    return merged
@@ -0,0 +1,92 @@
+# singleflight.py
+"""
+In-flight request coalescing ("single flight"): concurrent callers asking for the same key
+share one execution instead of each running it.
+
+When a hiring manager and a recruiter open the same CV at the same moment, or the frontend
+double-submits, both requests miss the result cache (neither has finished yet) and would
+each pay for the extraction and assessment completions. With a SingleFlight in front of the
+pipeline the first caller runs it; callers arriving while it runs wait for that run and get
+its result (or its exception). Once the run ends the key is released, and later callers go
+through the result cache as usual.
+
+    flight = SingleFlight()
+    result, shared = flight.do(key, fn, *args)           # threads (Flask, job workers)
+    result, shared = await async_flight.do(key, coro_fn, *args)   # one event loop (asgi.py)
+
+`shared` is False for the caller whose call ran and True for the ones that joined it.
+Joined callers get a deep copy, so a caller that edits its result can't change another's.
+"""
+
+import copy
+import threading
+from typing import Callable, Hashable, Tuple
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-safe single flight: one fn(*args) per key at a time, shared by every concurrent caller."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[object, bool]:
+        """(result, shared). Exceptions raised by the running call are raised in every caller sharing it."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result), True
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines on one event loop. The shared run is its own task, so a caller
+    that goes away (client disconnect cancels its request) doesn't cancel it for the others.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[object, bool]:
+        import asyncio
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        task = self._tasks.get(task_key)
+        leader = task is None
+        if leader:
+            task = self._tasks[task_key] = loop.create_task(fn(*args, **kwargs))
+            task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+        result = await asyncio.shield(task)
+        return (result, False) if leader else (copy.deepcopy(result), True)
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
@@ -0,0 +1,346 @@
+# skillindex.py
+"""
+In-memory inverted index over stored profiles, for ranking candidates against a job description.
+
+Each profile is indexed from its ats_extractor result:
+    technical_skills (every category)   weight 3
+    certifications                      weight 2
+    job titles                          weight 2 x tenure factor of that job
+    soft_skills                         weight 1
+    responsibilities                    weight 1 x tenure factor of that job
+Text is lowercased into words (c++, c#, node.js kept whole) plus adjacent-word bigrams
+("power bi", "data engineer"), with common English stopwords dropped. The same analyzer
+runs on the pasted job description.
+
+Tenure comes from experience_analysis.per_job: a job's words count 1 + TENURE_WEIGHT x
+min(duration_months, 120) / 120 times, so "Spark" across six years of responsibilities
+outweighs one mention in a six-month internship. rank() can also boost total years.
+
+Scoring is BM25 (k1, b) over those weighted term frequencies. Postings are append-only
+arrays over "slots" (one per indexed version of a profile); re-adding a profile retires its
+old slot and remove() just marks it dead, so both are O(1). Dead slots are dropped when
+they outnumber live ones. A query gathers the postings of its terms and sums them with one
+np.bincount, so ranking 100k profiles takes tens of milliseconds; only the top-N ever
+leave this module (e.g. for an LLM job-fit assessment).
+
+sync(store) brings the index up to date with a resumestore.ResumeStore, including writes
+and deletes made by other processes.
+"""
+
+import re
+import math
+import functools
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional
+
+FIELD_WEIGHTS = {
+    "technical_skills": 3.0,
+    "certifications": 2.0,
+    "job_title": 2.0,
+    "soft_skills": 1.0,
+    "responsibilities": 1.0,
+}
+TENURE_WEIGHT = 1.0          # a 10-year job's titles / responsibilities count double
+TENURE_CAP_MONTHS = 120
+TOTAL_YEARS_CAP = 15.0       # rank(tenure_boost=...) saturates here
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be been being below between both but by can
+could did do does doing down during each etc few for from further had has have having he her here hers
+him his how i if in into is it its itself just may me more most must my no nor not of off on once only
+or other our ours out over own per same she should so some such than that the their them then there
+these they this those through to too under until up very via was we were what when where which while
+who whom why will with within would you your
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+# seconds of slack when picking up other processes' writes by updated_at (clock skew between workers)
+_SYNC_SLACK_SECONDS = 5.0
+_SYNC_FETCH_BATCH = 500
+
+
+def analyze(text) -> List[str]:
+    """Words minus stopwords, then their adjacent bigrams: "Power BI dashboards" -> power, bi, dashboards, power bi, bi dashboards."""
+    return list(_analyze_cached(str(text)))
+
+
+@functools.lru_cache(maxsize=65536)
+def _analyze_cached(text: str) -> tuple:
+    # skills, titles and certifications repeat across thousands of profiles
+    words = [w.rstrip(".") for w in _TOKEN_RE.findall(text.lower())]
+    words = [w for w in words if w and w not in STOPWORDS]
+    return tuple(words) + tuple(f"{a} {b}" for a, b in zip(words, words[1:]))
+
+
+def _texts(value) -> List[str]:
+    """Strings inside a list / dict / scalar field (certifications may be objects)."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, dict):
+        return [text for v in value.values() for text in _texts(v)]
+    if isinstance(value, (list, tuple)):
+        return [text for v in value for text in _texts(v)]
+    return [str(value)]
+
+
+def _tenure_factor(months) -> float:
+    try:
+        months = max(0.0, float(months))
+    except (TypeError, ValueError):
+        return 1.0
+    return 1.0 + TENURE_WEIGHT * min(months, TENURE_CAP_MONTHS) / TENURE_CAP_MONTHS
+
+
+def document_terms(result: dict) -> Dict[str, float]:
+    """Weighted term frequencies of one ats_extractor result."""
+    weights = Counter()
+
+    def add(texts, weight):
+        counts = Counter()
+        for text in texts:
+            counts.update(_analyze_cached(text))
+        for term, count in counts.items():
+            weights[term] += count * weight
+
+    add(_texts(result.get("technical_skills")), FIELD_WEIGHTS["technical_skills"])
+    add(_texts(result.get("certifications")), FIELD_WEIGHTS["certifications"])
+    add(_texts(result.get("soft_skills")), FIELD_WEIGHTS["soft_skills"])
+
+    # per_job carries duration_months; fall back to the raw employment list (no tenure) without it
+    jobs = (result.get("experience_analysis") or {}).get("per_job") or result.get("employment_details") or []
+    for job in jobs:
+        if not isinstance(job, dict):
+            continue
+        factor = _tenure_factor(job.get("duration_months"))
+        add(_texts(job.get("job_title")), FIELD_WEIGHTS["job_title"] * factor)
+        add(_texts(job.get("responsibilities")), FIELD_WEIGHTS["responsibilities"] * factor)
+    return dict(weights)
+
+
+def _total_years(result: dict) -> float:
+    try:
+        return float((result.get("experience_analysis") or {}).get("total_years_approx") or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class SkillIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._clear_locked()
+
+    def _clear_locked(self) -> None:
+        self._slot_of = {}              # doc id -> live slot
+        self._ids = []                  # slot -> doc id
+        self._alive = bytearray()
+        self._length = array("d")       # sum of term weights per slot
+        self._years = array("d")
+        self._postings = {}             # term -> (array("i") slots, array("d") weights)
+        self._arrays = {}               # term -> NumPy copies of its postings, refreshed when they grow
+        self._retired = 0
+        self._live_length = 0.0
+        self._versions = {}             # doc id -> store updated_at (sync bookkeeping)
+        self._synced_until = 0.0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self._slot_of
+
+    # -------------------------
+    # Updates
+    # -------------------------
+    def add(self, doc_id: str, result: dict) -> None:
+        """Index (or re-index) one profile."""
+        terms = document_terms(result)
+        with self._lock:
+            self._add_locked(doc_id, terms, _total_years(result))
+
+    def _add_locked(self, doc_id: str, terms: Dict[str, float], years: float) -> None:
+        self._remove_locked(doc_id)
+        slot = len(self._ids)
+        self._slot_of[doc_id] = slot
+        self._ids.append(doc_id)
+        self._alive.append(1)
+        length = sum(terms.values())
+        self._length.append(length)
+        self._years.append(years)
+        self._live_length += length
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("i"), array("d"))
+            postings[0].append(slot)
+            postings[1].append(weight)
+        if self._retired > max(1000, len(self._slot_of)):
+            self._compact_locked()
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            self._versions.pop(doc_id, None)
+            return self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str) -> bool:
+        slot = self._slot_of.pop(doc_id, None)
+        if slot is None:
+            return False
+        self._alive[slot] = 0
+        self._live_length -= self._length[slot]
+        self._retired += 1
+        return True
+
+    def _compact_locked(self) -> None:
+        """Drop dead slots: renumber live ones and filter every posting list."""
+        import numpy as np  # loaded on first use, not when the web app starts
+
+        alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        new_slot = (np.cumsum(alive) - 1).astype(np.intc)
+        keep_slots = np.flatnonzero(alive)
+        postings = {}
+        for term, (slots, weights) in self._postings.items():
+            slots_np = np.array(slots, dtype=np.intc)
+            live = alive[slots_np]
+            if not live.any():
+                continue
+            new_slots, new_weights = array("i"), array("d")
+            new_slots.frombytes(new_slot[slots_np[live]].tobytes())
+            new_weights.frombytes(np.array(weights, dtype=np.float64)[live].tobytes())
+            postings[term] = (new_slots, new_weights)
+        self._postings = postings
+        self._arrays = {}
+        self._ids = [self._ids[slot] for slot in keep_slots.tolist()]
+        self._slot_of = {doc_id: slot for slot, doc_id in enumerate(self._ids)}
+        self._alive = bytearray(b"\x01" * len(self._ids))
+        for name in ("_length", "_years"):
+            column = array("d")
+            column.frombytes(np.array(getattr(self, name), dtype=np.float64)[keep_slots].tobytes())
+            setattr(self, name, column)
+        self._live_length = float(sum(self._length))
+        self._retired = 0
+
+    # -------------------------
+    # Ranking
+    # -------------------------
+    def _term_arrays(self, term: str):
+        """(slots, weights) as NumPy arrays; the cached copy is reused until the postings grow."""
+        import numpy as np
+
+        slots, weights = self._postings[term]
+        cached = self._arrays.get(term)
+        if cached is None or cached[0].size != len(slots):
+            cached = self._arrays[term] = (np.array(slots, dtype=np.intc), np.array(weights, dtype=np.float64))
+        return cached
+
+    def rank(self, job_description: str, top_n: int = 20, min_years: Optional[float] = None,
+             tenure_boost: float = 0.0, max_matched_terms: int = 10) -> List[dict]:
+        """
+        Best top_n profiles for a job description, best first:
+            [{"doc_id", "score", "matched_terms": [...]}, ...]
+        min_years: skip profiles with less total experience.
+        tenure_boost: multiply scores by 1 + tenure_boost x min(total years, 15) / 15.
+        Repeated words in the description count more (1 + log of their frequency).
+        """
+        import numpy as np
+
+        query = Counter(analyze(job_description))
+        with self._lock:
+            n_live = len(self._slot_of)
+            if not query or not n_live or top_n <= 0:
+                return []
+            n = len(self._ids)
+            alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+            length = np.array(self._length, dtype=np.float64)
+            avg_length = max(self._live_length / n_live, 1e-9)
+            norm = self.k1 * (1.0 - self.b + self.b * length / avg_length)
+
+            terms, all_slots, all_scores = [], [], []
+            for term, count in query.items():
+                if term not in self._postings:
+                    continue
+                slots, weights = self._term_arrays(term)
+                live = alive[slots]
+                df = int(np.count_nonzero(live))
+                if not df:
+                    continue
+                slots, weights = slots[live], weights[live]
+                idf = math.log(1.0 + (n_live - df + 0.5) / (df + 0.5))
+                query_weight = 1.0 + math.log(count)
+                all_scores.append(query_weight * idf * weights * (self.k1 + 1.0) / (weights + norm[slots]))
+                all_slots.append(slots)
+                terms.append(term)
+            if not terms:
+                return []
+
+            slots = np.concatenate(all_slots)
+            contributions = np.concatenate(all_scores)
+            scores = np.bincount(slots, weights=contributions, minlength=n)
+            years = np.array(self._years, dtype=np.float64)
+            if tenure_boost:
+                scores *= 1.0 + tenure_boost * np.minimum(years, TOTAL_YEARS_CAP) / TOTAL_YEARS_CAP
+            if min_years is not None:
+                scores[years < min_years] = 0.0
+
+            candidates = np.flatnonzero(scores > 0)
+            if candidates.size > top_n:
+                candidates = candidates[np.argpartition(-scores[candidates], top_n - 1)[:top_n]]
+            # best first; earlier slots (older profiles) first on ties, so the order is stable
+            top = candidates[np.lexsort((candidates, -scores[candidates]))]
+            ids = [self._ids[slot] for slot in top.tolist()]
+
+        # matched terms of the winners only, strongest contribution first
+        term_of = np.repeat(np.arange(len(terms)), [s.size for s in all_slots])
+        hit = np.isin(slots, top)
+        matched = {}
+        for slot, term_idx, contribution in zip(slots[hit].tolist(), term_of[hit].tolist(),
+                                                contributions[hit].tolist()):
+            matched.setdefault(slot, []).append((contribution, terms[term_idx]))
+        ranked = []
+        for slot, doc_id in zip(top.tolist(), ids):
+            best = sorted(matched.get(slot, []), reverse=True)[:max_matched_terms]
+            ranked.append({"doc_id": doc_id, "score": round(float(scores[slot]), 4),
+                           "matched_terms": [term for _, term in best]})
+        return ranked
+
+    # -------------------------
+    # Keeping up with a ResumeStore
+    # -------------------------
+    def sync(self, store) -> int:
+        """
+        Index profiles written to `store` since the last sync (by any process) and drop
+        ones deleted from it. The first call indexes everything. Returns profiles (re)indexed.
+        """
+        changed = store.changed_since(self._synced_until - _SYNC_SLACK_SECONDS if self._synced_until else None)
+        with self._lock:
+            todo = [(doc_hash, updated_at) for doc_hash, updated_at in changed
+                    if self._versions.get(doc_hash) != updated_at]
+        indexed = 0
+        for start in range(0, len(todo), _SYNC_FETCH_BATCH):
+            batch = todo[start:start + _SYNC_FETCH_BATCH]
+            results = store.results([doc_hash for doc_hash, _ in batch])
+            prepared = [(doc_hash, updated_at, document_terms(results[doc_hash]), _total_years(results[doc_hash]))
+                        for doc_hash, updated_at in batch if doc_hash in results]
+            with self._lock:
+                for doc_hash, updated_at, terms, years in prepared:
+                    self._add_locked(doc_hash, terms, years)
+                    self._versions[doc_hash] = updated_at
+            indexed += len(prepared)
+
+        with self._lock:
+            if changed:
+                self._synced_until = max(self._synced_until, max(updated_at for _, updated_at in changed))
+            stale = len(self._slot_of) != store.count()
+        if stale:
+            # something was deleted behind our back (another worker, the CLI)
+            present = store.doc_hashes()
+            with self._lock:
+                for doc_id in [d for d in self._slot_of if d not in present]:
+                    self._versions.pop(doc_id, None)
+                    self._remove_locked(doc_id)
+        return indexed
@@ -0,0 +1,147 @@
+# streamparse.py
+"""
+Incremental parser for a JSON object arriving in chunks (streamed chat completions).
+
+Feed it text as it arrives; it reports pieces of the top-level object as soon as they are
+complete, without waiting for the whole document:
+    ("item", key, value)   one element of a top-level array, e.g. each employment_details entry
+    ("field", key, value)  a top-level value, e.g. full_name, technical_skills (arrays too,
+                           once their closing bracket arrives)
+
+Tolerates what models wrap around JSON: anything before the first "{" (```json fences,
+"Here is the JSON:") and anything after the matching "}" is ignored. A piece that doesn't
+parse on its own (single quotes, trailing commas) is skipped here; the caller's full-text
+parse (resumeparser._attempt_fix_and_parse) still sees the complete output at the end.
+
+Single pass over the input: every character is scanned once, and only completed pieces
+are handed to json.loads.
+"""
+
+import re
+import json
+from typing import List, Optional, Tuple
+
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+def _loads(text: str):
+    try:
+        return True, json.loads(text)
+    except ValueError:
+        try:
+            return True, json.loads(_TRAILING_COMMA_RE.sub(r"\1", text))
+        except ValueError:
+            return False, None
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self._text = ""         # everything from the opening "{" onwards
+        self._pos = 0           # next index of self._text to scan
+        self._started = False
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._key = None         # current top-level key
+        self._expect_key = True  # at depth 1: next string is a key (vs. a value)
+        self._value_start = None  # index where the current top-level value starts
+        self._array_value = False
+        self._item_start = None  # index where the current top-level array element starts
+        self.fields = {}
+
+    def feed(self, chunk: str) -> List[Tuple]:
+        """Add text; returns the events completed by it (possibly none)."""
+        if self.done or not chunk:
+            return []
+        if not self._started:
+            brace = chunk.find("{")
+            if brace < 0:
+                return []  # still in the preamble / code fence
+            chunk = chunk[brace:]
+            self._started = True
+        self._text += chunk
+        return self._scan()
+
+    def _scan(self) -> List[Tuple]:
+        events = []
+        text = self._text
+        i = self._pos
+        n = len(text)
+        while i < n and not self.done:
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        ok, key = _loads(text[self._string_start:i + 1])
+                        self._key = key if ok else None
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":" and self._depth == 1 and self._expect_key:
+                self._expect_key = False
+                self._value_start = i + 1
+                self._array_value = False
+            elif ch in "{[":
+                if self._depth == 1 and ch == "[" and not self._expect_key and not text[self._value_start:i].strip():
+                    self._array_value = True
+                    self._item_start = i + 1
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 2 and self._array_value and ch == "]":
+                    self._emit_item(text, i, events)
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit_field(text, i, events)
+                    self.done = True
+            elif ch == ",":
+                if self._depth == 1:
+                    self._emit_field(text, i, events)
+                    self._expect_key = True
+                elif self._depth == 2 and self._array_value:
+                    self._emit_item(text, i, events)
+                    self._item_start = i + 1
+            i += 1
+        self._pos = i
+        return events
+
+    def _emit_item(self, text: str, end: int, events: list) -> None:
+        piece = text[self._item_start:end].strip()
+        if not piece:
+            return  # "[]" or a trailing comma
+        ok, value = _loads(piece)
+        if ok and self._key is not None:
+            events.append(("item", self._key, value))
+
+    def _emit_field(self, text: str, end: int, events: list) -> None:
+        if self._key is None or self._value_start is None or self._expect_key:
+            return
+        ok, value = _loads(text[self._value_start:end].strip())
+        if ok:
+            self.fields[self._key] = value
+            events.append(("field", self._key, value))
+        self._key = None
+        self._value_start = None
+        self._array_value = False
+
+    @property
+    def text(self) -> str:
+        """Everything received from the opening brace on (feed the full output to a strict parser at the end)."""
+        return self._text
+
+
+def parse_stream(chunks, parser: Optional[IncrementalJSONParser] = None):
+    """Generator: feed an iterable of text chunks, yield events as they complete."""
+    parser = parser or IncrementalJSONParser()
+    for chunk in chunks:
+        for event in parser.feed(chunk):
+            yield event
@@ -0,0 +1,32 @@
+# conftest.py
+"""
+The backend modules are flat files at the repo root; make them importable from tests/.
+Tests run offline against the mock LLM backend and never write to __DATA__.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import resumeparser  # noqa: E402
+
+TEST_SETTINGS = {"LLM_BACKEND": "mock", "ASSESSMENT_CACHE_DISK": False, "MOCK_LLM_LATENCY": "fixed:0"}
+
+
+@pytest.fixture(autouse=True)
+def offline_settings():
+    # configure() overrides win over config.yaml and the environment
+    resumeparser.configure(TEST_SETTINGS)
+    yield
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Flask test client for an app whose __DATA__ directory is a temp dir."""
+    import app as app_module
+    monkeypatch.setattr(app_module, "UPLOAD_PATH", str(tmp_path))
+    flask_app = app_module.create_app(dict(TEST_SETTINGS, WARM_UP="off", PROFILE_STORE_ENABLED=False))
+    return flask_app.test_client()
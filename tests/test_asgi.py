@@ -0,0 +1,70 @@
+# test_asgi.py
+import os
+import sys
+import json
+import asyncio
+
+import pytest
+
+from conftest import TEST_SETTINGS
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from loadtest import make_pdf  # noqa: E402
+
+ORIGIN = b"http://localhost:3000"
+BOUNDARY = b"testboundary"
+
+
+@pytest.fixture
+def asgi_app(tmp_path, monkeypatch):
+    import app as app_module
+    import asgi
+    monkeypatch.setattr(app_module, "UPLOAD_PATH", str(tmp_path))
+    return asgi.create_app(dict(TEST_SETTINGS, WARM_UP="off", PROFILE_STORE_ENABLED=False))
+
+
+def _multipart(pdf: bytes) -> bytes:
+    return (b"--" + BOUNDARY + b"\r\n"
+            b'Content-Disposition: form-data; name="pdf_doc"; filename="cv.pdf"\r\n'
+            b"Content-Type: application/pdf\r\n\r\n" + pdf + b"\r\n--" + BOUNDARY + b"--\r\n")
+
+
+def _post(asgi_app, body: bytes, headers: list):
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = dict(message["headers"])
+        else:
+            response["body"] = json.loads(message["body"])
+
+    scope = {"type": "http", "path": "/api/process", "method": "POST", "query_string": b"", "headers": headers}
+    asyncio.run(asgi_app(scope, receive, send))
+    return response
+
+
+def test_process_echoes_origin(asgi_app):
+    pdf = make_pdf(["Jane Doe", "SKILLS", "Python, SQL", "EXPERIENCE",
+                    "Data Engineer, Acme Corp, Jan 2019 - Present"])
+    response = _post(asgi_app, _multipart(pdf),
+                     [(b"content-type", b"multipart/form-data; boundary=" + BOUNDARY), (b"origin", ORIGIN)])
+    assert response["status"] == 200
+    assert response["body"]["success"] is True
+    assert response["headers"][b"access-control-allow-origin"] == ORIGIN
+    assert response["headers"][b"vary"] == b"Origin"
+
+
+def test_errors_carry_cors_headers(asgi_app):
+    response = _post(asgi_app, b"x", [(b"content-type", b"text/plain"), (b"origin", ORIGIN)])
+    assert response["status"] == 400
+    assert response["headers"][b"access-control-allow-origin"] == ORIGIN
+
+
+def test_no_origin_allows_any(asgi_app):
+    response = _post(asgi_app, b"x", [(b"content-type", b"text/plain")])
+    assert response["headers"][b"access-control-allow-origin"] == b"*"
+    assert b"vary" not in response["headers"]
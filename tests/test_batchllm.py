@@ -0,0 +1,181 @@
+# test_batchllm.py
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+import batchllm
+from batchllm import BatchProvider, LocalBatchProvider, BatchError, complete_all, request_line, read_jsonl, write_jsonl
+from mockllm import MockChatClient
+from resumeparser import ats_extractor, ats_extractor_batch, PIPELINE_TWO_CALL, PIPELINE_COMBINED, PIPELINE_CHUNKED
+
+MESSAGES = [{"role": "system", "content": "You are an assessment generator. Return JSON."},
+            {"role": "user", "content": "Candidate: Jane Doe, Python, SQL"}]
+RESUMES = {
+    "jane": "Jane Doe\njane@example.com\nEXPERIENCE\nData Engineer, Acme Corp, Jan 2019 - Present\n- Python, SQL",
+    "john": "John Roe\njohn@example.com\nEXPERIENCE\nAnalyst, Beta Ltd, 2015 - 2018\n- Tableau, Excel",
+    "ana": "Ana Poe\nana@example.com\nEXPERIENCE\nDeveloper, Gamma, Mar 2020 - Present\n- Java, Kafka",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class ScriptedClient:
+    """MockChatClient that fails calls whose prompt contains a marker: {marker: [status, ...]} in order."""
+
+    def __init__(self, failures=None, latency=None):
+        self.mock = MockChatClient(latency=latency)
+        self.failures = {marker: list(codes) for marker, codes in (failures or {}).items()}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        with self._lock:
+            self.calls["total"] += 1
+            for marker, codes in self.failures.items():
+                if marker in prompt and codes:
+                    raise HTTPError(codes.pop(0))
+        return self.mock.chat.completions.create(**kwargs)
+
+
+def _wait_terminal(provider, batch_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = provider.status(batch_id)
+        if status["status"] in batchllm.TERMINAL_STATUSES:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"batch {batch_id} still {status['status']}")
+
+
+def _input_file(tmp_path, n, deployment="mock-deployment"):
+    path = str(tmp_path / "input.jsonl")
+    write_jsonl(path, [request_line(f"req-{i}", deployment, MESSAGES, 200) for i in range(n)])
+    return path
+
+
+def test_provider_must_implement_every_operation():
+    class Partial(BatchProvider):
+        def submit(self, input_path):
+            return "id"
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+# -------------------------
+# LocalBatchProvider
+# -------------------------
+def test_submit_status_download(tmp_path):
+    provider = LocalBatchProvider(ScriptedClient(), str(tmp_path / "provider"))
+    batch_id = provider.submit(_input_file(tmp_path, 5))
+    status = _wait_terminal(provider, batch_id)
+    assert (status["status"], status["total"], status["completed"], status["failed"]) == ("completed", 5, 5, 0)
+    provider.download(batch_id, str(tmp_path / "out.jsonl"))
+    records = read_jsonl(str(tmp_path / "out.jsonl"))
+    assert sorted(r["custom_id"] for r in records) == [f"req-{i}" for i in range(5)]
+    assert all(r["response"]["status_code"] == 200 for r in records)
+
+
+def test_finished_batch_is_known_after_restart(tmp_path):
+    work_dir = str(tmp_path / "provider")
+    provider = LocalBatchProvider(ScriptedClient(), work_dir)
+    batch_id = provider.submit(_input_file(tmp_path, 3))
+    _wait_terminal(provider, batch_id)
+    restarted = LocalBatchProvider(ScriptedClient(), work_dir)
+    assert restarted.status(batch_id)["status"] == "completed"
+    with pytest.raises(BatchError):
+        restarted.status("local-unknown")
+
+
+def test_cancel(tmp_path):
+    provider = LocalBatchProvider(ScriptedClient(latency="fixed:0.02"), str(tmp_path / "provider"), concurrency=1)
+    batch_id = provider.submit(_input_file(tmp_path, 50))
+    provider.cancel(batch_id)
+    status = _wait_terminal(provider, batch_id)
+    assert status["status"] == "cancelled"
+    provider.download(batch_id, str(tmp_path / "out.jsonl"))
+    assert len(read_jsonl(str(tmp_path / "out.jsonl"))) < 50
+
+
+def test_failed_lines_are_reported_per_line(tmp_path):
+    client = ScriptedClient({"Candidate": [400]})
+    provider = LocalBatchProvider(client, str(tmp_path / "provider"), concurrency=1)
+    batch_id = provider.submit(_input_file(tmp_path, 3))
+    status = _wait_terminal(provider, batch_id)
+    assert (status["status"], status["completed"], status["failed"]) == ("completed", 2, 1)
+
+
+# -------------------------
+# complete_all
+# -------------------------
+def _requests(n):
+    return {f"doc{i}": ([MESSAGES[0], {"role": "user", "content": f"Candidate {i}: Python"}], 200) for i in range(n)}
+
+
+def test_retryable_line_failures_are_resent(tmp_path):
+    client = ScriptedClient({"Candidate 1:": [429, 500], "Candidate 2:": [400]})
+    provider = LocalBatchProvider(client, str(tmp_path / "provider"))
+    results = complete_all(provider, _requests(3), "mock-deployment", str(tmp_path / "work"), max_retries=2,
+                           poll_seconds=0.01)
+    assert results["doc0"].error is None and results["doc0"].text
+    assert results["doc1"].error is None and results["doc1"].usage["batch_retries"] == 2
+    assert "HTTP 400" in results["doc2"].error
+
+
+def test_resume_after_restart_does_not_resubmit(tmp_path):
+    provider_dir, work_dir = str(tmp_path / "provider"), str(tmp_path / "work")
+    first_client = ScriptedClient()
+    first = complete_all(LocalBatchProvider(first_client, provider_dir), _requests(4), "mock-deployment", work_dir,
+                         poll_seconds=0.01)
+    # a new process: new provider object, same files on disk
+    second_client = ScriptedClient()
+    second = complete_all(LocalBatchProvider(second_client, provider_dir), _requests(4), "mock-deployment",
+                          work_dir, poll_seconds=0.01)
+    assert first_client.calls["total"] == 4 and second_client.calls["total"] == 0
+    assert {k: r.text for k, r in second.items()} == {k: r.text for k, r in first.items()}
+
+
+def test_stopped_run_resumes_the_submitted_batch(tmp_path):
+    client = ScriptedClient(latency="fixed:0.05")
+    provider = LocalBatchProvider(client, str(tmp_path / "provider"), concurrency=1)
+    stop = threading.Event()
+    stop.set()
+    with pytest.raises(BatchError):
+        complete_all(provider, _requests(4), "mock-deployment", str(tmp_path / "work"), poll_seconds=0.01,
+                     stop=stop)
+    results = complete_all(provider, _requests(4), "mock-deployment", str(tmp_path / "work"), poll_seconds=0.01)
+    assert all(r.error is None for r in results.values())
+    assert client.calls["total"] == 4
+
+
+# -------------------------
+# ats_extractor_batch
+# -------------------------
+@pytest.mark.parametrize("mode", [PIPELINE_TWO_CALL, PIPELINE_COMBINED, PIPELINE_CHUNKED])
+def test_batch_matches_interactive(tmp_path, mode):
+    provider = LocalBatchProvider(MockChatClient(), str(tmp_path / "provider"))
+    batch = ats_extractor_batch(RESUMES, provider=provider, work_dir=str(tmp_path / "work"), pipeline_mode=mode,
+                                refresh_assessment=True)
+    for doc_id, text in RESUMES.items():
+        interactive = ats_extractor(text, pipeline_mode=mode, refresh_assessment=True)
+        result = batch[doc_id]
+        assert result.pop("metadata")["batch"] == "local"
+        interactive.pop("metadata")
+        assert result == interactive
+
+
+def test_batch_line_failure_only_fails_its_document(tmp_path):
+    client = ScriptedClient({"John Roe": [400]})
+    provider = LocalBatchProvider(client, str(tmp_path / "provider"))
+    results = ats_extractor_batch(RESUMES, provider=provider, work_dir=str(tmp_path / "work"))
+    assert "HTTP 400" in results["john"]["error"]
+    assert results["jane"]["full_name"] and results["ana"]["assessment"]
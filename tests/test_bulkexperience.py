@@ -0,0 +1,82 @@
+# test_bulkexperience.py
+import random
+from datetime import date
+
+import pytest
+
+from bulkexperience import bulk_experience_analysis, bulk_from_results
+from resumeparser import compute_experience_analysis
+
+TODAY = date(2024, 6, 15)
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+UNPARSEABLE = ["", "sometime", "N/A", "TBD", "??"]
+
+
+def _fmt(rng, year, month):
+    return rng.choice([f"{MONTHS[month - 1]} {year}", f"{month:02d}/{year}", str(year), f"{year}-{month:02d}"])
+
+
+def _job(rng):
+    year, month = rng.randint(2005, 2023), rng.randint(1, 12)
+    start = _fmt(rng, year, month)
+    roll = rng.random()
+    if roll < 0.2:
+        end = rng.choice(["Present", "current", "Now"])
+    elif roll < 0.3:
+        end = rng.choice(UNPARSEABLE)
+    elif roll < 0.35:
+        # ends before it starts: counted per job (0 months) but not in the merge
+        end = _fmt(rng, year - 1, month)
+    else:
+        end_year = min(year + rng.randint(0, 4), 2024)
+        end = _fmt(rng, end_year, rng.randint(1, 12))
+    if rng.random() < 0.1:
+        start = rng.choice(UNPARSEABLE)
+    job = {"company": f"Co {rng.randint(1, 99)}", "job_title": "Engineer"}
+    if rng.random() < 0.2:
+        # whole range in start_date, as the model sometimes returns it
+        job["start_date"] = f"{start} - {end}"
+    else:
+        job.update(start_date=start, end_date=end)
+    return job
+
+
+def _employment_lists(seed, n=300):
+    rng = random.Random(seed)
+    lists = [[_job(rng) for _ in range(rng.randint(0, 6))] for _ in range(n)]
+    lists[0] = []
+    lists[1] = None
+    return lists
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_bulk_matches_scalar(seed):
+    lists = _employment_lists(seed)
+    bulk = bulk_experience_analysis(lists, today=TODAY)
+    assert bulk == [compute_experience_analysis(jobs, today=TODAY) for jobs in lists]
+
+
+def test_gaps_and_overlaps():
+    jobs = [
+        {"company": "A", "start_date": "Jan 2015", "end_date": "Dec 2016"},
+        {"company": "B", "start_date": "Jun 2016", "end_date": "Jun 2017"},  # overlaps A
+        {"company": "C", "start_date": "Jan 2019", "end_date": "Present"},   # after a gap
+        {"company": "D", "start_date": "whenever", "end_date": "Mar 2020"},  # unparseable: not merged
+    ]
+    other = [{"company": "E", "start_date": "2010", "end_date": "2011"}]
+    first, second = bulk_experience_analysis([jobs, other], with_gaps=True, today=TODAY)
+
+    scalar = compute_experience_analysis(jobs, today=TODAY)
+    assert {k: first[k] for k in scalar} == scalar
+    assert first["job_blocks"] == 2
+    assert first["gap_days"] == (date(2019, 1, 1) - date(2017, 6, 1)).days
+    assert first["overlap_days"] == (date(2016, 12, 1) - date(2016, 6, 1)).days
+    # the other candidate's dates never leak into this one's merge
+    assert second["job_blocks"] == 1 and second["gap_days"] == 0 and second["overlap_days"] == 0
+
+
+def test_bulk_from_results():
+    lists = _employment_lists(4, n=20)
+    results = [{"employment_details": jobs} for jobs in lists] + [None, {}]
+    bulk = bulk_from_results(results, today=TODAY)
+    assert bulk == [compute_experience_analysis(jobs, today=TODAY) for jobs in lists + [[], []]]
@@ -0,0 +1,96 @@
+# test_clientpool.py
+import threading
+
+from clientpool import ClientRegistry
+
+
+class FakeClient:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_reuses_client_per_key():
+    registry = ClientRegistry(FakeClient)
+    with registry.lease("a", "a") as first:
+        pass
+    with registry.lease("a", "a") as again, registry.lease("b", "b") as other:
+        assert again is first
+        assert other is not first
+    assert registry.stats()["created"] == 2
+    assert registry.stats()["reused"] == 1
+
+
+def test_least_recently_used_is_evicted_and_closed():
+    registry = ClientRegistry(FakeClient, max_size=2)
+    clients = {}
+    for key in ("a", "b", "a", "c"):  # "a" was used after "b", so "b" goes
+        with registry.lease(key, key) as client:
+            clients[key] = client
+    assert clients["b"].closed
+    assert not clients["a"].closed and not clients["c"].closed
+    assert registry.stats()["size"] == 2 and registry.stats()["evicted"] == 1
+
+
+def test_retired_client_closed_on_last_release():
+    registry = ClientRegistry(FakeClient, max_size=1)
+    client, entry = registry.acquire("a", "a")
+    with registry.lease("b", "b"):  # evicts "a" while it is still leased
+        assert not client.closed
+    registry.release(entry)
+    assert client.closed
+
+
+def test_max_size_at_least_one():
+    registry = ClientRegistry(FakeClient, max_size=0)
+    with registry.lease("a", "a") as client:
+        assert not client.closed
+    with registry.lease("a", "a") as again:
+        assert again is client
+
+
+def test_factory_runs_outside_the_lock():
+    # two keys built concurrently: the slow one must not block the other
+    slow_started, release_slow = threading.Event(), threading.Event()
+
+    def factory(name):
+        if name == "slow":
+            slow_started.set()
+            release_slow.wait(5)
+        return FakeClient(name)
+
+    registry = ClientRegistry(factory)
+    worker = threading.Thread(target=registry.acquire, args=("slow", "slow"))
+    worker.start()
+    assert slow_started.wait(5)
+    with registry.lease("fast", "fast") as fast:
+        assert fast.name == "fast"
+    release_slow.set()
+    worker.join(5)
+
+
+def test_losing_race_discards_the_extra_client():
+    built = []
+    registry = ClientRegistry(lambda: built.append(FakeClient(len(built))) or built[-1])
+    gate = threading.Barrier(2)
+    original = registry.factory
+
+    def factory():
+        client = original()
+        gate.wait(5)  # both threads have built a client before either registers it
+        return client
+
+    registry.factory = factory
+    leased = []
+    threads = [threading.Thread(target=lambda: leased.append(registry.acquire("k")[0])) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert len(built) == 2
+    assert leased[0] is leased[1]
+    assert [c.closed for c in built].count(True) == 1
+    assert registry.stats()["created"] == 1 and registry.stats()["size"] == 1
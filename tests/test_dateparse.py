@@ -0,0 +1,44 @@
+# test_dateparse.py
+from datetime import date
+
+import pytest
+
+from dateparse import parse_date
+from resumeparser import job_date_range_raw
+
+TODAY = date(2024, 6, 15)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Jan 2022", date(2022, 1, 1)),
+    ("March 15, 2019", date(2019, 3, 1)),
+    ("Mar'19", date(2019, 3, 1)),
+    ("03/2019", date(2019, 3, 1)),
+    ("2019-03", date(2019, 3, 1)),
+    ("2019-03-15", date(2019, 3, 1)),
+    ("Q2 2021", date(2021, 4, 1)),
+    ("Summer 2018", date(2018, 6, 1)),
+    ("2019", date(2019, 1, 1)),
+    ("Present", TODAY),
+    ("n/a", None),
+])
+def test_grammar(raw, expected):
+    assert parse_date(raw, TODAY) == expected
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    ("2019-03", "", ("2019-03", "")),
+    ("2019-03-15", None, ("2019-03-15", "")),
+    ("Jan 2020 - Mar 2022", "", ("Jan 2020", "Mar 2022")),
+    ("Jan 2020 -Mar 2022", "", ("Jan 2020", "Mar 2022")),
+    ("Jan 2020- Mar 2022", "", ("Jan 2020", "Mar 2022")),
+    ("Jan 2020 -Present", "", ("Jan 2020", "Present")),
+    ("2019–2021", "", ("2019", "2021")),
+    ("2019-2021", "", ("2019", "2021")),
+    ("2019-Present", "", ("2019", "Present")),
+    ("03/2019-05/2021", "", ("03/2019", "05/2021")),
+    ("2019-03 - 2021-05", "", ("2019-03", "2021-05")),
+    ("Jan 2020 - Mar 2022", "Dec 2023", ("Jan 2020 - Mar 2022", "Dec 2023")),
+])
+def test_job_date_range_raw(start, end, expected):
+    assert job_date_range_raw({"start_date": start, "end_date": end}) == expected
@@ -0,0 +1,95 @@
+# test_jobqueue.py
+import time
+import sqlite3
+
+from jobqueue import JobQueue, DONE, FAILED, RUNNING
+
+
+def _wait_final(jobs, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = jobs.status(job_id)
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+def test_job_done(tmp_path):
+    jobs = JobQueue(str(tmp_path / "jobs.db"), lambda pdf, key: {"size": len(pdf)}, workers=1)
+    jobs.start()
+    job_id = jobs.submit(b"%PDF-1.4")
+    assert _wait_final(jobs, job_id)["status"] == DONE
+    assert jobs.result(job_id) == {"size": 8}
+
+
+def test_unstorable_result_marks_job_failed(tmp_path):
+    # json.dumps fails after the handler returned: the job must not stay RUNNING
+    jobs = JobQueue(str(tmp_path / "jobs.db"), lambda pdf, key: {"when": object()}, workers=1)
+    jobs.start()
+    job_id = jobs.submit(b"%PDF-1.4")
+    job = _wait_final(jobs, job_id)
+    assert job["status"] == FAILED
+    assert "TypeError" in job["error"]
+    assert jobs.result(job_id) is None
+
+
+def _insert_running(jobs, job_id, owner, lease_until):
+    jobs._execute(
+        "INSERT INTO jobs (id, status, pdf, created_at, started_at, owner, lease_until) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (job_id, RUNNING, b"%PDF", time.time(), time.time(), owner, lease_until),
+    )
+
+
+def test_start_reclaims_only_expired_leases(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    seed = JobQueue(db, lambda pdf, key: {}, workers=1)
+    _insert_running(seed, "live", "other-host:1:abcd", time.time() + 60)
+    _insert_running(seed, "dead", "other-host:2:abcd", time.time() - 1)
+
+    jobs = JobQueue(db, lambda pdf, key: {"size": len(pdf)}, workers=1)
+    jobs.start()
+    assert _wait_final(jobs, "dead")["status"] == DONE
+    # still owned by a live process: left alone
+    assert jobs.status("live")["status"] == RUNNING
+
+
+def test_heartbeat_keeps_long_job_claimed(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    runs = []
+
+    def slow(pdf, key):
+        runs.append(pdf)
+        time.sleep(0.5)
+        return {}
+
+    first = JobQueue(db, slow, workers=1, lease_seconds=0.15)
+    first.start()
+    job_id = first.submit(b"%PDF-1.4")
+    time.sleep(0.3)
+    # a second process starting up well past the initial lease must not take the job over
+    second = JobQueue(db, slow, workers=1, lease_seconds=0.15)
+    second.start()
+    assert _wait_final(first, job_id)["status"] == DONE
+    assert len(runs) == 1
+
+
+def test_dead_owner_job_requeued_by_heartbeat(tmp_path):
+    jobs = JobQueue(str(tmp_path / "jobs.db"), lambda pdf, key: {}, workers=1, lease_seconds=0.1)
+    jobs.start()
+    _insert_running(jobs, "orphan", "other-host:3:abcd", time.time() + 0.05)
+    assert _wait_final(jobs, "orphan")["status"] == DONE
+
+
+def test_opens_database_without_lease_columns(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, filename TEXT, pdf BLOB, "
+                 "result TEXT, error TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, "
+                 "started_at REAL, finished_at REAL)")
+    conn.execute("INSERT INTO jobs (id, status, pdf, created_at) VALUES ('old', 'running', x'00', 0)")
+    conn.commit()
+    conn.close()
+    jobs = JobQueue(db, lambda pdf, key: {}, workers=1)
+    jobs.start()
+    assert _wait_final(jobs, "old")["status"] == DONE
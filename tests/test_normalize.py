@@ -0,0 +1,48 @@
+# test_normalize.py
+from normalize import normalize_text, PAGE_BREAK
+from pdftext import PdfText
+
+JOB = "Software Engineer\nAcme Corp, 2019 - 2021\nResponsibilities:\n- Built ETL pipelines"
+
+
+def test_two_page_cv_keeps_repeated_job_title():
+    page1 = "Jane Doe\njane@example.com\nEXPERIENCE\n" + JOB + "\nSome other work"
+    page2 = "More work\n" + JOB.replace("Acme Corp, 2019 - 2021", "Beta Ltd, 2021 - 2023") + "\nEDUCATION\nBSc"
+    out = normalize_text(page1 + "\f" + page2)
+    page2_out = out.split("More work", 1)[1]
+    assert "Software Engineer" in page2_out
+    assert "Responsibilities:" in page2_out
+    assert "- Built ETL pipelines" in page2_out
+
+
+def test_running_header_and_page_numbers_removed_from_later_pages():
+    header = "Jane Doe - Curriculum Vitae"
+    bodies = ["EXPERIENCE\nAcme Corp\nBuilt ETL pipelines\nLed a team of four\nPython, SQL",
+              "Beta Ltd\nShipped the billing service\nCut costs by a third\nGo, Kafka\nMentored juniors",
+              "EDUCATION\nBSc Computer Science\nState University\nGraduated with honours\nChess club"]
+    pages = [f"{header}\n{body}\nPage {n} of 3" for n, body in enumerate(bodies, 1)]
+    out = normalize_text("\f".join(pages))
+    assert out.count(header) == 1
+    assert "Page" not in out
+    assert all(body in out for body in bodies)
+
+
+def test_repeated_body_lines_kept_on_long_cv():
+    body = "Intro\nmore\nstuff\n- Built ETL pipelines\nmiddle\nend\nlast\nfinal"
+    out = normalize_text("\f".join([body] * 4))
+    assert out.count("- Built ETL pipelines") == 4
+
+
+def test_page_breaks_only_in_text_for_normalization():
+    header = "Jane Doe - Curriculum Vitae"
+    bodies = ["EXPERIENCE\nAcme Corp\nBuilt ETL pipelines\nLed a team\nPython",
+              "Beta Ltd\nShipped billing\nCut costs\nGo, Kafka\nMentoring",
+              "EDUCATION\nBSc\nState University\nHonours\nChess"]
+    pdf = PdfText([f"{header}\n{body}" for body in bodies] + [None], [0.0] * 4)
+    # what the model gets with normalization off: the plain layout, no form feeds
+    assert pdf.text == "".join(f"{header}\n{body}\n" for body in bodies)
+    assert pdf.joined() == pdf.text
+    paged = pdf.joined(page_breaks=True)
+    assert paged.count(PAGE_BREAK) == 2
+    assert paged.replace(PAGE_BREAK, "") == pdf.text
+    assert normalize_text(paged).count(header) == 1
@@ -0,0 +1,35 @@
+# test_pipeline.py
+import asyncio
+
+import pytest
+
+from resumeparser import (ats_extractor, ats_extractor_async, PIPELINE_TWO_CALL, PIPELINE_COMBINED,
+                          PIPELINE_CHUNKED)
+
+RESUME = """Jane Doe
+jane.doe@example.com
+SKILLS
+Python, SQL, Spark, Airflow
+EXPERIENCE
+Data Engineer, Acme Corp, Jan 2019 - Present
+- Built ETL pipelines in Python and Spark
+Analyst, Beta Ltd, Mar 2015 - Dec 2018
+- Reporting in SQL and Tableau
+EDUCATION
+BSc Computer Science, State University, 2014
+"""
+
+
+def _comparable(result):
+    metadata = result.pop("metadata")
+    return result, sorted(metadata), sorted(metadata["timings_ms"])
+
+
+@pytest.mark.parametrize("mode", [PIPELINE_TWO_CALL, PIPELINE_COMBINED, PIPELINE_CHUNKED])
+@pytest.mark.parametrize("preextract", [False, True])
+def test_async_matches_sync(mode, preextract):
+    options = dict(pipeline_mode=mode, preextract=preextract, refresh_assessment=True)
+    sync = ats_extractor(RESUME, **options)
+    async_ = asyncio.run(ats_extractor_async(RESUME, **options))
+    assert "error" not in sync
+    assert _comparable(async_) == _comparable(sync)
@@ -0,0 +1,44 @@
+# test_preextract.py
+from preextract import preextract
+from resumeparser import prepare_llm_input, ats_extractor, PIPELINE_TWO_CALL
+
+RESUME = """Jane Doe
+jane.doe@example.com | +44 20 7946 0958
+EXPERIENCE
+Data Engineer, Acme Corp, Jan 2019 - Present
+- Built ETL pipelines in Python
+"""
+
+
+def test_fields_are_schema_fields_only():
+    pre = preextract(RESUME)
+    assert set(pre["fields"]) == {"email", "linkedin", "github"}
+    assert pre["fields"]["email"] == "jane.doe@example.com"
+    # the phone number isn't a schema field, but it is still kept out of the prompt
+    assert "7946" not in pre["text"]
+
+
+def test_only_found_fields_are_omitted_from_the_prompt():
+    metadata = {}
+    _, omit_fields, pre = prepare_llm_input(RESUME, PIPELINE_TWO_CALL, True, True, None, metadata)
+    assert omit_fields == ("email",)
+    assert metadata["preextract"]["fields_not_requested"] == ["email"]
+
+
+def test_result_shape_unchanged_with_preextract():
+    with_pre = ats_extractor(RESUME, preextract=True)
+    without = ats_extractor(RESUME, preextract=False)
+    assert "phone" not in with_pre
+    assert with_pre["email"] == "jane.doe@example.com"
+    assert set(with_pre) == set(without)
+
+
+def test_output_tokens_saved_covers_omitted_fields():
+    metadata = {}
+    prepare_llm_input(RESUME, PIPELINE_TWO_CALL, True, True, None, metadata)
+    assert metadata["preextract"]["output_tokens_saved"] > 0
+
+    metadata = {}
+    prepare_llm_input("Jane Doe\nEXPERIENCE\nAnalyst", PIPELINE_TWO_CALL, True, True, None, metadata)
+    assert metadata["preextract"]["fields_not_requested"] == []
+    assert metadata["preextract"]["output_tokens_saved"] == 0
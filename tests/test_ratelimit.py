@@ -0,0 +1,77 @@
+# test_ratelimit.py
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import resumeparser
+from conftest import TEST_SETTINGS
+from mockllm import MockChatClient, quota_for
+from normalize import count_tokens
+from ratelimit import RateLimiter
+
+MAX_TOKENS = 200
+MESSAGES = [{"role": "system", "content": "You are a JSON-only extraction engine. {\"full_name\": \"\"}"},
+            {"role": "user", "content": "Resume Text:\n```\nJane Doe\nPython, SQL\n```"}]
+ESTIMATE = sum(count_tokens(m["content"]) for m in MESSAGES) + MAX_TOKENS
+
+
+def _run_against_quota(limiter, rpm, calls=10, window=0.5):
+    """Send `calls` completions through `limiter` at a mock deployment that enforces `rpm` per `window`."""
+    model = f"quota-{uuid.uuid4().hex}"
+    client = MockChatClient(rpm=rpm, quota_window_seconds=window)
+
+    def send():
+        raw = client.chat.completions.with_raw_response.create(model=model, messages=MESSAGES,
+                                                              max_tokens=MAX_TOKENS)
+        return raw.parse(), raw.headers
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: limiter.call(send, ESTIMATE), range(calls)))
+    return results, quota_for(model, rpm, 0, window)
+
+
+@pytest.mark.parametrize("configured", [True, False])
+def test_every_call_completes_under_an_enforced_quota(configured):
+    window = 0.5
+    limiter = RateLimiter(rpm=4 if configured else 0, max_retries=10, backoff_base=0.05, backoff_max=window,
+                          window_seconds=window)
+    results, quota = _run_against_quota(limiter, rpm=4, window=window)
+    assert len(results) == 10 and all(r.choices[0].message.content for r in results)
+    assert quota.admitted == 10
+    # unconfigured, the quota is learned from the x-ratelimit-* headers
+    assert limiter.stats()["rpm_limit"] == 4
+    assert limiter.stats()["throttled_429"] == quota.rejected
+
+
+def test_limiters_are_per_endpoint_and_deployment():
+    a = SimpleNamespace(base_url="https://one.openai.azure.com/openai/")
+    b = SimpleNamespace(base_url="https://two.openai.azure.com/openai/")
+    assert resumeparser._limiter(a, "gpt-4o") is resumeparser._limiter(a, "gpt-4o")
+    assert resumeparser._limiter(a, "gpt-4o") is not resumeparser._limiter(b, "gpt-4o")
+    assert resumeparser._limiter(a, "gpt-4o") is not resumeparser._limiter(a, "gpt-4o-mini")
+
+
+def test_streamed_completion_settles_actual_usage():
+    resumeparser.configure(dict(TEST_SETTINGS, AZURE_TPM_LIMIT=100000, RATE_LIMIT_WINDOW_SECONDS=3600))
+    client, deployment, usage = MockChatClient(), f"stream-{uuid.uuid4().hex}", {}
+    chunks = resumeparser._chat_completion(client, deployment, MESSAGES, MAX_TOKENS, usage, stream=True)
+    text = "".join(resumeparser._stream_deltas(chunks, usage))
+    assert text and usage["total_tokens"] < ESTIMATE
+    limiter = resumeparser._limiter(client, deployment)
+    assert limiter.tokens.level == pytest.approx(100000 - usage["total_tokens"], abs=5)
+
+
+def test_stream_without_usage_keeps_the_estimate():
+    limiter = RateLimiter(tpm=10000, window_seconds=3600)
+    limiter.acquire(ESTIMATE)
+    chunks = [SimpleNamespace(choices=[], usage=None)] * 3
+    assert len(list(limiter.settled_stream(chunks, ESTIMATE))) == 3
+    assert limiter.tokens.level == pytest.approx(10000 - ESTIMATE, abs=5)
+
+
+def test_limiter_gauges_are_labelled_by_endpoint_and_deployment(client):
+    resumeparser._limiter(SimpleNamespace(base_url="https://one.openai.azure.com/openai/"), "gpt-4o")
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'cv_llm_retries{endpoint="https://one.openai.azure.com/openai/",deployment="gpt-4o"} 0' in body
@@ -0,0 +1,51 @@
+# test_resultcache.py
+import os
+
+import pytest
+
+import resultcache
+from resultcache import DiskCache, make_cache_key
+
+
+def _files(directory):
+    return sorted(name for _root, _dirs, files in os.walk(directory) for name in files)
+
+
+def test_round_trip(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    key = make_cache_key(b"%PDF", "gpt-4o", "v1")
+    cache.set(key, {"full_name": "Jane"})
+    assert cache.get(key) == {"full_name": "Jane"}
+    assert cache.delete(key)
+    assert cache.get(key) is None
+
+
+@pytest.mark.parametrize("key", ["../../etc/passwd", "..", "", "ABC", "a" * 63, "g" * 64])
+def test_rejects_keys_that_are_not_hex_digests(tmp_path, key):
+    cache = DiskCache(str(tmp_path))
+    assert cache.get(key) is None
+    assert cache.delete(key) is False
+    with pytest.raises(ValueError):
+        cache.set(key, {})
+    assert _files(tmp_path) == []
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path))
+    key = make_cache_key(b"%PDF", None, "v1")
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(resultcache.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        cache.set(key, {"full_name": "Jane"})
+    with pytest.raises(TypeError):
+        cache.set(key, {"not_json": object()})
+    assert _files(tmp_path) == []
+
+
+def test_invalidate_route_rejects_bad_keys(client):
+    assert client.delete("/api/cache/not-a-key").status_code == 400
+    resp = client.delete("/api/cache/" + "0" * 64)
+    assert resp.status_code == 200 and resp.get_json()["removed"] is False
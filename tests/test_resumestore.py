@@ -0,0 +1,170 @@
+# test_resumestore.py
+import random
+import sqlite3
+import itertools
+
+import pytest
+
+import resumestore
+from resumestore import ResumeStore
+
+SKILLS = ["Python", "SQL", "Spark", "Airflow", "Docker", "Kubernetes", "Java", "Go"]
+CATEGORIES = ["languages", "data", "devops"]
+EMPLOYERS = ["Acme Corp", "Beta Ltd", "Gamma Analytics", "Acme Labs"]
+TITLES = ["Senior Data Engineer", "Data Engineer", "Data Analyst", "Backend Developer"]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # distinct updated_at per write, so "newest first" never ties
+    ticks = itertools.count(1_700_000_000)
+    monkeypatch.setattr(resumestore.time, "time", lambda: float(next(ticks)))
+
+
+def _result(rng, i):
+    technical = {}
+    for skill in rng.sample(SKILLS, rng.randint(0, 4)):
+        technical.setdefault(rng.choice(CATEGORIES), []).append(skill)
+    jobs = [{"company": rng.choice(EMPLOYERS), "job_title": rng.choice(TITLES)} for _ in range(rng.randint(0, 3))]
+    return {
+        "full_name": f"Candidate {i}",
+        "email": f"c{i}@example.com",
+        "technical_skills": technical,
+        "employment_details": jobs,
+        "experience_analysis": {"total_years_approx": rng.choice([None, rng.randint(0, 20)])},
+        "assessment": {"overall_score": rng.choice([None, rng.randint(0, 100)])},
+    }
+
+
+def _fill(store, n=120, seed=7):
+    rng = random.Random(seed)
+    for i in range(n):
+        store.upsert(f"doc{i}", _result(rng, i))
+
+
+def _sql_oracle(db_path, skills=(), category=None, employer=None, title=None, min_years=None, max_score=None,
+                sort="recent", limit=50, offset=0):
+    """The same query written directly against the tables: (total, doc hashes of the page)."""
+    where, params = [], []
+    for skill in skills:
+        clause = "EXISTS (SELECT 1 FROM profile_skills x JOIN skills s ON s.id = x.skill_id " \
+                 "WHERE x.profile_id = p.id AND s.name = ?"
+        params.append(skill.lower())
+        if category:
+            clause += " AND s.category = ?"
+            params.append(category)
+        where.append(clause + ")")
+    if category and not skills:
+        where.append("EXISTS (SELECT 1 FROM profile_skills x JOIN skills s ON s.id = x.skill_id "
+                     "WHERE x.profile_id = p.id AND s.category = ?)")
+        params.append(category)
+    for field, value in (("employer", employer), ("title", title)):
+        if value:
+            where.append("EXISTS (SELECT 1 FROM profile_terms x JOIN terms t ON t.id = x.term_id "
+                         "WHERE x.profile_id = p.id AND t.field = ? AND substr(t.phrase, 1, length(?)) = ?)")
+            params += [field, value.lower(), value.lower()]
+    if min_years is not None:
+        where.append("p.total_years >= ?")
+        params.append(min_years)
+    if max_score is not None:
+        where.append("p.overall_score <= ?")
+        params.append(max_score)
+    column = {"score": "p.overall_score", "years": "p.total_years"}.get(sort)
+    order = f"{column} IS NULL, {column} DESC, " if column else ""
+    sql = f"SELECT p.doc_hash FROM profiles p {'WHERE ' + ' AND '.join(where) if where else ''} " \
+          f"ORDER BY {order}p.updated_at DESC"
+    conn = sqlite3.connect(db_path)
+    try:
+        hashes = [row[0] for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+    return len(hashes), hashes[offset:offset + limit]
+
+
+QUERIES = [
+    {},
+    {"skills": ["python"]},
+    {"skills": ["Python", "sql"]},
+    {"skills": ["spark"], "category": "data"},
+    {"category": "devops"},
+    {"employer": "acme"},
+    {"title": "data eng", "min_years": 5},
+    {"title": "engineer", "sort": "score", "limit": 7, "offset": 3},
+    {"max_score": 60, "sort": "years", "limit": 10, "offset": 10},
+    {"skills": ["go"], "sort": "score", "limit": 5, "offset": 500},
+]
+
+
+@pytest.mark.parametrize("filters", QUERIES)
+def test_query_matches_sql(tmp_path, clock, filters):
+    db = str(tmp_path / "profiles.db")
+    store = ResumeStore(db)
+    _fill(store)
+    got = store.query(**filters)
+    total, page = _sql_oracle(db, **filters)
+    assert got["total"] == total
+    assert [p["profile_id"] for p in got["profiles"]] == page
+
+
+def test_upsert_and_delete_keep_index_in_step(tmp_path, clock):
+    store = ResumeStore(str(tmp_path / "profiles.db"))
+    store.upsert("a", {"technical_skills": {"languages": ["Python"]}})
+    store.upsert("b", {"technical_skills": {"languages": ["Python"]}})
+    assert store.query(skills=["python"])["total"] == 2  # index built here
+
+    # re-upload with different skills: the old posting must stop matching
+    store.upsert("a", {"technical_skills": {"languages": ["Java"]}})
+    assert [p["profile_id"] for p in store.query(skills=["python"])["profiles"]] == ["b"]
+    assert [p["profile_id"] for p in store.query(skills=["java"])["profiles"]] == ["a"]
+
+    assert store.delete("b") is True
+    assert store.delete("b") is False
+    assert store.query(skills=["python"])["total"] == 0
+    assert store.query()["total"] == store.count() == 1
+
+
+def test_second_store_sees_first_stores_writes(tmp_path, clock):
+    db = str(tmp_path / "profiles.db")
+    writer, reader = ResumeStore(db), ResumeStore(db)
+    writer.upsert("a", {"technical_skills": {"data": ["Spark"]}})
+    assert reader.query(skills=["spark"])["total"] == 1
+
+    writer.upsert("b", {"technical_skills": {"data": ["Spark"]}})
+    writer.upsert("a", {"technical_skills": {"data": ["Airflow"]}})
+    assert [p["profile_id"] for p in reader.query(skills=["spark"])["profiles"]] == ["b"]
+    assert [p["profile_id"] for p in reader.query(skills=["airflow"])["profiles"]] == ["a"]
+
+    writer.delete("b")
+    assert reader.query(skills=["spark"])["total"] == 0
+    assert reader.query()["total"] == 1
+
+
+class _FailOnProfileDelete:
+    """Connection wrapper whose DELETE FROM profiles fails, as a locked or full database would."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, sql, *args):
+        if sql.startswith("DELETE FROM profiles"):
+            raise sqlite3.OperationalError("disk I/O error")
+        return self._conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_failed_delete_rolls_back(tmp_path, clock):
+    store = ResumeStore(str(tmp_path / "profiles.db"))
+    store.upsert("a", {"technical_skills": {"languages": ["Python"]}})
+    real = store._conn
+    store._conn = _FailOnProfileDelete(real)
+    with pytest.raises(sqlite3.OperationalError):
+        store.delete("a")
+    store._conn = real
+
+    # nothing half-deleted, and the connection is usable (no transaction left open)
+    assert store.get("a") is not None
+    assert store.query(skills=["python"])["total"] == 1
+    store.upsert("b", {})
+    assert store.count() == 2
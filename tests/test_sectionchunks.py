@@ -0,0 +1,86 @@
+# test_sectionchunks.py
+from sectionchunks import chunk_resume, merge_chunk_profiles, merge_employment, PROFILE_FIELDS, EXPERIENCE_FIELDS
+
+MONTHS = ["Jan", "Mar", "May", "Jul", "Sep", "Nov"]
+
+
+def _job(i):
+    year = 2000 + i
+    return [
+        f"Engineer {i}, Company {i}",
+        f"{MONTHS[i % 6]} {year} - {MONTHS[(i + 1) % 6]} {year + 1}",
+    ] + [f"- Delivered project {i}.{k} with Python, SQL and a fairly long description of the work" for k in range(4)]
+
+
+def _resume(n_jobs=12):
+    jobs = [_job(i) for i in range(n_jobs)]
+    lines = ["Jane Doe", "jane@example.com", "SUMMARY", "Data engineer.", "EXPERIENCE"]
+    lines += [line for job in jobs for line in job]
+    lines += ["SKILLS", "Python, SQL", "EDUCATION", "BSc, State University, 1999", "REFERENCES", "On request"]
+    return "\n".join(lines), jobs
+
+
+def test_chunks_never_split_a_job():
+    text, jobs = _resume()
+    chunks = chunk_resume(text, max_tokens=120)
+    experience = [c for c in chunks if c.kind == "experience"]
+    assert len(experience) > 2  # small budget: the section really is cut
+    for job in jobs:
+        block = "\n".join(job)
+        assert sum(block in c.text for c in experience) == 1, job[0]
+    # every experience line lands in exactly one chunk, in document order
+    lines = [line for c in experience for line in c.text.splitlines() if line != "EXPERIENCE"]
+    assert lines == [line for job in jobs for line in job]
+    assert all(c.fields == EXPERIENCE_FIELDS for c in experience)
+    assert not any("On request" in c.text for c in chunks)
+
+
+def test_profile_chunk_first_and_no_chunks_without_experience():
+    text, _ = _resume(2)
+    chunks = chunk_resume(text)
+    assert [c.kind for c in chunks] == ["profile", "experience"]
+    assert chunks[0].fields == PROFILE_FIELDS and "jane@example.com" in chunks[0].text
+    assert chunk_resume("Jane Doe\nSKILLS\nPython") == []
+
+
+def test_job_repeated_across_chunks_is_merged():
+    first = [
+        {"company": "Acme", "job_title": "Data Engineer", "start_date": "Jan 2019", "end_date": "Present",
+         "responsibilities": ["Built ETL", "Ran Spark"]},
+        {"company": "Beta", "job_title": "Analyst", "start_date": "Mar 2015", "responsibilities": ["SQL"]},
+    ]
+    second = [
+        # the same job's tail, cut into the next chunk: once with the same start, once with no dates at all
+        {"company": "ACME", "job_title": "data engineer", "start_date": "Jan 2019",
+         "responsibilities": ["Ran  Spark", "Mentored juniors"]},
+        {"company": "Beta", "job_title": "Analyst", "responsibilities": ["Dashboards"], "location": "Leeds"},
+        # same employer and title, different start: a second stint, kept separately
+        {"company": "Acme", "job_title": "Data Engineer", "start_date": "Jun 2012", "end_date": "Dec 2013"},
+    ]
+    merged = merge_employment([first, second])
+    assert [(j["company"], j["start_date"]) for j in merged] == [("Acme", "Jan 2019"), ("Beta", "Mar 2015"),
+                                                                 ("Acme", "Jun 2012")]
+    assert merged[0]["responsibilities"] == ["Built ETL", "Ran Spark", "Mentored juniors"]
+    assert merged[0]["end_date"] == "Present"
+    assert merged[1]["responsibilities"] == ["SQL", "Dashboards"]
+    assert merged[1]["location"] == "Leeds"
+    # inputs are not modified
+    assert first[0]["responsibilities"] == ["Built ETL", "Ran Spark"]
+
+
+def test_merge_chunk_profiles():
+    text, _ = _resume(12)
+    chunks = chunk_resume(text, max_tokens=120)
+    job = {"company": "Company 3", "job_title": "Engineer 3", "start_date": "Jul 2003", "responsibilities": ["a"]}
+    profiles = [None] * len(chunks)
+    profiles[0] = {"full_name": "Jane Doe", "email": "jane@example.com", "technical_skills": {"languages": ["Python"]},
+                   "employment_details": [{"company": "ignored"}]}
+    profiles[1] = {"full_name": "Someone Else", "employment_details": [job],
+                   "technical_skills": {"languages": ["python", "SQL"], "tools": ["Airflow"]}}
+    profiles[2] = {"employment_details": [dict(job, responsibilities=["b"])]}
+
+    merged = merge_chunk_profiles(chunks, profiles)
+    # fields outside a chunk's own list are ignored, so the experience chunk can't rename the candidate
+    assert merged["full_name"] == "Jane Doe"
+    assert merged["technical_skills"] == {"languages": ["Python", "SQL"], "tools": ["Airflow"]}
+    assert merged["employment_details"] == [dict(job, responsibilities=["a", "b"])]
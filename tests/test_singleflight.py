@@ -0,0 +1,64 @@
+# test_singleflight.py
+import time
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import SingleFlight, AsyncSingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def work():
+        runs.append(1)
+        release.wait(5)
+        return {"skills": ["python"]}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+    time.sleep(0.2)  # let the other callers join the run
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(runs) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 4
+    # followers get copies: editing one result leaves the others alone
+    results[0][0]["skills"].append("sql")
+    assert sum(r["skills"] == ["python"] for r, _ in results) == 4
+    assert flight.in_flight() == 0
+
+
+def test_error_reaches_every_caller_and_key_is_released():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: 1) == (1, False)
+
+
+def test_async_callers_share_one_task():
+    flight = AsyncSingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return {"n": 1}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(4)))
+
+    results = asyncio.run(main())
+    assert len(runs) == 1
+    assert [shared for _, shared in results].count(False) == 1
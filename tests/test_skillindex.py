@@ -0,0 +1,134 @@
+# test_skillindex.py
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from resumestore import ResumeStore
+from skillindex import SkillIndex, analyze, document_terms
+
+VOCABULARY = ["Python", "SQL", "Spark", "Airflow", "Power BI", "Tableau", "Docker", "Kubernetes", "Java", "Go",
+              "Excel", "dbt", "Kafka", "Terraform", "AWS"]
+TITLES = ["Data Engineer", "Senior Data Engineer", "Data Analyst", "Backend Developer", "BI Developer"]
+JOB = "Senior Data Engineer: Python, Spark and Airflow on AWS. SQL and dbt a plus; Python testing culture."
+
+
+def _result(rng):
+    per_job = [{"job_title": rng.choice(TITLES), "duration_months": rng.randint(0, 150),
+                "responsibilities": [f"Built pipelines with {rng.choice(VOCABULARY)}"]}
+               for _ in range(rng.randint(0, 3))]
+    return {
+        "technical_skills": {"tools": rng.sample(VOCABULARY, rng.randint(1, 6))},
+        "soft_skills": rng.sample(["communication", "leadership", "ownership"], rng.randint(0, 2)),
+        "experience_analysis": {"per_job": per_job, "total_years_approx": rng.randint(0, 20)},
+    }
+
+
+def _profiles(n=60, seed=3):
+    rng = random.Random(seed)
+    return {f"doc{i}": _result(rng) for i in range(n)}
+
+
+def _bm25(docs, job_description, k1=1.2, b=0.75):
+    """Reference BM25 over the weighted term frequencies, one profile at a time."""
+    terms = {doc_id: document_terms(result) for doc_id, result in docs.items()}
+    n = len(terms)
+    avg_length = sum(sum(t.values()) for t in terms.values()) / n
+    scores = {}
+    for doc_id, tf in terms.items():
+        norm = k1 * (1 - b + b * sum(tf.values()) / avg_length)
+        score = 0.0
+        for term, count in Counter(analyze(job_description)).items():
+            df = sum(1 for t in terms.values() if term in t)
+            if term in tf:
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                score += (1 + math.log(count)) * idf * tf[term] * (k1 + 1) / (tf[term] + norm)
+        if score > 0:
+            scores[doc_id] = round(score, 4)
+    return scores
+
+
+def _scores(ranked):
+    return {r["doc_id"]: r["score"] for r in ranked}
+
+
+def test_rank_matches_reference_bm25():
+    docs = _profiles()
+    index = SkillIndex()
+    for doc_id, result in docs.items():
+        index.add(doc_id, result)
+    ranked = index.rank(JOB, top_n=len(docs))
+    expected = _bm25(docs, JOB)
+    assert _scores(ranked) == pytest.approx(expected, abs=1e-3)
+    assert [r["score"] for r in ranked] == sorted((r["score"] for r in ranked), reverse=True)
+    # top_n keeps the best ones
+    assert [r["doc_id"] for r in index.rank(JOB, top_n=5)] == [r["doc_id"] for r in ranked[:5]]
+
+
+def test_readd_and_remove_retire_old_slots():
+    docs = _profiles()
+    rng = random.Random(9)
+    index = SkillIndex()
+    for doc_id, result in docs.items():
+        index.add(doc_id, result)
+    # churn: re-index half the profiles with new content, drop a few
+    for doc_id in list(docs)[::2]:
+        docs[doc_id] = _result(rng)
+        index.add(doc_id, docs[doc_id])
+    for doc_id in list(docs)[1:10:3]:
+        assert index.remove(doc_id) is True
+        del docs[doc_id]
+    assert index.remove("doc1") is False
+
+    assert len(index) == len(docs)
+    ranked = index.rank(JOB, top_n=1000)
+    assert len({r["doc_id"] for r in ranked}) == len(ranked)  # no doc counted from an old slot
+    assert _scores(ranked) == pytest.approx(_bm25(docs, JOB), abs=1e-3)
+
+
+def test_compaction_keeps_ranking():
+    docs = _profiles(n=40)
+    rng = random.Random(11)
+    index = SkillIndex()
+    for doc_id, result in docs.items():
+        index.add(doc_id, result)
+    for doc_id in list(docs)[::3]:
+        index.add(doc_id, _result(rng))
+    for doc_id in list(docs)[1::5]:
+        index.remove(doc_id)
+
+    before = index.rank(JOB, top_n=1000)
+    with index._lock:
+        index._compact_locked()
+    assert index._retired == 0
+    assert len(index._ids) == len(index)
+    assert index.rank(JOB, top_n=1000) == before
+
+
+def test_compaction_triggers_on_churn():
+    index = SkillIndex()
+    index.add("other", {"technical_skills": {"tools": ["Java"]}})
+    for i in range(1002):
+        index.add("doc", {"technical_skills": {"tools": ["Python"] if i % 2 else ["Spark"]}})
+    assert len(index._ids) < 1002  # dead slots were dropped along the way
+    assert {r["doc_id"] for r in index.rank("python java spark")} == {"doc", "other"}
+    assert index.rank("spark") == []
+
+
+def test_sync_picks_up_other_processes_writes_and_deletes(tmp_path):
+    db = str(tmp_path / "profiles.db")
+    ours, theirs = ResumeStore(db), ResumeStore(db)
+    docs = _profiles(n=10)
+    for doc_id, result in docs.items():
+        theirs.upsert(doc_id, result)
+
+    index = SkillIndex()
+    assert index.sync(ours) == len(docs)
+    assert index.sync(ours) == 0  # nothing new
+
+    theirs.delete("doc3")
+    theirs.upsert("doc4", {"technical_skills": {"tools": ["Cobol"]}})
+    index.sync(ours)
+    assert "doc3" not in index and len(index) == len(docs) - 1
+    assert [r["doc_id"] for r in index.rank("cobol")] == ["doc4"]
@@ -0,0 +1,80 @@
+# test_streamparse.py
+import json
+import random
+
+import pytest
+
+from streamparse import IncrementalJSONParser, parse_stream
+
+PROFILE = json.dumps({
+    "full_name": "Zoë \"ZZ\" O'Brien",
+    "email": "zoe@example.com",
+    "summary": "Builds {pipelines} and [dashboards], \\ back\\slashes, tab\there; café ☕ 😀 ok",
+    "employment_details": [
+        {"company": "Acme, Inc.", "job_title": "Data Engineer", "responsibilities": ["ETL: \"raw\" → clean", "}]"]},
+        {"company": "Beta Ltd", "job_title": "Analyst", "start_date": "Jan 2015", "end_date": "Dec 2018"},
+    ],
+    "technical_skills": {"languages": ["Python", "SQL"], "tools": []},
+    "certifications": [],
+    "soft_skills": ["communication"],
+    "years": 7.5,
+    "remote": True,
+    "linkedin": None,
+}, ensure_ascii=True)  # \uXXXX escapes (incl. a surrogate pair) to split across chunks
+
+RAW_UNICODE = json.dumps({"full_name": "Zoë 😀", "skills": ["naïve", "日本語"]}, ensure_ascii=False)
+
+
+def _expected(text):
+    """The events json.loads implies: array elements as items, then every top-level value as a field."""
+    events = []
+    for key, value in json.loads(text).items():
+        if isinstance(value, list):
+            events += [("item", key, item) for item in value]
+        events.append(("field", key, value))
+    return events
+
+
+def _one_byte(text):
+    return list(text)
+
+
+def _random_chunks(text, seed):
+    rng = random.Random(seed)
+    chunks, i = [], 0
+    while i < len(text):
+        size = rng.randint(1, 12)
+        chunks.append(text[i:i + size])
+        i += size
+    return chunks
+
+
+@pytest.mark.parametrize("text", [PROFILE, RAW_UNICODE])
+def test_one_char_chunks_match_json_loads(text):
+    parser = IncrementalJSONParser()
+    assert list(parse_stream(_one_byte(text), parser)) == _expected(text)
+    assert parser.done
+    assert parser.fields == json.loads(text)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_chunks_match_json_loads(seed):
+    parser = IncrementalJSONParser()
+    assert list(parse_stream(_random_chunks(PROFILE, seed), parser)) == _expected(PROFILE)
+    assert parser.fields == json.loads(PROFILE)
+
+
+def test_escape_split_across_chunks():
+    # the backslash of \" and of \uXXXX ends one chunk, the rest starts the next
+    cut = PROFILE.index("\\\"ZZ")
+    assert list(parse_stream([PROFILE[:cut + 1], PROFILE[cut + 1:]])) == _expected(PROFILE)
+    cut = PROFILE.index("\\ud83d")
+    chunks = [PROFILE[:cut + 3], PROFILE[cut + 3:cut + 8], PROFILE[cut + 8:]]
+    assert list(parse_stream(chunks)) == _expected(PROFILE)
+
+
+def test_wrapping_text_is_ignored():
+    chunks = ["Here is the JSON:\n```js", "on\n"] + _random_chunks(PROFILE, 99) + ["\n```", " {\"not\": 1}"]
+    parser = IncrementalJSONParser()
+    assert list(parse_stream(chunks, parser)) == _expected(PROFILE)
+    assert parser.text == PROFILE  # nothing after the closing brace is kept